@@ -1,17 +1,94 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, Response
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.models.assessment import Assessment, Question, UserAssessmentAttempt
-from app.services import llm
+from app.models.assessment import UserAssessmentAttempt
+from app.services import async_llm, llm
+from app.services.assessment_pool import assessment_pool, store_question_set, ACTIVE
+from app.services.singleflight import db_lock, flights
+from app.services import daily_assessment, user_stats
+from app.db.session import SessionLocal
+from app.core.config import settings
 from datetime import datetime
+import anyio
+import random
 
 router = APIRouter()
 
+def _fresh_assessment_id(today, stale_id: Optional[int]) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        daily_set = daily_assessment.get_today(db, today, validate=True)
+        if daily_set and daily_set.id != stale_id and not daily_set.needs_regeneration:
+            return daily_set.id
+        return None
+    finally:
+        db.close()
+
+def _claim_pooled(title: str, day) -> int:
+    db = SessionLocal()
+    try:
+        assessment = assessment_pool.claim(db, title, day)
+        if assessment is None:
+            print("Assessment pool is empty. Serving mock assessment questions...")
+            assessment = store_question_set(db, random.choice(llm.MOCK_ASSESSMENT_SETS), status=ACTIVE, title=title, day=day)
+        daily_assessment.invalidate(day) # The day's set was replaced
+        return assessment.id
+    finally:
+        db.close()
+
+def _store_generated(questions_data: list, title: str, day) -> int:
+    db = SessionLocal()
+    try:
+        assessment_id = store_question_set(db, questions_data, status=ACTIVE, title=title, day=day).id
+        daily_assessment.invalidate(day) # The day's set was replaced
+        return assessment_id
+    finally:
+        db.close()
+
+def _load_daily_set(today) -> daily_assessment.DailySet:
+    db = SessionLocal()
+    try:
+        return daily_assessment.get_today(db, today, validate=True)
+    finally:
+        db.close()
+
+async def _daily_assessment_set(today, stale_id: Optional[int]) -> daily_assessment.DailySet:
+    # Loaded once by the leader; every coalesced request sends the same encoded body
+    await _create_daily_assessment(today, stale_id)
+    return await anyio.to_thread.run_sync(_load_daily_set, today)
+
+def _daily_response(daily_set: daily_assessment.DailySet) -> Response:
+    # Pre-encoded JSON, so a cache hit skips FastAPI's per-request serialization
+    return Response(content=daily_set.body, media_type="application/json")
+
+async def _create_daily_assessment(today, stale_id: Optional[int]) -> int:
+    """
+    Makes today's assessment once, replacing `stale_id` (the set the callers saw, if any).
+    """
+    async with db_lock(f"daily_assessment:{today}"):
+        # Another worker may have made it while we waited for the lock
+        fresh_id = await anyio.to_thread.run_sync(_fresh_assessment_id, today, stale_id)
+        if fresh_id is not None:
+            return fresh_id
+
+        title = f"Daily Assessment {today}"
+        if settings.ASSESSMENT_POOL_ENABLED:
+            # Serve a pre-generated set; the pool refills itself in the background
+            return await anyio.to_thread.run_sync(_claim_pooled, title, today)
+
+        # Pool disabled: generate new questions inline
+        try:
+            questions_data = await async_llm.generate_daily_questions()
+            print(f"Generated {len(questions_data)} assessment questions")
+        except Exception as e:
+            print(f"Assessment generation failed: {str(e)}")
+            raise HTTPException(status_code=503, detail=f"Assessment generation failed: {str(e)}")
+        return await anyio.to_thread.run_sync(_store_generated, questions_data, title, today)
+
 @router.get("/daily", response_model=Any)
-def get_daily_assessment(
+async def get_daily_assessment(
     refresh: bool = False,
-    db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
@@ -19,69 +96,35 @@ def get_daily_assessment(
     """
     today = datetime.utcnow().date()
     
-    # Check for existing assessment created today
-    existing_assessment = db.query(Assessment).filter(
-        Assessment.date >= datetime.combine(today, datetime.min.time()),
-        Assessment.date < datetime.combine(today, datetime.max.time())
-    ).first()
-    
-    if existing_assessment and not refresh:
-        # Check if any question has "General" category or is missing correct_answer
-        has_general = any((q.category == "General" or q.category is None) for q in existing_assessment.questions)
-        has_missing_answer = any((q.correct_answer is None) for q in existing_assessment.questions if q.type == "mcq")
-        
-        if not has_general and not has_missing_answer:
-            # Return questions from DB with all fields including correct_answer
-            return {"questions": [
-                {
-                    "id": q.id,
-                    "text": q.text,
-                    "type": q.type,
-                    "options": q.options,
-                    "correct_answer": q.correct_answer or "",
-                    "category": q.category if hasattr(q, "category") else "General"
-                } for q in existing_assessment.questions
-            ]}
-        # If has_general or missing_answer is True, we fall through to generate new questions (Auto-heal)
-
-    # Generate new questions
-    try:
-        questions_data = llm.generate_daily_questions()
-        print(f"Generated {len(questions_data)} assessment questions")
-    except Exception as e:
-        print(f"Assessment generation failed: {str(e)}")
-        raise HTTPException(status_code=503, detail=f"Assessment generation failed: {str(e)}")
-    
-    # Save to DB
-    new_assessment = Assessment(title=f"Daily Assessment {today}", date=datetime.utcnow())
-    db.add(new_assessment)
-    db.commit()
-    db.refresh(new_assessment)
-    
-    for q_data in questions_data:
-        q = Question(
-            assessment_id=new_assessment.id,
-            text=q_data["text"],
-            type=q_data["type"],
-            options=q_data.get("options"),
-            correct_answer=q_data.get("correct_answer", ""),
-            category=q_data.get("category", "General")
-        )
-        db.add(q)
-    
-    db.commit()
-    
+    # Today's set, usually straight from the in-process cache; a miss reads it off the event loop
+    existing = daily_assessment.cached(today) or await anyio.to_thread.run_sync(_load_daily_set, today)
+    if existing and not refresh and not existing.needs_regeneration:
+        return _daily_response(existing)
+
+    # Concurrent misses (and refreshes of the same set) share one generation, in this
+    # process through the single-flight future and across workers through the DB lock
+    stale_id = existing.id if existing else None
+    daily_set = await flights.do(
+        f"daily_assessment:{today}:{stale_id}", lambda: _daily_assessment_set(today, stale_id)
+    )
     # Return questions with correct_answer included for frontend to display on submission
-    return {"questions": [
-        {
-            "id": q.id,
-            "text": q.text,
-            "type": q.type,
-            "options": q.options,
-            "correct_answer": q.correct_answer or q_data.get("correct_answer", ""),
-            "category": q.category
-        } for q, q_data in zip(db.query(Question).filter(Question.assessment_id == new_assessment.id).all(), questions_data)
-    ]}
+    return _daily_response(daily_set)
+
+def _grade_submission(db: Session, submission: Any, today) -> dict:
+    if not isinstance(submission, dict):
+        raise ValueError("Each submission must be an object with 'responses'")
+    assessment_id = submission.get("assessment_id")
+    if assessment_id is None:
+        # Older clients don't send the id: grade against today's current set, checked against the index (question ids from any other set are rejected)
+        daily_set = daily_assessment.get_today(db, today, validate=True)
+        answer_key = daily_set.answer_key if daily_set else None
+    else:
+        answer_key = daily_assessment.answer_key(db, assessment_id) if isinstance(assessment_id, int) else None
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="No active assessment found to submit against.")
+    graded = answer_key.grade(submission.get("responses") or {})
+    graded["assessment_id"] = answer_key.assessment_id
+    return graded
 
 @router.post("/submit", response_model=Any)
 def submit_assessment(
@@ -91,91 +134,43 @@ def submit_assessment(
 ) -> Any:
     """
     Submit assessment responses and get detailed feedback.
+    Body: {"assessment_id": ..., "responses": {question_id: answer}}, or a list of
+    those to submit several at once (all are validated before any is saved).
     Shows correct answers even when user answers are wrong (for all mock and real questions).
     """
-    # Calculate score logic
     today = datetime.utcnow().date()
-    
-    # Fetch today's assessment to get correct answers
-    assessment = db.query(Assessment).filter(
-        Assessment.date >= datetime.combine(today, datetime.min.time()),
-        Assessment.date < datetime.combine(today, datetime.max.time())
-    ).first()
-    
-    correct_count = 0
-    total_questions = 0
-    detailed_results = []
-    
-    if assessment:
-        user_responses = responses.get("responses", {})
-        questions = db.query(Question).filter(Question.assessment_id == assessment.id).all()
-        
-        for q in questions:
-            if q.type == "mcq":
-                total_questions += 1
-                # Match by question text
-                user_answer = user_responses.get(q.text)
-                is_correct = user_answer == q.correct_answer
-                
-                if is_correct:
-                    correct_count += 1
-                
-                # Build detailed result for each question
-                result = {
-                    "question": q.text,
-                    "user_answer": user_answer,
-                    "correct_answer": q.correct_answer or "",
-                    "is_correct": is_correct,
-                    "category": q.category,
-                    "explanation": ""  # Can be enhanced with more context
-                }
-                
-                # Add explanation for wrong answers
-                if not is_correct and user_answer:
-                    result["explanation"] = f"You selected: '{user_answer}'. The correct answer is: '{q.correct_answer}'"
-                elif not is_correct and not user_answer:
-                    result["explanation"] = f"You didn't select an answer. The correct answer is: '{q.correct_answer}'"
-                elif is_correct:
-                    result["explanation"] = "Correct! Well done."
-                
-                detailed_results.append(result)
-            
-            elif q.type == "subjective":
-                # For subjective answers, show the model answer for comparison
-                user_answer = user_responses.get(q.text)
-                detailed_results.append({
-                    "question": q.text,
-                    "user_answer": user_answer,
-                    "model_answer": q.correct_answer or "",
-                    "category": q.category,
-                    "type": "subjective",
-                    "note": "Please compare your answer with the model answer provided below."
-                })
-    else:
-        raise HTTPException(status_code=404, detail="No active assessment found to submit against.")
+    submissions = responses if isinstance(responses, list) else [responses]
 
-    # Calculate percentage
-    if total_questions > 0:
-        score = int((correct_count / total_questions) * 100)
-    else:
-        score = 0
-    
-    # Save attempt
-    attempt = UserAssessmentAttempt(
-        user_id=current_user.id,
-        assessment_id=assessment.id if assessment else None,
-        score=score,
-        responses=responses.get("responses"),
-        timestamp=datetime.utcnow()
-    )
-    db.add(attempt)
+    # Graded from the cached answer keys; the attempt inserts are the only DB writes
+    graded = []
+    for index, submission in enumerate(submissions):
+        try:
+            graded.append(_grade_submission(db, submission, today))
+        except ValueError as e:
+            detail = f"Submission {index}: {e}" if isinstance(responses, list) else str(e)
+            raise HTTPException(status_code=422, detail=detail)
+
+    timestamp = datetime.utcnow()
+    db.add_all([
+        UserAssessmentAttempt(
+            user_id=current_user.id,
+            assessment_id=result["assessment_id"],
+            score=result["score"],
+            responses=result["responses"],
+            timestamp=timestamp
+        ) for result in graded
+    ])
+    user_stats.record_assessment_attempts(db, current_user.id, [result["score"] for result in graded])
     db.commit()
-    db.refresh(attempt)
-    
-    return {
-        "status": "submitted", 
-        "score": score,
-        "correct_count": correct_count,
-        "total_count": total_questions,
-        "results": detailed_results
-    }
+
+    results = [
+        {
+            "status": "submitted",
+            "assessment_id": result["assessment_id"],
+            "score": result["score"],
+            "correct_count": result["correct_count"],
+            "total_count": result["total_count"],
+            "results": result["results"]
+        } for result in graded
+    ]
+    return results if isinstance(responses, list) else results[0]
@@ -1,38 +1,91 @@
-from datetime import timedelta
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+import anyio
 
 from app.api import deps
-from app.core import security
-from app.core.config import settings
-from app.schemas.token import Token
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.schemas.token import RefreshTokenRequest, Token
+from app.services import refresh_tokens
+from app.services.login_throttle import client_ip, login_throttle
+from app.services.password_hasher import HasherBusy, password_hasher
 
 router = APIRouter()
 
+def _find_user(email: str) -> Optional[User]:
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.email == email).first()
+    finally:
+        db.close() # Released before bcrypt runs; the loaded columns stay readable on the detached instance
+
+def _store_hash(user_id: int, hashed_password: str):
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+        db.commit()
+    finally:
+        db.close()
+
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
-) -> Any:
+async def login_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    # Authenticate user
-    # We need to implement authenticate in crud or here. Let's do it here for simplicity or add to deps/crud.
-    # For now, I'll do it inline or add a helper.
-    # Let's add a simple query here.
-    from app.models.user import User
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    # Refuse clients with too many recent failures before any lookup or hashing
+    ip = client_ip(request)
+    retry_after = login_throttle.retry_after(ip, form_data.username)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429, detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(max(int(retry_after) + 1, 1))}
+        )
+
+    # Authenticate user (DB calls in the threadpool, never on the event loop)
+    user = await anyio.to_thread.run_sync(_find_user, form_data.username)
+    verified, new_hash = False, None
+    if user:
+        # bcrypt runs in the hashing process pool, not on this worker's threads
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        except HasherBusy:
+            raise HTTPException(status_code=503, detail="Login is busy. Please retry.", headers={"Retry-After": "1"})
+    if not verified:
+        login_throttle.record_failure(ip, form_data.username)
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    login_throttle.reset(ip, form_data.username)
+
+    if new_hash:
+        # Stored hash uses outdated parameters (e.g. PASSWORD_BCRYPT_ROUNDS changed): replace it
+        await anyio.to_thread.run_sync(_store_hash, user.id, new_hash)
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
-    }
+    # Starts a token family; renewing it via /login/refresh-token needs no password check
+    return refresh_tokens.issue(user.id)
+
+@router.post("/login/refresh-token", response_model=Token)
+def refresh_access_token(body: RefreshTokenRequest) -> Any:
+    """
+    Exchange a refresh token for a new access and refresh token (signature check only, no bcrypt).
+    Each refresh token works once; reusing one logs its whole session out.
+    """
+    try:
+        payload = refresh_tokens.decode(body.refresh_token)
+        user = deps.get_principal(int(payload["sub"]))
+        refresh_tokens.rotate(body.refresh_token)
+    except refresh_tokens.InvalidRefreshToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return refresh_tokens.issue(user.id, family=payload["fam"])
+
+@router.post("/logout")
+def logout(body: RefreshTokenRequest) -> Any:
+    """
+    Revoke the refresh token's session, including the access tokens issued with it.
+    """
+    try:
+        refresh_tokens.revoke(body.refresh_token)
+    except refresh_tokens.InvalidRefreshToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    return {"message": "Logged out"}
@@ -1,108 +1,181 @@
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.db.session import SessionLocal
 from app.models.coding import CodingProblem, CodingSubmission
-from app.services import llm
-import json
+from app.services import async_llm, user_stats
+from app.services.coding_bank import coding_bank, serialize_problem
+from app.services.judge.engine import SUPPORTED_LANGUAGES, WORKER_CRASHED, judge_async, parse_test_cases, format_output
+from app.services.review_cache import review_cache, review_key
+from app.core.config import settings
 from datetime import datetime
+import anyio
 
 router = APIRouter()
 
 @router.get("/daily", response_model=Any)
 def get_daily_coding_problem(
     refresh: bool = False,
+    difficulty: Optional[str] = None,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
-    Get daily coding problem.
+    Get daily coding problem from the problem bank.
+    refresh=true ("Load Next Question") serves a problem the user has not seen yet.
     """
-    # For now, we won't persist the daily problem to DB to allow easy "Next Question"
-    # In a real app, we'd save it. Here we just generate on fly if refresh=True
-    # or return a cached one if we had a cache. 
-    # Since the user wants "Load Next Question", we'll just generate every time for now 
-    # or rely on frontend to ask for it.
-    
-    problem_data = llm.generate_coding_problem()
-    
-    # Persist to DB to ensure ID exists for submission (Foreign Key constraint)
-    # Check if we can reuse the ID or let DB assign one. 
-    # LLM returns a random ID, but we should let DB handle it or upsert.
-    # Simpler: Create new entry.
-    
-    db_problem = CodingProblem(
-        title=problem_data.get("title"),
-        description=problem_data.get("description"),
-        difficulty=problem_data.get("difficulty"),
-        test_cases=json.dumps(problem_data.get("test_cases"))
-    )
-    db.add(db_problem)
-    db.commit()
-    db.refresh(db_problem)
-    
-    # Update the returned ID to match DB ID
-    problem_data["id"] = db_problem.id
-    
-    return problem_data
+    problem = coding_bank.pick(db, current_user.id, difficulty=difficulty, refresh=refresh)
+    if problem is None:
+        raise HTTPException(status_code=503, detail="No coding problems available yet. Please try again shortly.")
+    return serialize_problem(problem)
+
+def _load_problem(problem_id) -> CodingProblem:
+    if problem_id is None:
+        raise HTTPException(status_code=400, detail="problem_id is required")
+    db = SessionLocal()
+    try:
+        problem = db.query(CodingProblem).filter(CodingProblem.id == problem_id).first()
+    finally:
+        db.close() # The loaded columns stay readable on the detached instance
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    return problem
+
+def _cached_evaluation(key: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        return review_cache.get(db, key)
+    finally:
+        db.close()
+
+def _store_evaluation(key: str, problem_id: int, language: str, evaluation: dict):
+    db = SessionLocal()
+    try:
+        review_cache.put(db, key, problem_id, language, evaluation)
+    finally:
+        db.close()
+
+def _save_submission(user_id: int, problem_id: int, code: str, language: str, passed: bool) -> int:
+    db = SessionLocal()
+    try:
+        submission = CodingSubmission(
+            user_id=user_id,
+            problem_id=problem_id,
+            code=code,
+            language=language,
+            status="Passed" if passed else "Failed",
+            timestamp=datetime.utcnow()
+        )
+        db.add(submission)
+        user_stats.record_coding_submission(db, user_id, passed)
+        db.commit()
+        return submission.id
+    finally:
+        db.close()
+
+async def _evaluate(code: str, language: str, problem: CodingProblem, review: bool, fail_fast: bool) -> dict:
+    """
+    Judges the code locally against the problem's test cases, optionally adding an LLM review.
+    Languages the sandbox cannot run fall back to the LLM's simulated evaluation.
+    """
+    if (language or "python").lower() not in SUPPORTED_LANGUAGES:
+        result = await async_llm.evaluate_code(code, language, problem.title)
+        return {
+            "passed": result.get("status") == "success",
+            "output": result.get("output", "Execution finished."),
+            "analysis": result.get("analysis"),
+            "results": None
+        }
+
+    result = await judge_async(code, language, parse_test_cases(problem.test_cases), fail_fast=fail_fast)
+    output = format_output(result)
+    analysis = None
+    if review:
+        analysis = await async_llm.review_code(code, language, problem.title, output)
+        if analysis is not None:
+            analysis["correctness"] = "Passed" if result["status"] == "passed" else "Failed"
+    return {"passed": result["status"] == "passed", "output": output, "analysis": analysis, "results": result}
+
+def _is_cacheable(evaluation: dict, review: bool) -> bool:
+    # Don't pin transient failures: LLM fallbacks, timeouts under load, crashed workers
+    if evaluation["results"] is None:
+        return evaluation["analysis"] is not None
+    if review and evaluation["analysis"] is None:
+        return False
+    for c in evaluation["results"]["cases"]:
+        if c["status"] == "timeout" or c["error"] == WORKER_CRASHED:
+            return False
+    return True
+
+async def _evaluate_cached(code: str, language: str, problem: CodingProblem, review: bool, fail_fast: bool) -> dict:
+    """
+    _evaluate() behind the review cache: identical (modulo formatting) resubmissions
+    of the same problem are answered without running the judge or the LLM.
+    """
+    if not settings.CODE_REVIEW_CACHE_ENABLED:
+        return await _evaluate(code, language, problem, review=review, fail_fast=fail_fast)
+
+    mode = ("run" if fail_fast else "submit") + ("+review" if review else "")
+    key = review_key(problem.id, language, code, mode)
+    # Memory hits stay on the loop; the persistent tier is read in a thread
+    cached = review_cache.memory.get(key) or await anyio.to_thread.run_sync(_cached_evaluation, key)
+    if cached is not None:
+        return dict(cached, cached=True)
+
+    evaluation = await _evaluate(code, language, problem, review=review, fail_fast=fail_fast)
+    if _is_cacheable(evaluation, review):
+        await anyio.to_thread.run_sync(_store_evaluation, key, problem.id, language, evaluation)
+    return dict(evaluation, cached=False)
 
 @router.post("/run", response_model=Any)
-def run_code(
+async def run_code(
     payload: Any = Body(...),
-    db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
-    Run code against test cases.
+    Run code against the problem's test cases in the sandbox.
+    Pass "review": true to also get the LLM's qualitative review.
     """
     code = payload.get("code")
     language = payload.get("language")
+    problem = await anyio.to_thread.run_sync(_load_problem, payload.get("problem_id"))
     
-    # Use LLM to evaluate code
-    result = llm.evaluate_code(code, language, "Two Sum")
+    # Stop at the first failing case: the candidate only needs to see what broke
+    evaluation = await _evaluate_cached(code, language, problem, review=payload.get("review", False), fail_fast=True)
     
     return {
         "status": "success", 
-        "output": result.get("output", "Execution finished."),
-        "analysis": result.get("analysis")
+        "output": evaluation["output"],
+        "analysis": evaluation["analysis"],
+        "results": evaluation["results"],
+        "cached": evaluation["cached"]
     }
 
 @router.post("/submit", response_model=Any)
-def submit_code(
+async def submit_code(
     payload: Any = Body(...),
-    db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
-    Submit code solution.
+    Submit code solution. Passed only if every test case passes.
     """
     code = payload.get("code")
     language = payload.get("language")
-    problem_id = payload.get("problem_id", 1) # Default to 1 for now
-    
-    # Use LLM to evaluate code
-    result = llm.evaluate_code(code, language, "Two Sum")
+    problem = await anyio.to_thread.run_sync(_load_problem, payload.get("problem_id"))
     
-    status = "Failed"
-    if result.get("status") == "success":
-        status = "Passed"
+    evaluation = await _evaluate_cached(code, language, problem, review=payload.get("review", True), fail_fast=False)
         
     # Save submission
-    submission = CodingSubmission(
-        user_id=current_user.id,
-        problem_id=problem_id,
-        code=code,
-        language=language,
-        status=status,
-        timestamp=datetime.utcnow()
+    submission_id = await anyio.to_thread.run_sync(
+        _save_submission, current_user.id, problem.id, code, language, evaluation["passed"]
     )
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
     
     return {
         "status": "submitted", 
-        "result": result.get("output", "Submission processed."), 
-        "analysis": result.get("analysis"),
-        "submission_id": submission.id
+        "result": evaluation["output"], 
+        "analysis": evaluation["analysis"],
+        "results": evaluation["results"],
+        "cached": evaluation["cached"],
+        "submission_id": submission_id
     }
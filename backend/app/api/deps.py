@@ -3,13 +3,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
 
 from app.models import user as models
 from app.schemas import token as token_schemas
-from app.core import security
+from app.core import metrics, security
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.db.session import SessionLocal
+from app.services.refresh_tokens import revocations
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -22,9 +23,53 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.User:
+class Principal:
+    """
+    Read-only snapshot of an authenticated user, shared between requests.
+    Endpoints that change the user load the row themselves and call invalidate_principal.
+    """
+    __slots__ = ("id", "email", "full_name", "is_active", "is_superuser")
+
+    def __init__(self, user: models.User):
+        self.id = user.id
+        self.email = user.email
+        self.full_name = user.full_name
+        self.is_active = user.is_active
+        self.is_superuser = user.is_superuser
+
+# user id -> Principal. Entries are dropped by invalidate_principal in this worker;
+# other workers pick changes up within AUTH_PRINCIPAL_CACHE_TTL seconds
+_principals = TTLCache(maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL)
+metrics.register("auth_principal_cache", _principals.stats)
+
+def invalidate_principal(user_id: int):
+    _principals.pop(user_id)
+
+def _load_principal(user_id: int) -> Optional[Principal]:
+    db = SessionLocal()
+    try:
+        user = db.get(models.User, user_id)
+        return Principal(user) if user else None
+    finally:
+        db.close()
+
+def get_principal(user_id: Optional[int]) -> Principal:
+    """The cached principal of an active user; raises 404/400 otherwise."""
+    user = _principals.get(user_id)
+    if user is None:
+        user = _load_principal(user_id) if user_id is not None else None
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        _principals.set(user.id, user)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+def get_current_user(token: str = Depends(reusable_oauth2)) -> Principal:
+    """
+    Authenticates the bearer token. A cache hit needs no DB session at all;
+    a miss reads the user once for the whole worker.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -35,7 +80,10 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(models.User).filter(models.User.id == token_data.sub).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    # Refresh tokens only buy new access tokens; logged-out logins are rejected (bloom filter, no DB on a miss)
+    if token_data.typ == security.REFRESH_TOKEN_TYPE or (token_data.fam and revocations.is_revoked(token_data.fam)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return get_principal(token_data.sub)
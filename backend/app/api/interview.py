@@ -1,9 +1,16 @@
+import json
+import anyio
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.db.session import SessionLocal
 from app.models.interview import InterviewSession, InterviewMessage
-from app.services import llm
+from app.services import async_llm, user_stats
+from app.services.interview_context import build_context, schedule_summary, stats as context_stats
+from app.services import interview_rubric, transcript
+from app.services.job_queue import enqueue
 
 router = APIRouter()
 
@@ -28,41 +35,100 @@ def start_interview(
         resume_text=resume_text
     )
     db.add(session)
+    db.flush()
+    user_stats.record_interview_started(db, current_user.id, session.id)
     db.commit()
     db.refresh(session)
     return {"session_id": session.id, "message": "Interview started. Please introduce yourself."}
 
+def _record_user_turn(session_id: int, user_content: str) -> tuple:
+    """Stores the candidate's message and builds the prompt context for the reply."""
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        # Committed first so it is part of the context
+        db.add(InterviewMessage(session_id=session.id, role="user", content=user_content))
+        db.commit()
+        # Recent turns within the token budget + rolling summary of older ones
+        context = build_context(db, session)
+        return context, session.job_description, session.resume_text or ""
+    finally:
+        db.close()
+
+def _record_reply(session_id: int, ai_response_text: str, context) -> int:
+    """Stores the interviewer's reply and queues the summary/rubric jobs it may trigger."""
+    db = SessionLocal()
+    try:
+        ai_msg = InterviewMessage(session_id=session_id, role="assistant", content=ai_response_text, prompt_tokens=context.prompt_tokens)
+        db.add(ai_msg)
+        db.commit()
+        context_stats.record_turn(context.prompt_tokens)
+        schedule_summary(db, session_id, context)
+        interview_rubric.schedule_rubric(db, db.get(InterviewSession, session_id))
+        return ai_msg.id
+    finally:
+        db.close()
+
 @router.post("/{session_id}/chat", response_model=Any)
-def chat_interview(
+async def chat_interview(
     session_id: int,
     message: Any = Body(...), # Expect JSON: { "message": "..." }
-    db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
     Send a message to the interviewer avatar.
     """
-    user_content = message.get("message")
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Save user message
-    user_msg = InterviewMessage(session_id=session.id, role="user", content=user_content)
-    db.add(user_msg)
-    
-    # Fetch recent history for context (last 20 messages for better context)
-    history_msgs = db.query(InterviewMessage).filter(InterviewMessage.session_id == session.id).order_by(InterviewMessage.timestamp.asc()).limit(20).all()
-    history = [{"role": msg.role, "content": msg.content} for msg in history_msgs]
+    # DB work runs in threads; only the LLM call is awaited on the loop
+    context, job_description, resume_text = await anyio.to_thread.run_sync(
+        _record_user_turn, session_id, message.get("message")
+    )
     
     # Generate AI response using LLM with staged logic
-    ai_response_text = llm.generate_interview_followup(history, session.job_description, session.resume_text or "")
-    
-    ai_msg = InterviewMessage(session_id=session.id, role="assistant", content=ai_response_text)
-    db.add(ai_msg)
+    ai_response_text = await async_llm.generate_interview_followup(
+        context.history, job_description, resume_text, **context.followup_kwargs()
+    )
     
-    db.commit()
-    return {"response": ai_response_text, "audio_url": "mock_audio_url.mp3"}
+    await anyio.to_thread.run_sync(_record_reply, session_id, ai_response_text, context)
+    return {"response": ai_response_text, "audio_url": "mock_audio_url.mp3", "prompt_tokens": context.prompt_tokens}
+
+@router.post("/{session_id}/chat/stream")
+async def chat_interview_stream(
+    session_id: int,
+    message: Any = Body(...), # Expect JSON: { "message": "..." }
+    current_user = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Streaming variant of /chat over Server-Sent Events.
+    Emits `data: {"token": "..."}` events as the interviewer's reply is generated,
+    then a final `event: done` carrying the full response once it is persisted.
+    """
+    # Save user message before streaming so it is part of the context
+    context, job_description, resume_text = await anyio.to_thread.run_sync(
+        _record_user_turn, session_id, message.get("message")
+    )
+
+    async def event_stream():
+        parts = []
+        try:
+            async for token in async_llm.stream_interview_followup(context.history, job_description, resume_text, **context.followup_kwargs()):
+                parts.append(token)
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        finally:
+            # Persist whatever was generated, even if the client went away mid-stream
+            ai_response_text = "".join(parts).strip()
+            message_id = None
+            if ai_response_text:
+                with anyio.CancelScope(shield=True):
+                    message_id = await anyio.to_thread.run_sync(_record_reply, session_id, ai_response_text, context)
+        yield f"event: done\ndata: {json.dumps({'response': ai_response_text, 'message_id': message_id, 'audio_url': 'mock_audio_url.mp3', 'prompt_tokens': context.prompt_tokens})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/{session_id}/end", response_model=Any)
 def end_interview(
@@ -71,24 +137,20 @@ def end_interview(
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
-    End the interview session and generate feedback.
+    End the interview session. Feedback is generated by a background job:
+    poll GET /jobs/{job_id} (or listen on /jobs/{job_id}/events) for the report.
     """
     session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     session.status = "completed"
-    
-    # Fetch full history for feedback generation
-    history_msgs = db.query(InterviewMessage).filter(InterviewMessage.session_id == session.id).order_by(InterviewMessage.timestamp.asc()).all()
-    history = [{"role": msg.role, "content": msg.content} for msg in history_msgs]
-    
-    # Generate Feedback
-    feedback = llm.generate_interview_feedback(history, session.job_description)
-    
-    session.feedback = feedback
-    session.score = feedback.get("score", 0)
-    
+    transcript.take_snapshot(db, session) # Immutable, compressed copy for history replays
     db.commit()
     
-    return {"message": "Interview ended successfully.", "feedback": feedback}
+    job = enqueue(
+        db, "interview_feedback", {"session_id": session.id},
+        user_id=current_user.id, dedupe_key=f"interview_feedback:{session.id}"
+    )
+    
+    return {"message": "Interview ended successfully. Feedback is being generated.", "job_id": job.id, "status": job.status}
@@ -0,0 +1,77 @@
+import json
+from typing import Any, Optional
+import anyio
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job
+from app.services.job_queue import TERMINAL, job_queue, serialize_job
+
+router = APIRouter()
+
+def _load_job(db: Session, job_id: int, user_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _snapshot(job_id: int) -> Optional[dict]:
+    """The job as served to clients, or None once its row is gone."""
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        return serialize_job(job) if job else None
+    finally:
+        db.close()
+
+def _load_owned_job(job_id: int, user_id: int):
+    db = SessionLocal()
+    try:
+        _load_job(db, job_id, user_id)
+    finally:
+        db.close()
+
+@router.get("/{job_id}", response_model=Any)
+def read_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Poll a background job. `result` is set once status is "succeeded".
+    """
+    return serialize_job(_load_job(db, job_id, current_user.id))
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: int, current_user = Depends(deps.get_current_user)) -> Any:
+    """
+    Server-Sent Events for a background job: an `event: status` on every status
+    change and a final `event: done` carrying the finished job (or
+    `event: gone` if the job is deleted meanwhile).
+    """
+    await anyio.to_thread.run_sync(_load_owned_job, job_id, current_user.id)
+
+    async def event_stream():
+        last_status = None
+        while True:
+            job = await anyio.to_thread.run_sync(_snapshot, job_id)
+            if job is None:
+                yield f"event: gone\ndata: {json.dumps({'id': job_id, 'detail': 'Job not found'})}\n\n"
+                return
+            if job["status"] in TERMINAL:
+                yield f"event: done\ndata: {json.dumps(job)}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"event: status\ndata: {json.dumps(job)}\n\n"
+            elif not await job_queue.wait_for_change(timeout=settings.JOB_POLL_INTERVAL):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
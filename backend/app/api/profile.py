@@ -1,10 +1,13 @@
-from typing import Any
-from fastapi import APIRouter, Depends
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.assessment import UserAssessmentAttempt
 from app.models.coding import CodingSubmission
 from app.models.interview import InterviewSession
+from app.core.config import settings
+from app.services import history, transcript, user_stats
 
 router = APIRouter()
 
@@ -16,19 +19,13 @@ def get_user_stats(
     """
     Get aggregated user statistics.
     """
-    # Assessment Stats
-    assessments = db.query(UserAssessmentAttempt).filter(UserAssessmentAttempt.user_id == current_user.id).all()
-    total_assessments = len(assessments)
-    avg_score = sum([a.score for a in assessments if a.score]) / total_assessments if total_assessments > 0 else 0
-    
-    # Coding Stats
-    coding_subs = db.query(CodingSubmission).filter(CodingSubmission.user_id == current_user.id).all()
-    total_coding = len(coding_subs)
-    passed_coding = len([c for c in coding_subs if c.status == "Passed"])
-    
-    # Interview Stats
-    interviews = db.query(InterviewSession).filter(InterviewSession.user_id == current_user.id).all()
-    total_interviews = len(interviews)
+    # One row, kept up to date by the submit/start/feedback writes
+    stats = user_stats.get(db, current_user.id)
+    total_assessments = stats.assessment_count
+    avg_score = stats.assessment_score_sum / total_assessments if total_assessments > 0 else 0
+    total_coding = stats.coding_submissions
+    passed_coding = stats.coding_passed
+    total_interviews = stats.interview_count
     
     total_completed = total_assessments + passed_coding
 
@@ -53,11 +50,11 @@ def get_user_stats(
 
     # 3. Communication: Based on Interview Feedback (Mock logic for now as feedback is complex JSON)
     # In a real app, we would parse the 'strengths' list from the latest interview
+    last_score = stats.last_interview_score
     if total_interviews > 0:
-        last_interview = interviews[-1]
-        if last_interview.score and last_interview.score > 80:
+        if last_score and last_score > 80:
             skills["Communication"] = "Advanced"
-        elif last_interview.score and last_interview.score > 60:
+        elif last_score and last_score > 60:
             skills["Communication"] = "Intermediate"
 
     return {
@@ -78,57 +75,50 @@ def get_user_stats(
 
 @router.get("/history", response_model=Any)
 def get_user_history(
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user)
 ) -> Any:
     """
-    Get full history lists for all activities.
+    Get the first page of every activity list, newest first.
+    Continue a list with GET /history/{kind}?cursor=<next_cursors[kind]>.
     """
-    # 1. Assessments
-    assessments_query = db.query(UserAssessmentAttempt).filter(UserAssessmentAttempt.user_id == current_user.id).order_by(UserAssessmentAttempt.timestamp.desc()).all()
-    assessments_data = []
-    for a in assessments_query:
-        # Fetch related assessment title if possible (simple for now)
-        assessments_data.append({
-            "id": a.id,
-            "type": "Assessment",
-            "title": f"Daily Assessment {a.timestamp.date()}", 
-            "score": f"{a.score}%" if a.score is not None else "N/A",
-            "date": a.timestamp.strftime("%Y-%m-%d"),
-            "status": "Completed"
-        })
+    data = {"next_cursors": {}}
+    for kind in history.KINDS:
+        data[kind], data["next_cursors"][kind] = history.page(db, kind, current_user.id, limit)
+    return data
 
-    # 2. Coding
-    coding_query = db.query(CodingSubmission).filter(CodingSubmission.user_id == current_user.id).order_by(CodingSubmission.timestamp.desc()).all()
-    coding_data = []
-    for c in coding_query:
-        coding_data.append({
-            "id": c.id,
-            "type": "Coding",
-            "title": f"Coding Problem #{c.problem_id}", # Ideal: Join with Problem table
-            "score": c.status,
-            "date": c.timestamp.strftime("%Y-%m-%d"),
-            "status": c.status
-        })
+@router.get("/history/{kind}", response_model=Any)
+def get_user_history_page(
+    kind: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+) -> Any:
+    """
+    One page of an activity list (assessments, coding or interviews), newest first.
+    format=ndjson exports every item after `cursor` instead, streamed one JSON object per line.
+    """
+    if kind not in history.KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown history list '{kind}'")
+    if cursor:
+        try:
+            history.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    # 3. Interviews
-    interviews_query = db.query(InterviewSession).filter(InterviewSession.user_id == current_user.id).order_by(InterviewSession.created_at.desc()).all()
-    interview_data = []
-    for i in interviews_query:
-        interview_data.append({
-            "id": i.id,
-            "type": "Interview",
-            "title": "Mock Interview Session",
-            "score": f"{i.score}/100" if i.score else "Pending",
-            "date": i.created_at.strftime("%Y-%m-%d"),
-            "status": i.status
-        })
-    
-    return {
-        "assessments": assessments_data,
-        "coding": coding_data,
-        "interviews": interview_data
-    }
+    if format == "ndjson":
+        db.close() # The export reads page by page on its own sessions
+        return StreamingResponse(
+            history.export_ndjson(kind, current_user.id, cursor),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{kind}-history.ndjson"'}
+        )
+
+    items, next_cursor = history.page(db, kind, current_user.id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/history/assessment/{id}", response_model=Any)
 def get_assessment_details(
@@ -176,17 +166,16 @@ def get_interview_details(
     session = db.query(InterviewSession).filter(InterviewSession.id == id, InterviewSession.user_id == current_user.id).first()
     if not session:
         return {"error": "Not found"}
-        
-    # Get messages
-    chat_history = []
-    for m in session.messages:
-        chat_history.append({"role": m.role, "content": m.content})
-        
+
+    # Sessions that ended before snapshots existed get theirs on first view
+    if session.status == "completed" and transcript.take_snapshot(db, session):
+        db.commit()
+
     return {
         "title": "Mock Interview Session",
         "date": session.created_at.strftime("%Y-%m-%d"),
         "score": session.score,
         "feedback": session.feedback,
-        "transcript": chat_history,
+        "transcript": transcript.get(db, session.id, session.transcript_snapshot, session.transcript_upto_id),
         "job_description": session.job_description
     }
@@ -1,46 +1,90 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
+import anyio
 
 from app.api import deps
-from app.core import security
+from app.db.session import SessionLocal
+from app.services.password_hasher import HasherBusy, password_hasher
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 
 router = APIRouter()
 
+async def _hash_password(password: str) -> str:
+    # bcrypt runs in the hashing process pool, not on the request threads
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server is busy. Please retry.", headers={"Retry-After": "1"})
+
+def _email_taken(email: str) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.email == email).first() is not None
+    finally:
+        db.close()
+
+def _insert_user(user_in: UserCreate, hashed_password: str) -> User:
+    db = SessionLocal()
+    try:
+        db_obj = User(
+            email=user_in.email,
+            hashed_password=hashed_password,
+            full_name=user_in.full_name,
+            is_active=user_in.is_active,
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    finally:
+        db.close() # The refreshed columns stay readable on the detached instance
+
+def _update_user(user_id: int, user_in: UserUpdate, hashed_password: Optional[str]) -> User:
+    db = SessionLocal()
+    try:
+        # current_user is the cached read-only principal; update the row itself
+        db_user = db.get(User, user_id)
+        user_data = jsonable_encoder(db_user)
+        update_data = user_in.dict(exclude_unset=True)
+        
+        if hashed_password:
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+            
+        for field in user_data:
+            if field in update_data:
+                setattr(db_user, field, update_data[field])
+                
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        return db_user
+    finally:
+        db.close()
+
 @router.post("/", response_model=UserSchema)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
     user_in: UserCreate,
 ) -> Any:
     """
     Create new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
+    # DB calls run in the threadpool on their own sessions, so no connection is held while bcrypt runs
+    if await anyio.to_thread.run_sync(_email_taken, user_in.email):
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
     
-    hashed_password = security.get_password_hash(user_in.password)
-    db_obj = User(
-        email=user_in.email,
-        hashed_password=hashed_password,
-        full_name=user_in.full_name,
-        is_active=user_in.is_active,
-    )
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    hashed_password = await _hash_password(user_in.password)
+    return await anyio.to_thread.run_sync(_insert_user, user_in, hashed_password)
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get current user.
@@ -48,36 +92,24 @@ def read_user_me(
     return current_user
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(deps.get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.Principal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Update current user.
     """
+    hashed_password = await _hash_password(user_in.password) if user_in.password else None
+
     if user_in.email and user_in.email != current_user.email:
-        user = db.query(User).filter(User.email == user_in.email).first()
-        if user:
+        if await anyio.to_thread.run_sync(_email_taken, user_in.email):
             raise HTTPException(
                 status_code=400,
                 detail="The user with this username already exists in the system.",
             )
             
-    user_data = jsonable_encoder(current_user)
-    update_data = user_in.dict(exclude_unset=True)
-    
-    if user_in.password:
-        hashed_password = security.get_password_hash(user_in.password)
-        del update_data["password"]
-        update_data["hashed_password"] = hashed_password
-        
-    for field in user_data:
-        if field in update_data:
-            setattr(current_user, field, update_data[field])
-            
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    db_user = await anyio.to_thread.run_sync(_update_user, current_user.id, user_in, hashed_password)
+    # Drop the cached principal (new email/name, or deactivation takes effect on the next request)
+    deps.invalidate_principal(db_user.id)
+    return db_user
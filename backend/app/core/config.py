@@ -12,12 +12,105 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "YOUR_SECRET_KEY_HERE" # Change this in production!
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14 # Refresh tokens rotate on every use; a login stays alive while it is used within this window
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000 # Revoked logins the in-memory bloom filter is sized for (~1% false positives)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 10.0 # How often a worker pulls other workers' revocations (bounds logout staleness for access tokens)
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000 # Authenticated users kept in memory (see app/api/deps.py)
+    AUTH_PRINCIPAL_CACHE_TTL: float = 60.0 # Seconds before a worker re-reads a user (bounds cross-worker staleness)
+    PASSWORD_BCRYPT_ROUNDS: int = 12 # Changing it rehashes each password on its next successful login
+    PASSWORD_HASH_WORKERS: int = 2 # bcrypt processes per app process (see app/services/password_hasher.py)
+    PASSWORD_HASH_MAX_PENDING: int = 32 # Queued + running hash/verify calls; more get a 503 at once
+    LOGIN_THROTTLE_MAX_FAILURES: int = 10 # Failed logins per (client IP, username) within the window before attempts are refused
+    LOGIN_THROTTLE_IP_MAX_FAILURES: int = 100 # Failed logins per client IP across all usernames (looser: shared NATs)
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 300.0
+    LOGIN_THROTTLE_FORWARDED_HEADER: Optional[str] = None # e.g. "X-Forwarded-For"; set only when a trusted proxy always sets it
     
     # AI
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_API_BASE: Optional[str] = None # For compatible APIs like SambaNova, Groq, etc.
     OPENAI_MODEL_NAME: str = "gpt-3.5-turbo" # Default model, can be overridden
 
+    # LLM HTTP connection pool (shared by every call in app/services/llm.py)
+    LLM_POOL_MAX_CONNECTIONS: int = 500 # Upper bound on open sockets (= max in-flight LLM calls per worker)
+    LLM_POOL_MAX_KEEPALIVE: int = 100 # Idle connections kept warm for reuse
+    LLM_KEEPALIVE_EXPIRY: float = 30.0 # Seconds an idle connection stays in the pool
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_MAX_RETRIES: int = 0 # SDK-level retries; backoff is done by the rate governor instead
+
+    # LLM rate governor (shared by every process on the host, see app/services/rate_governor.py)
+    LLM_RPM_LIMIT: int = 3000 # Requests per minute
+    LLM_TPM_LIMIT: int = 1000000 # Prompt + completion tokens per minute (estimated)
+    LLM_MAX_IN_FLIGHT: int = 256
+    LLM_BACKGROUND_RESERVE: float = 0.25 # Share of every budget background calls must leave to live chat
+    LLM_QUEUE_TIMEOUT: float = 30.0 # Longest wait for capacity before serving the fallback (background lane)
+    LLM_INTERACTIVE_QUEUE_TIMEOUT: float = 10.0 # Same for live chat, where a quick mock question beats a long stall
+    LLM_LEASE_SECONDS: float = 120.0 # In-flight slot of a crashed process is reclaimed after this
+    LLM_BACKOFF_BASE: float = 0.5 # Seconds; doubled per attempt, full jitter
+    LLM_BACKOFF_MAX: float = 20.0 # Retry-After longer than this serves the fallback instead of waiting
+    LLM_GOVERNOR_PATH: str = "" # SQLite file shared by the processes; default in the temp dir
+
+    # LLM circuit breaker (see app/services/circuit_breaker.py)
+    LLM_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5 # Consecutive connection errors/timeouts/5xx that open the circuit
+    LLM_BREAKER_RECOVERY_SECONDS: float = 30.0 # Open time before a probe call is let through
+
+    # Daily assessment pool (pre-generated question sets, refilled in the background)
+    ASSESSMENT_POOL_ENABLED: bool = True
+    ASSESSMENT_POOL_TARGET_DEPTH: int = 3 # Unserved sets kept ready ahead of demand
+    ASSESSMENT_POOL_REFILL_INTERVAL: float = 60.0 # Seconds between depth checks when idle
+
+    DAILY_ASSESSMENT_CACHE_TTL: float = 30.0 # Seconds before a worker re-checks its cached "today's assessment"
+    ANSWER_KEY_CACHE_SIZE: int = 32 # Assessments whose answer keys are kept in memory for grading
+
+    # Single-flight generation of shared daily content (see app/services/singleflight.py)
+    SINGLE_FLIGHT_LOCK_TTL: float = 300.0 # Cross-process lock of a crashed worker frees up after this
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.2 # How often other workers check the lock
+
+    # Coding problem bank (deduplicated problems reused across users)
+    CODING_BANK_ENABLED: bool = True # Background top-up of the bank
+    CODING_BANK_MIN_PER_DIFFICULTY: int = 10 # Top up when a difficulty has fewer problems
+    CODING_BANK_LOW_WATERMARK: int = 3 # Top up when a user has fewer unseen problems left
+    CODING_BANK_BATCH_SIZE: int = 5 # Problems generated per top-up
+    CODING_BANK_REFILL_INTERVAL: float = 300.0
+
+    # Code execution sandbox for /coding/run and /coding/submit
+    JUDGE_WORKERS: int = 0 # Concurrent sandboxed runs; 0 = number of CPU cores
+    JUDGE_TIMEOUT_SECONDS: float = 2.0 # Wall-clock limit per test case
+    JUDGE_CPU_SECONDS: int = 2 # RLIMIT_CPU per test case
+    JUDGE_MEMORY_MB: int = 256 # RLIMIT_AS per test case
+    JUDGE_SANDBOX_UID: int = 65534 # Unprivileged uid ("nobody") submissions run as when the app runs as root
+    JUDGE_REQUIRE_ISOLATION: bool = True # Refuse to run code without the Linux sandbox (namespaces + chroot); off only for dev machines
+    JUDGE_POOL_ENABLED: bool = True # Warm pre-forked interpreters (POSIX only; cold spawn otherwise)
+    JUDGE_POOL_SIZE: int = 0 # Warm interpreters kept alive; 0 = JUDGE_WORKERS
+    JUDGE_POOL_MAX_JOBS: int = 100 # Recycle a warm interpreter after this many test cases
+
+    # Interview chat prompt context
+    INTERVIEW_CONTEXT_TOKEN_BUDGET: int = 1500 # Recent turns sent verbatim each turn
+    INTERVIEW_CONTEXT_MAX_MESSAGES: int = 40 # Upper bound on recent messages fetched per turn
+    INTERVIEW_SUMMARY_MAX_TOKENS: int = 300 # Rolling summary of turns that fell out of the window
+    INTERVIEW_JD_MAX_TOKENS: int = 600
+    INTERVIEW_RESUME_MAX_TOKENS: int = 500
+    INTERVIEW_RUBRIC_SEGMENT_MESSAGES: int = 6 # Messages per background rubric note (3 turns)
+    INTERVIEW_FEEDBACK_TAIL_TOKENS: int = 2000 # Un-noted transcript tail sent with the final merge
+
+    # Background job queue (durable, DB-backed) for long LLM tasks
+    JOB_WORKERS: int = 4 # Concurrent jobs per app process
+    JOB_POLL_INTERVAL: float = 2.0 # Seconds between queue checks when not notified
+    JOB_LEASE_SECONDS: float = 300.0 # A running job whose worker vanished is retried after this
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0 # Seconds, doubled per attempt
+
+    # Cache of judged + reviewed submissions, keyed by problem, language and normalized code
+    CODE_REVIEW_CACHE_ENABLED: bool = True
+    CODE_REVIEW_CACHE_TTL_SECONDS: float = 7 * 24 * 3600.0
+    CODE_REVIEW_CACHE_MEMORY_ENTRIES: int = 2048 # In-process LRU tier
+    CODE_REVIEW_CACHE_DB_ENTRIES: int = 50000 # Persistent tier; oldest-used rows are pruned beyond this
+
+    # Profile history lists (keyset-paginated; NDJSON export streams in batches)
+    HISTORY_PAGE_SIZE: int = 50
+    HISTORY_MAX_PAGE_SIZE: int = 200
+    HISTORY_EXPORT_BATCH: int = 500 # Rows fetched per query while streaming an export
+
     class Config:
         env_file = ".env"
 
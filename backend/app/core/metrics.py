@@ -0,0 +1,15 @@
+"""
+Tiny in-process metrics registry.
+
+Subsystems register a zero-argument callable returning a dict snapshot;
+GET /metrics returns every snapshot keyed by subsystem name.
+"""
+from typing import Callable, Dict
+
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+def register(name: str, collector: Callable[[], dict]):
+    _collectors[name] = collector
+
+def collect() -> dict:
+    return {name: collector() for name, collector in _collectors.items()}
@@ -21,17 +21,58 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 def read_root():
     return {"message": "Welcome to Interview Agent API"}
 
+@app.on_event("startup")
+async def start_background_workers():
+    from app.services.coding_bank import coding_bank, seed_bank
+    seed_bank()
+    if settings.CODING_BANK_ENABLED:
+        coding_bank.start()
+    if settings.ASSESSMENT_POOL_ENABLED:
+        from app.services.assessment_pool import assessment_pool
+        assessment_pool.start()
+    from app.services.judge.engine import warm_pool
+    warm_pool.start()
+    # Job handlers register themselves on import
+    from app.services import interview_context, interview_rubric # noqa: F401
+    from app.services.job_queue import job_queue
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    from app.services.assessment_pool import assessment_pool
+    from app.services.coding_bank import coding_bank
+    await assessment_pool.stop()
+    await coding_bank.stop()
+    from app.services.judge.engine import warm_pool
+    warm_pool.close()
+    from app.services.password_hasher import password_hasher
+    password_hasher.close()
+    from app.services.job_queue import job_queue
+    await job_queue.stop()
+    # Drain the shared LLM connection pools
+    from app.services.llm_client import aclose_clients
+    await aclose_clients()
+
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    from app.services.circuit_breaker import llm_breaker, CLOSED
+    llm = llm_breaker.snapshot()
+    # Still serving (with mock LLM data) while the provider's circuit is not closed
+    return {"status": "healthy" if llm["state"] == CLOSED else "degraded", "llm": llm}
+
+@app.get("/metrics")
+def read_metrics():
+    from app.core import metrics
+    return metrics.collect()
 
-from app.api import auth, users, assessment, coding, interview, profile
+from app.api import auth, users, assessment, coding, interview, profile, jobs
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}", tags=["login"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(assessment.router, prefix=f"{settings.API_V1_STR}/assessment", tags=["assessment"])
 app.include_router(coding.router, prefix=f"{settings.API_V1_STR}/coding", tags=["coding"])
 app.include_router(interview.router, prefix=f"{settings.API_V1_STR}/interview", tags=["interview"])
 app.include_router(profile.router, prefix=f"{settings.API_V1_STR}/profile", tags=["profile"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
 
 # Create tables on startup (for simple local dev)
 from app.db.session import engine
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, JSON, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base_class import Base
@@ -6,12 +6,14 @@ from app.db.base_class import Base
 class Assessment(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, default=datetime.utcnow) # Set when served; NULL while pooled
+    status = Column(String, default="active", index=True) # pooled, active
+    assessment_day = Column(Date, unique=True, index=True, nullable=True) # Set on the day's current set only; NULL while pooled or once replaced
     questions = relationship("Question", back_populates="assessment")
 
 class Question(Base):
     id = Column(Integer, primary_key=True, index=True)
-    assessment_id = Column(Integer, ForeignKey("assessment.id"))
+    assessment_id = Column(Integer, ForeignKey("assessment.id"), index=True)
     text = Column(Text, nullable=False)
     type = Column(String) # "mcq" or "subjective"
     category = Column(String, default="General") # Java, DSA, OOP, etc.
@@ -20,6 +22,8 @@ class Question(Base):
     assessment = relationship("Assessment", back_populates="questions")
 
 class UserAssessmentAttempt(Base):
+    # A user's attempts, newest first (profile history) or aggregated (stats rebuild)
+    __table_args__ = (Index("ix_userassessmentattempt_user_id_timestamp", "user_id", "timestamp"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"))
     assessment_id = Column(Integer, ForeignKey("assessment.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base_class import Base
@@ -7,10 +7,22 @@ class CodingProblem(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text, nullable=False)
-    difficulty = Column(String) # Easy, Medium, Hard
+    difficulty = Column(String, index=True) # Easy, Medium, Hard
     test_cases = Column(Text) # JSON string of test cases
+    title_key = Column(String, index=True, nullable=True) # Normalized title, for dedup
+    fingerprint = Column(String(64), unique=True, index=True, nullable=True) # Hash of normalized title + description; NULL = not in the bank
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CodingProblemView(Base):
+    # Problems a user has already been served, so the bank can hand out unseen ones
+    __table_args__ = (UniqueConstraint("user_id", "problem_id", name="uq_codingproblemview_user_problem"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
+    problem_id = Column(Integer, ForeignKey("codingproblem.id"))
+    seen_at = Column(DateTime, default=datetime.utcnow)
     
 class CodingSubmission(Base):
+    __table_args__ = (Index("ix_codingsubmission_user_id_timestamp", "user_id", "timestamp"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"))
     problem_id = Column(Integer, ForeignKey("codingproblem.id"))
@@ -18,3 +30,12 @@ class CodingSubmission(Base):
     language = Column(String, default="python")
     status = Column(String) # Passed, Failed
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+class CodeReviewCache(Base):
+    # Persistent tier of the review cache (see app/services/review_cache.py)
+    key = Column(String(64), primary_key=True) # sha256 of problem, language, mode and normalized code
+    problem_id = Column(Integer, ForeignKey("codingproblem.id"), index=True)
+    language = Column(String)
+    result = Column(Text, nullable=False) # JSON of the evaluation returned to the client
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base_class import Base
 
 class InterviewSession(Base):
+    __table_args__ = (Index("ix_interviewsession_user_id_created_at", "user_id", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"))
     job_description = Column(Text, nullable=True)
@@ -11,13 +12,22 @@ class InterviewSession(Base):
     status = Column(String, default="active") # active, completed
     feedback = Column(JSON, nullable=True) # Store final report
     score = Column(Integer, nullable=True) # Overall interview score
+    context_summary = Column(Text, nullable=True) # Rolling summary of turns older than the chat window
+    summary_upto_id = Column(Integer, nullable=True) # Last InterviewMessage.id folded into context_summary
+    rubric_notes = Column(JSON, nullable=True) # Per-segment scores/notes computed during the interview
+    rubric_upto_id = Column(Integer, nullable=True) # Last InterviewMessage.id covered by rubric_notes
+    transcript_snapshot = Column(LargeBinary, nullable=True) # zlib-compressed JSON transcript, written once at /end
+    transcript_upto_id = Column(Integer, nullable=True) # Last InterviewMessage.id in transcript_snapshot
     created_at = Column(DateTime, default=datetime.utcnow)
     messages = relationship("InterviewMessage", back_populates="session")
 
 class InterviewMessage(Base):
+    # A session's messages in order (transcripts, context window, rubric segments)
+    __table_args__ = (Index("ix_interviewmessage_session_id_id", "session_id", "id"),)
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("interviewsession.id"))
     role = Column(String) # user, assistant
     content = Column(Text, nullable=False)
+    prompt_tokens = Column(Integer, nullable=True) # Prompt size that produced an assistant reply
     timestamp = Column(DateTime, default=datetime.utcnow)
     session = relationship("InterviewSession", back_populates="messages")
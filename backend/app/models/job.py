@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON
+from datetime import datetime
+from app.db.base_class import Base
+
+class Job(Base):
+    # Durable background job (see app/services/job_queue.py)
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True, nullable=False) # Handler name, e.g. interview_feedback
+    status = Column(String, index=True, default="queued") # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, nullable=True)
+    dedupe_key = Column(String, index=True, nullable=True) # At most one queued/running job per key
+    attempts = Column(Integer, default=0)
+    run_after = Column(DateTime, default=datetime.utcnow, index=True) # Retry backoff
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True) # A running job past this is re-queued
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
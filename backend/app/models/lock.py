@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.base_class import Base
+
+class FlightLock(Base):
+    # Cross-process single-flight lock (see app/services/singleflight.py); the primary key is the lock
+    key = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False) # A holder that died releases the lock at this time
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from datetime import datetime
+from app.db.base_class import Base
+
+class UserStats(Base):
+    # Per-user dashboard counters, kept in step with the activity tables (see app/services/user_stats.py)
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    assessment_count = Column(Integer, nullable=False, default=0)
+    assessment_score_sum = Column(Integer, nullable=False, default=0)
+    coding_submissions = Column(Integer, nullable=False, default=0)
+    coding_passed = Column(Integer, nullable=False, default=0)
+    interview_count = Column(Integer, nullable=False, default=0)
+    last_interview_id = Column(Integer, nullable=True) # Newest session; its score drives the communication skill
+    last_interview_score = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
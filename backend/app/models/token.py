@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.base_class import Base
+
+class RevokedToken(Base):
+    # Used refresh tokens and revoked token families (see app/services/refresh_tokens.py)
+    id = Column(Integer, primary_key=True, index=True) # Insertion order; workers sync their bloom filter past the last id they saw
+    token_id = Column(String, unique=True, index=True, nullable=False) # Refresh token jti or family id
+    kind = Column(String, nullable=False) # "refresh" (single use, already rotated) or "family" (whole login revoked)
+    expires_at = Column(DateTime, nullable=False, index=True) # Every token it covers has expired by then; pruned afterwards
+    revoked_at = Column(DateTime, default=datetime.utcnow)
@@ -4,6 +4,12 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    typ: Optional[str] = None
+    fam: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
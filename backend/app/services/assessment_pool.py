@@ -0,0 +1,188 @@
+"""
+Pool of pre-generated daily assessments.
+
+A background producer keeps ASSESSMENT_POOL_TARGET_DEPTH validated question
+sets in the Assessment/Question tables with status="pooled". GET /assessment/daily
+claims one with a single UPDATE instead of waiting on the LLM, and the claim
+wakes the producer to top the pool back up.
+"""
+import time
+from datetime import date, datetime
+from typing import Optional
+
+import anyio
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.assessment import Assessment, Question
+from app.services import async_llm
+from app.services.refill_worker import RefillWorker
+
+POOLED = "pooled"
+ACTIVE = "active"
+
+
+def is_valid_question_set(questions_data) -> bool:
+    """
+    Same rules the daily endpoint uses to auto-heal a stored assessment:
+    every question has a real category and every MCQ has a correct answer.
+    """
+    if not isinstance(questions_data, list) or not questions_data:
+        return False
+    for q in questions_data:
+        if not isinstance(q, dict) or not q.get("text") or q.get("type") not in ("mcq", "subjective"):
+            return False
+        if q.get("category") in (None, "General"):
+            return False
+        if q["type"] == "mcq" and (not q.get("options") or not q.get("correct_answer")):
+            return False
+    return True
+
+
+def retire_day(db: Session, day: date):
+    """
+    Frees the day's assessment_day slot (unique) for the set replacing it. Caller commits.
+    """
+    db.query(Assessment).filter(Assessment.assessment_day == day).update({"assessment_day": None}, synchronize_session=False)
+
+
+def store_question_set(db: Session, questions_data: list, status: str = POOLED, title: str = "Daily Assessment", day: Optional[date] = None) -> Assessment:
+    """
+    Persists a question set as an Assessment. Pooled sets have no date until served;
+    an active set becomes the current one for `day` (default: today).
+    """
+    now = datetime.utcnow()
+    assessment = Assessment(title=title, status=status, date=now if status == ACTIVE else None)
+    if status == ACTIVE:
+        assessment.assessment_day = day or now.date()
+        retire_day(db, assessment.assessment_day)
+    db.add(assessment)
+    db.flush()
+    # One batched INSERT for the whole set instead of a round trip per question
+    db.execute(insert(Question), [
+        {
+            "assessment_id": assessment.id,
+            "text": q_data["text"],
+            "type": q_data["type"],
+            "options": q_data.get("options"),
+            "correct_answer": q_data.get("correct_answer", ""),
+            "category": q_data.get("category", "General")
+        } for q_data in questions_data
+    ])
+    db.commit()
+    return assessment
+
+
+class AssessmentPool(RefillWorker):
+    name = "Assessment pool"
+
+    def __init__(self, target_depth: int, refill_interval: float):
+        super().__init__(refill_interval)
+        self.target_depth = target_depth
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.rejected = 0
+        self.last_refill_lag = None
+        self.max_refill_lag = 0.0
+        self._deficit_since: Optional[float] = None
+
+    def depth(self, db: Session) -> int:
+        return db.query(func.count(Assessment.id)).filter(Assessment.status == POOLED).scalar()
+
+    def claim(self, db: Session, title: str, day: Optional[date] = None) -> Optional[Assessment]:
+        """
+        Moves the oldest pooled set to active and makes it the current set for `day`
+        (default: today). The conditional UPDATE makes the claim safe across workers.
+        Returns None if drained.
+        """
+        now = datetime.utcnow()
+        day = day or now.date()
+        for _ in range(5):
+            candidate_id = db.query(Assessment.id).filter(Assessment.status == POOLED).order_by(Assessment.id.asc()).limit(1).scalar()
+            if candidate_id is None:
+                break
+            retire_day(db, day)
+            claimed = db.query(Assessment).filter(
+                Assessment.id == candidate_id, Assessment.status == POOLED
+            ).update({"status": ACTIVE, "date": now, "title": title, "assessment_day": day}, synchronize_session=False)
+            if not claimed:
+                db.rollback() # Keep the day's current set if another worker took this one
+                continue
+            db.commit()
+            self.hits += 1
+            self._mark_deficit()
+            return db.get(Assessment, candidate_id)
+
+        self.misses += 1
+        self._mark_deficit()
+        return None
+
+    def _mark_deficit(self):
+        if self._deficit_since is None:
+            self._deficit_since = time.monotonic()
+        self.notify()
+
+    def _depth_now(self) -> int:
+        db = SessionLocal()
+        try:
+            return self.depth(db)
+        finally:
+            db.close()
+
+    def _store(self, questions_data: list):
+        db = SessionLocal()
+        try:
+            store_question_set(db, questions_data)
+        finally:
+            db.close()
+
+    async def refill(self):
+        """
+        Generates sets until the pool is back at target depth.
+        """
+        depth = await anyio.to_thread.run_sync(self._depth_now)
+        budget = 3 * max(self.target_depth - depth, 0) # Give up on a run of invalid sets
+        while depth < self.target_depth:
+            if budget <= 0:
+                raise Exception("Too many invalid question sets from the LLM")
+            budget -= 1
+            # No mock fallback here: during an outage the round fails (refill_errors) and is retried later
+            questions_data = await async_llm.generate_daily_questions(serve_fallback=False)
+            if not is_valid_question_set(questions_data):
+                self.rejected += 1
+                continue
+            await anyio.to_thread.run_sync(self._store, questions_data)
+            self.generated += 1
+            depth += 1
+
+        if self._deficit_since is not None:
+            self.last_refill_lag = time.monotonic() - self._deficit_since
+            self.max_refill_lag = max(self.max_refill_lag, self.last_refill_lag)
+            self._deficit_since = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "target_depth": self.target_depth,
+            "depth": self._depth_now(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "generated": self.generated,
+            "rejected": self.rejected,
+            "refill_errors": self.refill_errors,
+            "last_refill_lag_seconds": self.last_refill_lag,
+            "max_refill_lag_seconds": self.max_refill_lag,
+            "refill_pending_seconds": time.monotonic() - self._deficit_since if self._deficit_since is not None else 0.0,
+        }
+
+
+assessment_pool = AssessmentPool(
+    target_depth=settings.ASSESSMENT_POOL_TARGET_DEPTH,
+    refill_interval=settings.ASSESSMENT_POOL_REFILL_INTERVAL
+)
+metrics.register("assessment_pool", assessment_pool.stats)
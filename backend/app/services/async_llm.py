@@ -0,0 +1,181 @@
+"""
+Async counterparts of the functions in app/services/llm.py.
+
+Prompts, parsing and mock fallbacks are shared with llm.py through its
+CompletionTask classes; only the transport differs. Calls go through the shared
+AsyncOpenAI client, so a single worker can keep hundreds of completions in
+flight without pinning a threadpool thread per request.
+"""
+import asyncio
+
+import anyio
+
+from app.core.config import settings
+from app.services import llm
+from app.services.circuit_breaker import llm_breaker
+from app.services.llm_client import get_async_client
+from app.services.rate_governor import GovernorTimeout, governor
+
+
+async def run_task(task: llm.CompletionTask):
+    """
+    Async version of llm.run_task() with the same retry policy.
+    """
+    if not llm.is_valid_api_key():
+        return task.unavailable()
+
+    last_error = None
+    for attempt in range(task.attempts):
+        last_attempt = attempt == task.attempts - 1
+        if attempt:
+            await asyncio.sleep(llm.retry_delay(attempt, last_error))
+        if not llm_breaker.allow():
+            return task.give_up(llm.circuit_open_error(), rate_limited=False)
+        request = task.request()
+        try:
+            lease = await governor.acquire_async(task.estimated_tokens(request), task.lane)
+        except GovernorTimeout as e:
+            llm_breaker.abandon_probe()
+            print(f"{task.label}: {e}. Using fallback...")
+            return task.give_up(e, rate_limited=True)
+        try:
+            response = await get_async_client().chat.completions.create(
+                model=settings.OPENAI_MODEL_NAME,
+                **request
+            )
+            llm_breaker.record_success()
+            return task.parse(response.choices[0].message.content, last_attempt)
+        except llm.RetryableResponse as e:
+            last_error = e
+            print(f"{task.label}: unusable response (Attempt {attempt+1}): {e}")
+        except Exception as e:
+            last_error = e
+            llm.record_provider_error(e)
+            if llm.is_rate_limit_error(e):
+                print(f"API Rate Limit or Billing Error (Attempt {attempt+1}): {e}")
+                if await anyio.to_thread.run_sync(llm.handle_rate_limit, e, attempt): # Writes the shared governor store
+                    return task.give_up(e, rate_limited=True)
+            else:
+                print(f"{task.label} failed (Attempt {attempt+1}): {e}")
+        finally:
+            await governor.release_async(lease)
+
+    print(f"All API attempts failed for {task.label}. Using fallback...")
+    return task.give_up(last_error, rate_limited=llm.is_rate_limit_error(last_error))
+
+
+async def generate_daily_questions(serve_fallback: bool = True):
+    """
+    Generates 5 MCQs and 1 Subjective question using the LLM.
+    With serve_fallback=False, raises llm.ProviderUnavailable instead of returning a mock set.
+    """
+    task = llm.DailyQuestionsTask()
+    task.serve_fallback = serve_fallback
+    return await run_task(task)
+
+async def generate_coding_problem(difficulty: str = None, serve_fallback: bool = True):
+    """
+    Generates a random coding problem (Easy/Medium/Hard, or the given difficulty) using LLM.
+    With serve_fallback=False, raises llm.ProviderUnavailable instead of returning a mock problem.
+    """
+    task = llm.CodingProblemTask(difficulty)
+    task.serve_fallback = serve_fallback
+    return await run_task(task)
+
+async def evaluate_code(code: str, language: str, problem_title: str):
+    """
+    Simulates code execution and validation using LLM.
+    """
+    return await run_task(llm.EvaluateCodeTask(code, language, problem_title))
+
+async def review_code(code: str, language: str, problem_title: str, test_report: str):
+    """
+    Qualitative review of a solution that was already judged locally.
+    """
+    return await run_task(llm.ReviewCodeTask(code, language, problem_title, test_report))
+
+async def generate_interview_followup(history: list, job_description: str, resume_text: str = "", summary: str = "", turn_count: int = None):
+    """
+    Generates a follow-up interview question based on chat history and context.
+    """
+    return await run_task(llm.InterviewFollowupTask(history, job_description, resume_text, summary, turn_count))
+
+async def summarize_turns(summary: str, turns: list, job_description: str):
+    """
+    Folds turns that left the chat window into the session's running summary.
+    """
+    return await run_task(llm.SummarizeTurnsTask(summary, turns, job_description))
+
+async def generate_interview_feedback(history: list, job_description: str, rubric_notes: list = None):
+    """
+    Analyzes the interview history and generates a detailed feedback report.
+    """
+    return await run_task(llm.InterviewFeedbackTask(history, job_description, rubric_notes))
+
+async def generate_rubric_notes(stage: str, turns: list, job_description: str):
+    """
+    Scores one segment of an interview while it is still in progress.
+    """
+    return await run_task(llm.RubricNotesTask(stage, turns, job_description))
+
+async def stream_interview_followup(history: list, job_description: str, resume_text: str = "", summary: str = "", turn_count: int = None):
+    """
+    Streams the interviewer's next question token by token (stream=True completion).
+    Yields text deltas. If the provider fails before the first token, the usual
+    mock fallback is yielded as a single chunk instead.
+    """
+    task = llm.InterviewFollowupTask(history, job_description, resume_text, summary, turn_count)
+    if not llm.is_valid_api_key():
+        yield task.unavailable()
+        return
+
+    last_error = None
+    for attempt in range(task.attempts):
+        if attempt:
+            await asyncio.sleep(llm.retry_delay(attempt, last_error))
+        if not llm_breaker.allow():
+            yield task.fallback(llm.circuit_open_error(), rate_limited=False)
+            return
+        request = task.request()
+        try:
+            lease = await governor.acquire_async(task.estimated_tokens(request), task.lane)
+        except GovernorTimeout as e:
+            llm_breaker.abandon_probe()
+            print(f"{task.label}: {e}. Using fallback...")
+            yield task.fallback(e, rate_limited=True)
+            return
+        started = False
+        try:
+            stream = await get_async_client().chat.completions.create(
+                model=settings.OPENAI_MODEL_NAME,
+                stream=True,
+                **request
+            )
+            llm_breaker.record_success()
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    started = True
+                    yield delta
+            return
+        except Exception as e:
+            if started:
+                # Part of the answer already reached the candidate; end the turn there
+                print(f"{task.label}: stream interrupted: {e}")
+                return
+            last_error = e
+            llm.record_provider_error(e)
+            if llm.is_rate_limit_error(e):
+                print(f"API Rate Limit or Billing Error (Attempt {attempt+1}): {e}")
+                if await anyio.to_thread.run_sync(llm.handle_rate_limit, e, attempt): # Writes the shared governor store
+                    yield task.fallback(e, rate_limited=True)
+                    return
+            else:
+                print(f"{task.label} failed (Attempt {attempt+1}): {e}")
+        finally:
+            # Held until the stream ends, so in-flight counts cover streamed turns too
+            await governor.release_async(lease)
+
+    yield task.fallback(last_error, rate_limited=llm.is_rate_limit_error(last_error))
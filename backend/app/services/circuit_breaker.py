@@ -0,0 +1,112 @@
+"""
+Circuit breaker around the LLM provider.
+
+closed    -> calls go through; LLM_BREAKER_FAILURE_THRESHOLD consecutive outage
+             errors (connection errors, timeouts, 5xx) open the circuit.
+open      -> calls are refused at once and callers serve their mock fallback,
+             instead of each one waiting out its own timeouts.
+half_open -> after LLM_BREAKER_RECOVERY_SECONDS one probe call is let through;
+             success closes the circuit, failure opens it again.
+
+Any answer from the provider (including 4xx/429) counts as success: the
+provider is reachable, and rate limits are the rate governor's business.
+One breaker per process, shared by every LLM function.
+"""
+import threading
+import time
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The provider is considered down; serve the fallback without calling it."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, recovery_seconds: float, enabled: bool = True):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.enabled = enabled
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """
+        True if a call may go to the provider. In half_open only one probe is
+        let through at a time (a probe that never reports back expires after
+        recovery_seconds).
+        """
+        if not self.enabled or self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now - self.opened_at >= self.recovery_seconds:
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN and (self._probe_started is None or now - self._probe_started >= self.recovery_seconds):
+                self._probe_started = now
+                return True
+            if self.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        if self.state == CLOSED and self.failures == 0:
+            return
+        with self._lock:
+            if self.state != CLOSED:
+                print("LLM circuit closed: provider is answering again")
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                print(f"LLM circuit open for {self.recovery_seconds}s after {self.failures} failure(s): {self.last_error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+                self.times_opened += 1
+
+    def abandon_probe(self):
+        """The allowed call never reached the provider (e.g. it timed out in the rate governor queue)."""
+        with self._lock:
+            self._probe_started = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {
+                "enabled": self.enabled,
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+            if self.state == OPEN:
+                snapshot["retry_in_seconds"] = round(max(self.recovery_seconds - (time.monotonic() - self.opened_at), 0.0), 1)
+            return snapshot
+
+
+llm_breaker = CircuitBreaker(
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    recovery_seconds=settings.LLM_BREAKER_RECOVERY_SECONDS,
+    enabled=settings.LLM_BREAKER_ENABLED
+)
+metrics.register("llm_breaker", llm_breaker.snapshot)
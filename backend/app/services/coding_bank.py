@@ -0,0 +1,235 @@
+"""
+Coding problem bank.
+
+Problems are stored once (deduplicated by a fingerprint of the normalized
+title and description) and reused across users. GET /coding/daily picks an
+unseen problem for the user, optionally at a given difficulty, and the
+background generator only calls the LLM when the bank runs low.
+"""
+import hashlib
+import json
+import random
+import re
+from datetime import datetime
+from typing import Optional
+
+import anyio
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.coding import CodingProblem, CodingProblemView
+from app.services import async_llm, llm
+from app.services.refill_worker import RefillWorker
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+
+def problem_fingerprint(title: str, description: str) -> str:
+    key = f"{normalize_text(title)}\n{normalize_text(description)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def normalize_difficulty(difficulty: Optional[str]) -> Optional[str]:
+    if not difficulty:
+        return None
+    for d in DIFFICULTIES:
+        if d.lower() == difficulty.strip().lower():
+            return d
+    return None
+
+
+def serialize_problem(problem: CodingProblem) -> dict:
+    return {
+        "id": problem.id,
+        "title": problem.title,
+        "description": problem.description,
+        "difficulty": problem.difficulty,
+        "test_cases": json.loads(problem.test_cases) if problem.test_cases else []
+    }
+
+
+def add_problem(db: Session, problem_data: dict) -> Optional[CodingProblem]:
+    """
+    Inserts a generated problem unless an equivalent one is already banked.
+    Returns None for duplicates and for payloads without test cases.
+    """
+    title = problem_data.get("title")
+    description = problem_data.get("description")
+    test_cases = problem_data.get("test_cases")
+    if not title or not description or not isinstance(test_cases, list) or not test_cases:
+        return None
+
+    title_key = normalize_text(title)
+    fingerprint = problem_fingerprint(title, description)
+    duplicate = db.query(CodingProblem.id).filter(
+        or_(CodingProblem.fingerprint == fingerprint, CodingProblem.title_key == title_key)
+    ).first()
+    if duplicate:
+        return None
+
+    problem = CodingProblem(
+        title=title,
+        description=description,
+        difficulty=normalize_difficulty(problem_data.get("difficulty")) or "Medium",
+        test_cases=json.dumps(test_cases),
+        title_key=title_key,
+        fingerprint=fingerprint
+    )
+    db.add(problem)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker banked the same problem first
+        db.rollback()
+        return None
+    return problem
+
+
+class CodingBank(RefillWorker):
+    name = "Coding bank"
+
+    def __init__(self, refill_interval: float):
+        super().__init__(refill_interval)
+        self.served = 0
+        self.repeats = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.low_events = 0
+        self._wanted = set()
+
+    def request_top_up(self, difficulty: Optional[str]):
+        self.low_events += 1
+        self._wanted.update([difficulty] if difficulty else DIFFICULTIES)
+        self.notify()
+
+    def pick(self, db: Session, user_id: int, difficulty: Optional[str] = None, refresh: bool = False) -> Optional[CodingProblem]:
+        """
+        Returns today's problem for the user, or a new unseen one when refreshing.
+        """
+        difficulty = normalize_difficulty(difficulty)
+
+        if not refresh:
+            today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+            current = db.query(CodingProblem).join(
+                CodingProblemView, CodingProblemView.problem_id == CodingProblem.id
+            ).filter(CodingProblemView.user_id == user_id, CodingProblemView.seen_at >= today_start)
+            if difficulty:
+                current = current.filter(CodingProblem.difficulty == difficulty)
+            problem = current.order_by(CodingProblemView.seen_at.desc()).first()
+            if problem:
+                return problem
+
+        seen = db.query(CodingProblemView.problem_id).filter(CodingProblemView.user_id == user_id)
+        candidates = db.query(CodingProblem).filter(CodingProblem.fingerprint.isnot(None), ~CodingProblem.id.in_(seen))
+        if difficulty:
+            candidates = candidates.filter(CodingProblem.difficulty == difficulty)
+
+        unseen = candidates.count()
+        if unseen <= settings.CODING_BANK_LOW_WATERMARK:
+            self.request_top_up(difficulty)
+
+        if unseen:
+            problem = candidates.order_by(CodingProblem.id).offset(random.randrange(unseen)).first()
+        else:
+            # User has seen everything at this level: repeat the one seen longest ago
+            self.repeats += 1
+            oldest = db.query(CodingProblem).join(
+                CodingProblemView, CodingProblemView.problem_id == CodingProblem.id
+            ).filter(CodingProblemView.user_id == user_id, CodingProblem.fingerprint.isnot(None))
+            if difficulty:
+                oldest = oldest.filter(CodingProblem.difficulty == difficulty)
+            problem = oldest.order_by(CodingProblemView.seen_at.asc()).first()
+
+        if problem is None:
+            return None
+
+        self._mark_seen(db, user_id, problem.id)
+        self.served += 1
+        return problem
+
+    def _mark_seen(self, db: Session, user_id: int, problem_id: int):
+        updated = db.query(CodingProblemView).filter(
+            CodingProblemView.user_id == user_id, CodingProblemView.problem_id == problem_id
+        ).update({"seen_at": datetime.utcnow()}, synchronize_session=False)
+        if not updated:
+            db.add(CodingProblemView(user_id=user_id, problem_id=problem_id, seen_at=datetime.utcnow()))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+    def counts(self, db: Session) -> dict:
+        rows = db.query(CodingProblem.difficulty, func.count(CodingProblem.id)).filter(
+            CodingProblem.fingerprint.isnot(None)
+        ).group_by(CodingProblem.difficulty).all()
+        counts = {d: 0 for d in DIFFICULTIES}
+        counts.update({d: n for d, n in rows if d in counts})
+        return counts
+
+    def _counts_now(self) -> dict:
+        db = SessionLocal()
+        try:
+            return self.counts(db)
+        finally:
+            db.close()
+
+    def _store(self, problem_data: dict) -> bool:
+        db = SessionLocal()
+        try:
+            return add_problem(db, problem_data) is not None
+        finally:
+            db.close()
+
+    async def refill(self):
+        """
+        Generates a batch for every difficulty that is below the minimum or was reported low.
+        """
+        if not llm.is_valid_api_key():
+            return
+        counts = await anyio.to_thread.run_sync(self._counts_now)
+        wanted = {d for d, n in counts.items() if n < settings.CODING_BANK_MIN_PER_DIFFICULTY}
+        wanted |= self._wanted
+        self._wanted = set()
+
+        for difficulty in sorted(wanted):
+            for _ in range(settings.CODING_BANK_BATCH_SIZE):
+                problem_data = await async_llm.generate_coding_problem(difficulty, serve_fallback=False)
+                if await anyio.to_thread.run_sync(self._store, problem_data):
+                    self.generated += 1
+                else:
+                    self.duplicates += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self._counts_now(),
+            "served": self.served,
+            "repeats": self.repeats,
+            "generated": self.generated,
+            "duplicates_rejected": self.duplicates,
+            "low_events": self.low_events,
+            "refill_errors": self.refill_errors,
+        }
+
+
+def seed_bank():
+    """
+    Banks the built-in mock problems so the endpoint never starts empty.
+    """
+    db = SessionLocal()
+    try:
+        for problem_data in llm.MOCK_CODING_PROBLEMS:
+            add_problem(db, problem_data)
+    finally:
+        db.close()
+
+
+coding_bank = CodingBank(refill_interval=settings.CODING_BANK_REFILL_INTERVAL)
+metrics.register("coding_bank", coding_bank.stats)
@@ -0,0 +1,213 @@
+"""
+Today's assessment: indexed lookup plus an in-process cache.
+
+Assessment.assessment_day (unique, indexed) marks each day's current set, so
+finding it is one index probe instead of a range scan over Assessment.date.
+The set (id, questions loaded with selectinload, and the encoded response
+body) is cached per day. Replacing the day's set in this process drops the
+entry at once (invalidate()); other workers re-read it after DAILY_ASSESSMENT_CACHE_TTL
+seconds, and grading always re-validates it against the index, so an answer
+sheet is never graded against a replaced set.
+
+Grading uses an AnswerKey per assessment (question id -> correct answer and
+the prebuilt result entries), cached by assessment id. Question sets never
+change once stored, so a hit needs no DB access at all; answers carrying ids
+from another set are rejected instead of being graded against the wrong one.
+"""
+import json
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.assessment import Assessment
+from app.services.assessment_pool import ACTIVE
+
+
+class DailySet:
+    def __init__(self, assessment_id: int, questions: list):
+        self.id = assessment_id
+        self.questions = questions # Plain dicts, safe to share between requests
+        # Old or broken sets ("General" categories, MCQs without an answer) are regenerated (auto-heal)
+        self.needs_regeneration = any(
+            q["category"] in (None, "General") or (q["type"] == "mcq" and q["correct_answer"] is None)
+            for q in questions
+        )
+        self.response = {"assessment_id": assessment_id, "questions": [
+            {
+                "id": q["id"],
+                "text": q["text"],
+                "type": q["type"],
+                "options": q["options"],
+                "correct_answer": q["correct_answer"] or "",
+                "category": q["category"] or "General"
+            } for q in questions
+        ]}
+        # Encoded once; GET /daily sends these bytes as-is
+        self.body = json.dumps(self.response, separators=(",", ":")).encode()
+        self.answer_key = AnswerKey(assessment_id, questions)
+
+
+class AnswerKey:
+    """
+    Everything needed to grade one assessment, built once: the result entry for
+    every possible MCQ choice (and for no answer) is prebuilt, so grading is a
+    dict lookup per question.
+    """
+
+    def __init__(self, assessment_id: int, questions: list):
+        self.assessment_id = assessment_id
+        self.order = [q["id"] for q in questions]
+        self.questions = {q["id"]: q for q in questions}
+        self.mcq_count = sum(1 for q in questions if q["type"] == "mcq")
+        self.results = {} # question id -> {answer: result entry} (MCQ) or the base entry (subjective)
+        self.choices = {} # question id -> allowed MCQ answers (None when the question has no options)
+        for q in questions:
+            correct = q["correct_answer"] or ""
+            if q["type"] == "mcq":
+                self.choices[q["id"]] = frozenset(q["options"]) if q["options"] else None
+                self.results[q["id"]] = {
+                    answer: self._mcq_result(q, answer) for answer in [None, *(q["options"] or [])]
+                }
+            elif q["type"] == "subjective":
+                self.results[q["id"]] = {
+                    "question": q["text"],
+                    "user_answer": None,
+                    "model_answer": correct,
+                    "category": q["category"],
+                    "type": "subjective",
+                    "note": "Please compare your answer with the model answer provided below."
+                }
+
+    @staticmethod
+    def _mcq_result(q: dict, answer: Optional[str]) -> dict:
+        is_correct = answer is not None and answer == q["correct_answer"]
+        if is_correct:
+            explanation = "Correct! Well done."
+        elif answer:
+            explanation = f"You selected: '{answer}'. The correct answer is: '{q['correct_answer']}'"
+        else:
+            explanation = f"You didn't select an answer. The correct answer is: '{q['correct_answer']}'"
+        return {
+            "question": q["text"],
+            "user_answer": answer,
+            "correct_answer": q["correct_answer"] or "",
+            "is_correct": is_correct,
+            "category": q["category"],
+            "explanation": explanation
+        }
+
+    def grade(self, answers: dict) -> dict:
+        """
+        Grades {question id: answer} in one pass over the set. Raises ValueError
+        for ids outside this assessment and MCQ answers that aren't one of its options.
+        """
+        try:
+            answers = {int(question_id): answer for question_id, answer in answers.items()}
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError("Responses must be an object keyed by question id")
+        if not all(answer is None or isinstance(answer, str) for answer in answers.values()):
+            raise ValueError("Answers must be strings")
+        unknown = answers.keys() - self.questions.keys()
+        if unknown:
+            raise ValueError(f"Question(s) {sorted(unknown)} are not part of assessment {self.assessment_id}")
+
+        correct_count = 0
+        results = []
+        for question_id in self.order:
+            entries = self.results.get(question_id)
+            if entries is None:
+                continue
+            answer = answers.get(question_id) or None
+            if question_id in self.choices:
+                result = entries.get(answer)
+                if result is None:
+                    if self.choices[question_id] is not None:
+                        raise ValueError(f"'{answer}' is not an option of question {question_id}")
+                    result = self._mcq_result(self.questions[question_id], answer) # No options to prebuild from
+                correct_count += result["is_correct"]
+            else:
+                result = entries if answer is None else dict(entries, user_answer=answer)
+            results.append(result)
+
+        return {
+            "score": int(correct_count / self.mcq_count * 100) if self.mcq_count else 0,
+            "correct_count": correct_count,
+            "total_count": self.mcq_count,
+            "results": results,
+            # Stored on the attempt as question text -> answer, the shape the report page shows
+            "responses": {self.questions[question_id]["text"]: answer for question_id, answer in answers.items() if answer}
+        }
+
+
+_cache = TTLCache(maxsize=4, ttl=settings.DAILY_ASSESSMENT_CACHE_TTL) # day -> DailySet
+metrics.register("daily_assessment_cache", _cache.stats)
+_answer_keys = TTLCache(maxsize=settings.ANSWER_KEY_CACHE_SIZE, ttl=24 * 3600.0) # assessment id -> AnswerKey
+metrics.register("answer_key_cache", _answer_keys.stats)
+
+
+def current_id(db: Session, day: date) -> Optional[int]:
+    return db.query(Assessment.id).filter(Assessment.assessment_day == day).scalar()
+
+
+def _load(db: Session, **filters) -> Optional[DailySet]:
+    # The assessment and all of its questions in one round trip each (no lazy loads)
+    assessment = db.query(Assessment).options(selectinload(Assessment.questions)).filter_by(**filters).first()
+    if assessment is None:
+        return None
+    return DailySet(assessment.id, [
+        {
+            "id": q.id,
+            "text": q.text,
+            "type": q.type,
+            "options": q.options,
+            "correct_answer": q.correct_answer,
+            "category": q.category,
+        } for q in sorted(assessment.questions, key=lambda q: q.id)
+    ])
+
+
+def cached(day: date) -> Optional[DailySet]:
+    """The cached set for `day`, if any, without touching the DB."""
+    return _cache.get(day)
+
+
+def get_today(db: Session, day: date, validate: bool = False) -> Optional[DailySet]:
+    """
+    The current set for `day`, or None. With validate=True the cached id is
+    checked against the index first (one probe; the questions still come from cache).
+    """
+    cached = _cache.get(day)
+    if cached is not None and not validate:
+        return cached
+    if cached is not None and cached.id == current_id(db, day):
+        return cached
+    daily_set = _load(db, assessment_day=day)
+    if daily_set is None:
+        _cache.pop(day)
+        return None
+    _cache.set(day, daily_set)
+    _answer_keys.set(daily_set.id, daily_set.answer_key)
+    return daily_set
+
+
+def answer_key(db: Session, assessment_id: int) -> Optional[AnswerKey]:
+    """The answer key of a served (active) assessment, or None. Cached by id."""
+    key = _answer_keys.get(assessment_id)
+    if key is not None:
+        return key
+    daily_set = _load(db, id=assessment_id, status=ACTIVE)
+    if daily_set is None:
+        return None
+    _answer_keys.set(assessment_id, daily_set.answer_key)
+    return daily_set.answer_key
+
+
+def invalidate(day: date):
+    """Drops `day`'s cached set and its answer key; called once the day's set is replaced or re-claimed."""
+    replaced = _cache.pop(day)
+    if replaced is not None:
+        _answer_keys.pop(replaced.id) # Reloaded by id if a submission still names the old set
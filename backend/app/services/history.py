@@ -0,0 +1,115 @@
+"""
+Keyset-paginated activity history for /profile/history.
+
+Each list (assessments, coding, interviews) is read newest first by
+(timestamp, id) off the user's composite index, one page at a time: a page
+is "the next `limit` rows older than the cursor", so deep pages cost the
+same as the first and rows inserted meanwhile don't shift them. Only the
+listed columns are selected (never code, responses or feedback), and the
+display date is computed by the database.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.assessment import UserAssessmentAttempt
+from app.models.coding import CodingSubmission
+from app.models.interview import InterviewSession
+
+
+def _day(value) -> str:
+    """func.date() is a 'YYYY-MM-DD' string on SQLite but a date on PostgreSQL."""
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _assessment_item(row) -> dict:
+    return {
+        "id": row.id,
+        "type": "Assessment",
+        "title": f"Daily Assessment {row.day}",
+        "score": f"{row.score}%" if row.score is not None else "N/A",
+        "date": _day(row.day),
+        "status": "Completed"
+    }
+
+
+def _coding_item(row) -> dict:
+    return {
+        "id": row.id,
+        "type": "Coding",
+        "title": f"Coding Problem #{row.problem_id}", # Ideal: Join with Problem table
+        "score": row.status,
+        "date": _day(row.day),
+        "status": row.status
+    }
+
+
+def _interview_item(row) -> dict:
+    return {
+        "id": row.id,
+        "type": "Interview",
+        "title": "Mock Interview Session",
+        "score": f"{row.score}/100" if row.score else "Pending",
+        "date": _day(row.day),
+        "status": row.status
+    }
+
+
+# kind -> (model, ordering timestamp column, extra columns, row formatter)
+KINDS = {
+    "assessments": (UserAssessmentAttempt, UserAssessmentAttempt.timestamp, [UserAssessmentAttempt.score], _assessment_item),
+    "coding": (CodingSubmission, CodingSubmission.timestamp, [CodingSubmission.problem_id, CodingSubmission.status], _coding_item),
+    "interviews": (InterviewSession, InterviewSession.created_at, [InterviewSession.score, InterviewSession.status], _interview_item),
+}
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp.isoformat(), row_id]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Raises ValueError for anything that isn't a cursor this module issued."""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def page(db: Session, kind: str, user_id: int, limit: int, cursor: Optional[str] = None) -> tuple:
+    """
+    Up to `limit` items older than `cursor` (newest first), and the cursor of the
+    next page (None on the last one).
+    """
+    model, timestamp, columns, item = KINDS[kind]
+    query = db.query(
+        model.id, timestamp.label("ts"), func.date(timestamp).label("day"), *columns
+    ).filter(model.user_id == user_id)
+    if cursor:
+        query = query.filter(tuple_(timestamp, model.id) < decode_cursor(cursor))
+    rows = query.order_by(timestamp.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].ts, rows[limit - 1].id) if len(rows) > limit else None
+    return [item(row) for row in rows[:limit]], next_cursor
+
+
+def export_ndjson(kind: str, user_id: int, cursor: Optional[str] = None) -> Iterator[str]:
+    """
+    Every item older than `cursor`, one JSON object per line. Runs page by page on
+    its own session (released between pages), so a long export holds no
+    connection or read transaction while the client is slow to read.
+    """
+    while True:
+        db = SessionLocal()
+        try:
+            items, cursor = page(db, kind, user_id, settings.HISTORY_EXPORT_BATCH, cursor)
+        finally:
+            db.close()
+        yield "".join(json.dumps(item) + "\n" for item in items)
+        if cursor is None:
+            return
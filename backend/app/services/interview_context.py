@@ -0,0 +1,174 @@
+"""
+Prompt context for the interview chat.
+
+Each turn sends the most recent messages that fit INTERVIEW_CONTEXT_TOKEN_BUDGET,
+newest first, plus a rolling summary of everything older. The summary is cached
+on InterviewSession (context_summary, with summary_upto_id as the watermark of
+the last message folded in) and is extended incrementally in the background
+once turns slide out of the window (an "interview_summary" job), so no turn
+ever re-reads the whole transcript.
+"""
+from typing import Optional
+
+import anyio
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.interview import InterviewSession, InterviewMessage
+from app.services import async_llm, job_queue, llm
+from app.services.tokens import message_tokens, prompt_tokens
+
+
+class InterviewContext:
+    def __init__(self, history: list, summary: str, turn_count: int, window_start_id: Optional[int], unsummarized_before_window: bool):
+        self.history = history
+        self.summary = summary
+        self.turn_count = turn_count
+        self.window_start_id = window_start_id
+        self.unsummarized_before_window = unsummarized_before_window
+        self.prompt_tokens = 0
+
+    def followup_kwargs(self) -> dict:
+        return {"summary": self.summary, "turn_count": self.turn_count}
+
+
+class ContextStats:
+    def __init__(self):
+        self.turns = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_last = 0
+        self.prompt_tokens_max = 0
+        self.summaries = 0
+        self.summary_errors = 0
+
+    def record_turn(self, tokens: int):
+        self.turns += 1
+        self.prompt_tokens_total += tokens
+        self.prompt_tokens_last = tokens
+        self.prompt_tokens_max = max(self.prompt_tokens_max, tokens)
+
+    def snapshot(self) -> dict:
+        return {
+            "turns": self.turns,
+            "prompt_tokens_avg": round(self.prompt_tokens_total / self.turns, 1) if self.turns else None,
+            "prompt_tokens_last": self.prompt_tokens_last,
+            "prompt_tokens_max": self.prompt_tokens_max,
+            "summaries": self.summaries,
+            "summary_errors": self.summary_errors,
+        }
+
+
+stats = ContextStats()
+metrics.register("interview_context", stats.snapshot)
+
+
+def build_context(db: Session, session: InterviewSession) -> InterviewContext:
+    """
+    Recent messages within the token budget (oldest first) plus the cached summary.
+    Messages already folded into the summary are never resent verbatim.
+    """
+    watermark = session.summary_upto_id or 0
+    total = db.query(func.count(InterviewMessage.id)).filter(InterviewMessage.session_id == session.id).scalar()
+    recent = db.query(InterviewMessage).filter(
+        InterviewMessage.session_id == session.id,
+        InterviewMessage.id > watermark
+    ).order_by(InterviewMessage.id.desc()).limit(settings.INTERVIEW_CONTEXT_MAX_MESSAGES + 1).all()
+
+    window = []
+    used = 0
+    for msg in recent[:settings.INTERVIEW_CONTEXT_MAX_MESSAGES]:
+        tokens = message_tokens({"content": msg.content})
+        if window and used + tokens > settings.INTERVIEW_CONTEXT_TOKEN_BUDGET:
+            break
+        window.append(msg)
+        used += tokens
+    window.reverse()
+
+    context = InterviewContext(
+        history=[{"role": msg.role, "content": msg.content} for msg in window],
+        summary=session.context_summary or "",
+        turn_count=total // 2,
+        window_start_id=window[0].id if window else None,
+        unsummarized_before_window=len(window) < len(recent)
+    )
+    task = llm.InterviewFollowupTask(
+        context.history, session.job_description, session.resume_text or "", **context.followup_kwargs()
+    )
+    context.prompt_tokens = prompt_tokens(task.request()["messages"])
+    return context
+
+
+def _load_unsummarized(session_id: int, before_id: int):
+    db = SessionLocal()
+    try:
+        session = db.get(InterviewSession, session_id)
+        if session is None:
+            return None
+        turns = db.query(InterviewMessage).filter(
+            InterviewMessage.session_id == session_id,
+            InterviewMessage.id > (session.summary_upto_id or 0),
+            InterviewMessage.id < before_id
+        ).order_by(InterviewMessage.id.asc()).all()
+        if not turns:
+            return None
+        return {
+            "summary": session.context_summary or "",
+            "watermark": session.summary_upto_id,
+            "job_description": session.job_description,
+            "turns": [{"role": t.role, "content": t.content} for t in turns],
+            "upto_id": turns[-1].id,
+        }
+    finally:
+        db.close()
+
+
+def _save_summary(session_id: int, expected_watermark: Optional[int], summary: str, upto_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        watermark_matches = (
+            InterviewSession.summary_upto_id.is_(None) if expected_watermark is None
+            else InterviewSession.summary_upto_id == expected_watermark
+        )
+        # Conditional on the watermark we read, so concurrent workers never fold turns twice
+        updated = db.query(InterviewSession).filter(InterviewSession.id == session_id, watermark_matches).update(
+            {"context_summary": summary, "summary_upto_id": upto_id}, synchronize_session=False
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+@job_queue.handler("interview_summary")
+async def refresh_summary(payload: dict) -> dict:
+    """
+    Folds every unsummarized message older than payload["before_id"] into the session summary.
+    """
+    session_id = payload["session_id"]
+    try:
+        pending = await anyio.to_thread.run_sync(_load_unsummarized, session_id, payload["before_id"])
+        if pending is None:
+            return {"updated": False}
+        summary = await async_llm.summarize_turns(pending["summary"], pending["turns"], pending["job_description"])
+        updated = await anyio.to_thread.run_sync(_save_summary, session_id, pending["watermark"], summary, pending["upto_id"])
+    except Exception:
+        stats.summary_errors += 1
+        raise
+    if updated:
+        stats.summaries += 1
+    return {"updated": updated, "summary_upto_id": pending["upto_id"]}
+
+
+def schedule_summary(db: Session, session_id: int, context: InterviewContext):
+    """
+    Queues a summary update if turns have slid out of the window.
+    """
+    if not context.unsummarized_before_window or context.window_start_id is None:
+        return
+    job_queue.enqueue(
+        db, "interview_summary", {"session_id": session_id, "before_id": context.window_start_id},
+        dedupe_key=f"interview_summary:{session_id}"
+    )
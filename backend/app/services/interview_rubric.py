@@ -0,0 +1,177 @@
+"""
+Incremental interview assessment.
+
+While the interview runs, every INTERVIEW_RUBRIC_SEGMENT_MESSAGES new messages
+are scored by an "interview_rubric" job and appended to
+InterviewSession.rubric_notes (rubric_upto_id is the watermark). /end queues an
+"interview_feedback" job that only merges those partial notes with the short
+un-noted tail, so its latency does not grow with the length of the interview
+and no part of the transcript is dropped.
+"""
+import time
+from typing import Optional
+
+import anyio
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.interview import InterviewSession, InterviewMessage
+from app.services import async_llm, job_queue, llm, user_stats
+
+
+class RubricStats:
+    def __init__(self):
+        self.segments = 0
+        self.errors = 0
+        self.feedback_calls = 0
+        self.feedback_seconds_total = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "segments_noted": self.segments,
+            "errors": self.errors,
+            "feedback_calls": self.feedback_calls,
+            "feedback_seconds_avg": round(self.feedback_seconds_total / self.feedback_calls, 3) if self.feedback_calls else None,
+        }
+
+
+stats = RubricStats()
+metrics.register("interview_rubric", stats.snapshot)
+
+
+def _next_segment(session_id: int) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        session = db.get(InterviewSession, session_id)
+        if session is None:
+            return None
+        watermark = session.rubric_upto_id or 0
+        segment = db.query(InterviewMessage).filter(
+            InterviewMessage.session_id == session_id,
+            InterviewMessage.id > watermark
+        ).order_by(InterviewMessage.id.asc()).limit(settings.INTERVIEW_RUBRIC_SEGMENT_MESSAGES).all()
+        if len(segment) < settings.INTERVIEW_RUBRIC_SEGMENT_MESSAGES:
+            return None
+        # Stage of the segment's last turn, counted over the whole session
+        before = db.query(func.count(InterviewMessage.id)).filter(
+            InterviewMessage.session_id == session_id,
+            InterviewMessage.id <= segment[-1].id
+        ).scalar()
+        return {
+            "watermark": session.rubric_upto_id,
+            "notes": list(session.rubric_notes or []),
+            "job_description": session.job_description,
+            "stage": llm.interview_stage(max(before // 2 - 1, 0)),
+            "turns": [{"role": m.role, "content": m.content} for m in segment],
+            "from_id": segment[0].id,
+            "upto_id": segment[-1].id,
+        }
+    finally:
+        db.close()
+
+
+def _append_note(session_id: int, expected_watermark: Optional[int], notes: list, upto_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        watermark_matches = (
+            InterviewSession.rubric_upto_id.is_(None) if expected_watermark is None
+            else InterviewSession.rubric_upto_id == expected_watermark
+        )
+        updated = db.query(InterviewSession).filter(InterviewSession.id == session_id, watermark_matches).update(
+            {"rubric_notes": notes, "rubric_upto_id": upto_id}, synchronize_session=False
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+@job_queue.handler("interview_rubric")
+async def refresh_rubric(payload: dict) -> dict:
+    """
+    Notes every complete segment past the watermark, one LLM call per segment.
+    """
+    session_id = payload["session_id"]
+    noted = 0
+    try:
+        while True:
+            segment = await anyio.to_thread.run_sync(_next_segment, session_id)
+            if segment is None:
+                break
+            note = await async_llm.generate_rubric_notes(segment["stage"], segment["turns"], segment["job_description"])
+            note = dict(note, stage=segment["stage"], from_id=segment["from_id"], upto_id=segment["upto_id"])
+            saved = await anyio.to_thread.run_sync(
+                _append_note, session_id, segment["watermark"], segment["notes"] + [note], segment["upto_id"]
+            )
+            if not saved:
+                break # Another worker noted this segment first
+            noted += 1
+            stats.segments += 1
+    except Exception:
+        stats.errors += 1
+        raise
+    return {"segments_noted": noted}
+
+
+def schedule_rubric(db: Session, session: InterviewSession):
+    """
+    Queues a rubric job once a full segment is waiting past the watermark.
+    """
+    waiting = db.query(func.count(InterviewMessage.id)).filter(
+        InterviewMessage.session_id == session.id,
+        InterviewMessage.id > (session.rubric_upto_id or 0)
+    ).scalar()
+    if waiting >= settings.INTERVIEW_RUBRIC_SEGMENT_MESSAGES:
+        job_queue.enqueue(db, "interview_rubric", {"session_id": session.id}, dedupe_key=f"interview_rubric:{session.id}")
+
+
+def _feedback_inputs(session_id: int) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        session = db.get(InterviewSession, session_id)
+        if session is None:
+            return None
+        # Only the short tail after the last note is sent verbatim
+        tail = db.query(InterviewMessage).filter(
+            InterviewMessage.session_id == session_id,
+            InterviewMessage.id > (session.rubric_upto_id or 0)
+        ).order_by(InterviewMessage.id.asc()).all()
+        return {
+            "history": [{"role": m.role, "content": m.content} for m in tail],
+            "job_description": session.job_description,
+            "rubric_notes": list(session.rubric_notes or []),
+        }
+    finally:
+        db.close()
+
+
+def _store_feedback(session_id: int, feedback: dict):
+    db = SessionLocal()
+    try:
+        session = db.get(InterviewSession, session_id)
+        session.feedback = feedback
+        session.score = feedback.get("score", 0)
+        user_stats.record_interview_score(db, session.user_id, session_id, session.score)
+        db.commit()
+    finally:
+        db.close()
+
+
+@job_queue.handler("interview_feedback")
+async def generate_feedback(payload: dict) -> dict:
+    """
+    Final report for an ended interview: merges the rubric notes with the un-noted tail.
+    """
+    session_id = payload["session_id"]
+    inputs = await anyio.to_thread.run_sync(_feedback_inputs, session_id)
+    if inputs is None:
+        raise LookupError(f"Interview session {session_id} not found")
+    started = time.perf_counter()
+    feedback = await async_llm.generate_interview_feedback(inputs["history"], inputs["job_description"], inputs["rubric_notes"])
+    stats.feedback_calls += 1
+    stats.feedback_seconds_total += time.perf_counter() - started
+    await anyio.to_thread.run_sync(_store_feedback, session_id, feedback)
+    return {"session_id": session_id, "feedback": feedback}
@@ -0,0 +1,303 @@
+"""
+Durable background job queue for long LLM tasks.
+
+Jobs live in the Job table, so they survive restarts and can be picked up by
+any app process. Each process runs JOB_WORKERS asyncio workers that claim jobs
+with a conditional UPDATE (queued -> running, with a lease). The lease is
+renewed every third of JOB_LEASE_SECONDS while the handler runs, so slow jobs
+are not claimed twice; a job whose worker died is re-claimed once its lease
+expires, and a worker that finds its lease taken over abandons the job.
+Failed jobs are retried with exponential backoff up to JOB_MAX_ATTEMPTS.
+
+Handlers are async functions taking the job payload and returning a JSON-able
+result, registered with @handler("kind"). Clients poll GET /jobs/{id} or
+listen on GET /jobs/{id}/events (SSE).
+"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+import anyio
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL = (SUCCEEDED, FAILED)
+
+_handlers: Dict[str, Callable] = {}
+
+
+def handler(kind: str):
+    """
+    Registers an async job handler: `async def fn(payload: dict) -> dict`.
+    """
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def serialize_job(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def enqueue(db: Session, kind: str, payload: dict, user_id: Optional[int] = None, dedupe_key: Optional[str] = None) -> Job:
+    """
+    Stores a job and wakes the workers. With dedupe_key, returns the job that is
+    already queued or running for that key instead of adding another.
+    """
+    if dedupe_key:
+        existing = db.query(Job).filter(Job.dedupe_key == dedupe_key, Job.status.in_((QUEUED, RUNNING))).first()
+        if existing:
+            return existing
+    job = Job(kind=kind, payload=payload, user_id=user_id, dedupe_key=dedupe_key, status=QUEUED, run_after=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    job_queue.enqueued += 1
+    job_queue.notify()
+    return job
+
+
+class JobQueue:
+    def __init__(self, workers: int, poll_interval: float, lease_seconds: float, max_attempts: int, retry_backoff: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.enqueued = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.leases_lost = 0
+        self.running = 0
+        self._worker_ids = []
+        self._tasks = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def notify(self):
+        """Wakes idle workers; safe to call from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _claim(self, worker_id: str) -> Optional[dict]:
+        db = SessionLocal()
+        try:
+            for _ in range(5):
+                now = datetime.utcnow()
+                claimable = or_(
+                    and_(Job.status == QUEUED, Job.run_after <= now),
+                    and_(Job.status == RUNNING, Job.lease_expires_at < now) # Worker died mid-job
+                )
+                candidate_id = db.query(Job.id).filter(claimable).order_by(Job.id.asc()).limit(1).scalar()
+                if candidate_id is None:
+                    return None
+                claimed = db.query(Job).filter(Job.id == candidate_id, claimable).update({
+                    "status": RUNNING,
+                    "locked_by": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now,
+                    "attempts": Job.attempts + 1
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    job = db.get(Job, candidate_id)
+                    return {"id": job.id, "kind": job.kind, "payload": job.payload or {}, "attempts": job.attempts}
+            return None
+        finally:
+            db.close()
+
+    def _finish(self, job: dict, worker_id: str, result=None, error: Optional[str] = None) -> str:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            if error is None:
+                values = {"status": SUCCEEDED, "result": result, "error": None, "finished_at": now}
+            elif job["attempts"] < self.max_attempts:
+                delay = self.retry_backoff * (2 ** (job["attempts"] - 1))
+                values = {"status": QUEUED, "error": error, "run_after": now + timedelta(seconds=delay)}
+            else:
+                values = {"status": FAILED, "error": error, "finished_at": now}
+            values.update({"locked_by": None, "lease_expires_at": None})
+            # Only if we still hold the lease (it may have expired and been re-claimed)
+            db.query(Job).filter(Job.id == job["id"], Job.locked_by == worker_id).update(values, synchronize_session=False)
+            db.commit()
+            return values["status"]
+        finally:
+            db.close()
+
+    def _renew(self, job_id: int, worker_id: str) -> bool:
+        db = SessionLocal()
+        try:
+            renewed = db.query(Job).filter(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker_id).update(
+                {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}, synchronize_session=False
+            )
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job: dict, worker_id: str, task: asyncio.Task):
+        """Keeps the lease alive while `task` runs; cancels it if another worker took the job over."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await anyio.to_thread.run_sync(self._renew, job["id"], worker_id)
+            except Exception as e:
+                print(f"Job {job['id']} lease renewal failed: {e}")
+                continue
+            if not renewed:
+                print(f"Job {job['id']} ({job['kind']}) lost its lease; abandoning it")
+                job["lease_lost"] = True
+                task.cancel()
+                return
+
+    def _release(self, worker_ids: list):
+        # Hand our running jobs back to the queue on shutdown instead of waiting for their leases
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.status == RUNNING, Job.locked_by.in_(worker_ids)).update(
+                {"status": QUEUED, "locked_by": None, "lease_expires_at": None, "run_after": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _run(self, job: dict, worker_id: str):
+        self.running += 1
+        try:
+            fn = _handlers.get(job["kind"])
+            if fn is None:
+                raise LookupError(f"No handler for job kind '{job['kind']}'")
+            task = asyncio.ensure_future(fn(job["payload"]))
+            heartbeat = asyncio.create_task(self._heartbeat(job, worker_id, task))
+            try:
+                result = await task
+            finally:
+                heartbeat.cancel()
+            status = await anyio.to_thread.run_sync(self._finish, job, worker_id, result)
+        except asyncio.CancelledError:
+            if not job.get("lease_lost"):
+                raise
+            # The new lease holder runs it; nothing of ours to record
+            self.leases_lost += 1
+            return
+        except Exception as e:
+            print(f"Job {job['id']} ({job['kind']}) failed (Attempt {job['attempts']}): {e}")
+            status = await anyio.to_thread.run_sync(self._finish, job, worker_id, None, f"{type(e).__name__}: {e}")
+        finally:
+            self.running -= 1
+        if status == SUCCEEDED:
+            self.succeeded += 1
+        elif status == FAILED:
+            self.failed += 1
+        else:
+            self.retried += 1
+        self._signal_change()
+
+    async def _worker(self, worker_id: str):
+        while True:
+            try:
+                job = await anyio.to_thread.run_sync(self._claim, worker_id)
+            except Exception as e:
+                print(f"Job queue claim failed: {e}")
+                job = None
+            if job is not None:
+                await self._run(job, worker_id)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _signal_change(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """
+        Waits until any job handled by this process finishes (or timeout). Jobs
+        finished by other processes are only seen by re-reading the table.
+        """
+        if self._changed is None:
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._worker_ids = [f"{prefix}:{i}" for i in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(worker_id)) for worker_id in self._worker_ids]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._worker_ids:
+            await anyio.to_thread.run_sync(self._release, self._worker_ids)
+        self._tasks = []
+        self._loop = None
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            rows = db.query(Job.status, func.count(Job.id)).filter(Job.status.in_((QUEUED, RUNNING))).group_by(Job.status).all()
+        finally:
+            db.close()
+        counts = dict(rows)
+        return {
+            "workers": self.workers,
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "running_here": self.running,
+            "enqueued": self.enqueued,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "leases_lost": self.leases_lost,
+        }
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF
+)
+metrics.register("job_queue", job_queue.stats)
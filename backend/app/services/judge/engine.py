@@ -0,0 +1,284 @@
+"""
+Local code execution engine for /coding/run and /coding/submit.
+
+Each test case of a submission runs in its own isolated interpreter
+(harness.py): no network, its own empty filesystem root, an unprivileged uid,
+no child processes, CPU-time, address-space and file-size rlimits and a
+wall-clock timeout. It is only given the code and the case input and reports
+the value returned; the comparison with the expected output happens here. The cases of one submission are fanned out in parallel
+over the worker pool, so a suite finishes in roughly the time of its slowest
+case; fail-fast mode (used by /run) cancels the remaining cases on the first
+failure. Where os.fork exists the interpreters come from a warm pool
+(pool.py) instead of being started per case. Judging is deterministic; the
+LLM is only used for the optional qualitative review.
+"""
+import asyncio
+import json
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.judge.harness import RESULT_MARKER, RETURNED, grade
+from app.services.judge.pool import HARNESS_PATH, WorkerPool, kill_group
+
+SUPPORTED_LANGUAGES = {"python"}
+WORKER_CRASHED = "Judge worker crashed"
+JUDGE_WORKERS = settings.JUDGE_WORKERS or os.cpu_count() or 1
+
+_executor = ThreadPoolExecutor(max_workers=JUDGE_WORKERS, thread_name_prefix="judge")
+warm_pool = WorkerPool(
+    size=settings.JUDGE_POOL_SIZE or JUDGE_WORKERS,
+    max_jobs=settings.JUDGE_POOL_MAX_JOBS,
+    enabled=settings.JUDGE_POOL_ENABLED
+)
+_queue_lock = threading.Lock()
+_queued = 0 # Cases submitted to the executor that have not started yet
+
+
+def parse_test_cases(raw) -> list:
+    """
+    CodingProblem.test_cases is stored as a JSON string of {"input", "output"} objects.
+    """
+    if not raw:
+        return []
+    cases = json.loads(raw) if isinstance(raw, str) else raw
+    return [c for c in cases if isinstance(c, dict) and "input" in c and "output" in c]
+
+
+# What an interpreter may report besides RETURNED; verdicts are only ever made here
+RUN_FAILURES = {"error", "timeout", "memory", "skipped"}
+
+
+def _case_result(case: dict, index: int, outcome: dict) -> dict:
+    status = outcome.get("status", "error")
+    if status == RETURNED:
+        status = "passed" if grade(outcome, case["output"]) else "failed"
+    elif status not in RUN_FAILURES:
+        status = "error"
+    return {
+        "case": index + 1,
+        "input": case["input"],
+        "expected": case["output"],
+        "actual": outcome.get("actual"),
+        "status": status, # passed, failed, error, timeout, memory, skipped
+        "passed": status == "passed",
+        "time_ms": outcome.get("time_ms", 0.0),
+        "stdout": outcome.get("stdout", ""),
+        "error": outcome.get("error"),
+    }
+
+
+class CancelScope:
+    """
+    Tracks the interpreters running for one submission so fail-fast can kill them.
+    """
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self._procs = set()
+        self._lock = threading.Lock()
+
+    def register(self, proc: subprocess.Popen) -> bool:
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            self._procs.add(proc)
+            return True
+
+    def unregister(self, proc: subprocess.Popen):
+        with self._lock:
+            self._procs.discard(proc)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            procs = list(self._procs)
+        for proc in procs:
+            kill_group(proc)
+
+
+def _skipped(case: dict, index: int) -> dict:
+    return _case_result(case, index, {"status": "skipped", "error": "Not run (an earlier case failed)"})
+
+
+def _job(code: str, case: dict) -> dict:
+    return {
+        "code": code,
+        "input": case["input"], # Never the expected output: the interpreter only reports what the code returned
+        "limits": {
+            "cpu_seconds": settings.JUDGE_CPU_SECONDS,
+            "memory_mb": settings.JUDGE_MEMORY_MB,
+            "uid": settings.JUDGE_SANDBOX_UID,
+            "require_isolation": settings.JUDGE_REQUIRE_ISOLATION,
+        },
+    }
+
+
+def run_case(code: str, case: dict, index: int = 0, scope: CancelScope = None) -> dict:
+    """
+    Runs one test case in a fresh, resource-limited interpreter: a fork of a
+    warm pool worker when available, a cold interpreter otherwise.
+    """
+    if scope is not None and scope.cancelled.is_set():
+        return _skipped(case, index)
+    if warm_pool.enabled:
+        return run_case_warm(code, case, index, scope)
+    return run_case_cold(code, case, index, scope)
+
+
+def run_case_warm(code: str, case: dict, index: int = 0, scope: CancelScope = None) -> dict:
+    outcome = warm_pool.run(_job(code, case), settings.JUDGE_TIMEOUT_SECONDS, scope=scope)
+    if outcome is None and scope is not None and scope.cancelled.is_set():
+        return _skipped(case, index)
+    if outcome is None:
+        return _case_result(case, index, {"status": "error", "error": WORKER_CRASHED})
+    return _case_result(case, index, outcome)
+
+
+def run_case_cold(code: str, case: dict, index: int = 0, scope: CancelScope = None) -> dict:
+    nonce = secrets.token_hex(8)
+    job = json.dumps(dict(_job(code, case), nonce=nonce))
+    marker = RESULT_MARKER + nonce
+
+    with tempfile.TemporaryDirectory(prefix="judge-") as workdir:
+        proc = subprocess.Popen(
+            [sys.executable, "-I", HARNESS_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=workdir,
+            env={"PATH": os.environ.get("PATH", ""), "PYTHONHASHSEED": "0"},
+            start_new_session=True, # Own process group, so anything it spawns dies with it
+        )
+        if scope is not None and not scope.register(proc):
+            kill_group(proc)
+            proc.communicate()
+            return _skipped(case, index)
+        try:
+            stdout, stderr = proc.communicate(job, timeout=settings.JUDGE_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            kill_group(proc)
+            proc.communicate()
+            return _case_result(case, index, {"status": "timeout", "error": f"Time limit exceeded ({settings.JUDGE_TIMEOUT_SECONDS}s)"})
+        finally:
+            kill_group(proc)
+            if scope is not None:
+                scope.unregister(proc)
+
+    if scope is not None and scope.cancelled.is_set() and proc.returncode == -signal.SIGKILL:
+        return _skipped(case, index)
+
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(marker):
+            return _case_result(case, index, json.loads(line[len(marker):]))
+
+    # The interpreter died before reporting (rlimit signal, os._exit, ...)
+    if proc.returncode in (-9, -24): # SIGKILL / SIGXCPU from RLIMIT_CPU
+        return _case_result(case, index, {"status": "timeout", "error": "CPU time limit exceeded"})
+    error = (stderr or "").strip().splitlines()
+    return _case_result(case, index, {
+        "status": "memory" if error and "MemoryError" in error[-1] else "error",
+        "error": error[-1] if error else f"Process exited with code {proc.returncode}"
+    })
+
+
+def _dequeue_and_run(code: str, case: dict, index: int, scope: CancelScope) -> dict:
+    global _queued
+    with _queue_lock:
+        _queued -= 1
+    return run_case(code, case, index, scope)
+
+
+def _summary(cases: list, start: float) -> dict:
+    passed = sum(1 for c in cases if c["passed"])
+    return {
+        "status": "passed" if cases and passed == len(cases) else "failed",
+        "passed": passed,
+        "total": len(cases),
+        "cases": cases,
+        "time_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+async def judge_async(code: str, language: str, test_cases: list, fail_fast: bool = False) -> dict:
+    """
+    Runs every test case in parallel on the bounded worker pool and returns
+    structured per-case results. With fail_fast, the first failing case cancels
+    the rest (queued cases are skipped, running interpreters are killed).
+    """
+    start = time.perf_counter()
+    if (language or "python").lower() not in SUPPORTED_LANGUAGES:
+        return {"status": "unsupported", "passed": 0, "total": len(test_cases), "cases": [], "time_ms": 0.0}
+
+    global _queued
+    loop = asyncio.get_running_loop()
+    scope = CancelScope()
+    with _queue_lock:
+        _queued += len(test_cases)
+    pending = {
+        loop.run_in_executor(_executor, _dequeue_and_run, code, case, i, scope)
+        for i, case in enumerate(test_cases)
+    }
+    cases = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            cases.extend(f.result() for f in done)
+            if fail_fast and not scope.cancelled.is_set() and any(c["status"] not in ("passed", "skipped") for c in cases):
+                scope.cancel()
+    finally:
+        scope.cancel() # Request cancelled or finished: make sure nothing keeps running
+
+    cases.sort(key=lambda c: c["case"])
+    return _summary(cases, start)
+
+
+def judge(code: str, language: str, test_cases: list, fail_fast: bool = False) -> dict:
+    """
+    Blocking wrapper around judge_async() for scripts and benchmarks.
+    """
+    return asyncio.run(judge_async(code, language, test_cases, fail_fast=fail_fast))
+
+
+def judge_sequential(code: str, language: str, test_cases: list) -> dict:
+    """
+    One case after another on the calling thread; kept as the benchmark baseline.
+    """
+    start = time.perf_counter()
+    return _summary([run_case(code, case, i) for i, case in enumerate(test_cases)], start)
+
+
+def format_output(result: dict) -> str:
+    """
+    Console-style summary shown in the editor's output panel.
+    """
+    lines = [f"{result['passed']}/{result['total']} test cases passed ({result['time_ms']:.0f} ms)"]
+    skipped = sum(1 for c in result["cases"] if c["status"] == "skipped")
+    if skipped:
+        lines.append(f"Stopped at the first failure; {skipped} remaining case(s) skipped.")
+    for c in result["cases"]:
+        if c["status"] == "skipped":
+            continue
+        label = "PASS" if c["passed"] else c["status"].upper()
+        lines.append(f"[{label}] Case {c['case']}: {c['input']}")
+        if not c["passed"]:
+            lines.append(f"    expected: {c['expected']}")
+            lines.append(f"    actual:   {c['actual']}" if c["error"] is None else f"    error:    {c['error']}")
+        if c["stdout"]:
+            lines.append(f"    stdout:   {c['stdout'].strip()[:200]}")
+    return "\n".join(lines)
+
+
+def stats() -> dict:
+    return dict(warm_pool.stats(), queue_depth=_queued, executor_threads=JUDGE_WORKERS)
+
+
+metrics.register("judge", stats)
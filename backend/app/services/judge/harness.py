@@ -0,0 +1,465 @@
+"""
+Runs one submission against one test case. Executed in a separate, resource
+limited interpreter (see engine.py), so it must only depend on the stdlib.
+
+Before any submitted code runs, the process is confined (Linux): a new network
+namespace (no network), the empty per-case working directory as its
+filesystem root, an unprivileged uid without capabilities, no new processes
+(RLIMIT_NPROC 0) and no privilege gain. Modules solutions may import are
+loaded beforehand, since nothing else is reachable after the chroot. If
+confinement is unavailable the case is refused unless JUDGE_REQUIRE_ISOLATION
+is off (non-Linux development machines). Captured stdout is capped at
+MAX_CAPTURE characters while it is written.
+
+Protocol: a JSON job on stdin {"code", "input", "limits", "nonce"}; a single
+JSON result line on stdout prefixed with RESULT_MARKER + nonce (user code may
+print too, and does not know the nonce). The result only carries what the
+solution returned ("returned" status, serialized value): the expected output
+never reaches this process, and grade() runs in the caller once it has exited,
+so a submission that reads the harness's memory or forges a result line can at
+most misreport its own return value.
+
+With --worker the interpreter stays warm (see pool.py): it reads one job per
+line and forks a fresh child for each, so submissions never share state and
+only pay for a fork instead of an interpreter start. Each result line carries
+a "violation" flag telling the pool to recycle the worker.
+"""
+import ast
+import contextlib
+import inspect
+import io
+import json
+import os
+import secrets
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+try:
+    import ctypes
+    _libc = ctypes.CDLL(None, use_errno=True) if sys.platform.startswith("linux") else None
+except (ImportError, OSError):
+    _libc = None
+
+RESULT_MARKER = "__JUDGE_RESULT__"
+RETURNED = "returned" # The solution returned a value; pass/fail is decided by grade() in the caller
+MAX_CAPTURE = 4000
+MAX_VALUE = 1000000 # Characters of a serialized return value; longer ones can't pass
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+CLONE_NEWIPC = 0x08000000
+PR_SET_NO_NEW_PRIVS = 38
+PR_SET_CHILD_SUBREAPER = 36
+LINUX_CAPABILITY_VERSION_3 = 0x20080522
+# Importable by solutions; loaded before the chroot makes the stdlib unreachable
+PRELOAD_MODULES = (
+    "array", "bisect", "collections", "copy", "dataclasses", "decimal", "enum", "fractions", "functools",
+    "heapq", "itertools", "math", "operator", "random", "re", "statistics", "string", "typing",
+)
+JSON_NAMES = {"true": True, "false": False, "null": None, "none": None}
+
+
+class _JsonNames(ast.NodeTransformer):
+    # Lets LLM-written cases use JSON spellings (true/false/null) inside Python literals
+    def visit_Name(self, node):
+        if node.id.lower() in JSON_NAMES:
+            return ast.copy_location(ast.Constant(JSON_NAMES[node.id.lower()]), node)
+        return node
+
+
+def _literal(node):
+    return ast.literal_eval(_JsonNames().visit(node))
+
+
+def parse_value(text):
+    """
+    Parses an expected output such as "[0, 1]", "true" or "3". Falls back to the raw string.
+    """
+    if not isinstance(text, str):
+        return text
+    try:
+        return _literal(ast.parse(text.strip(), mode="eval").body)
+    except (SyntaxError, ValueError):
+        return text.strip()
+
+
+def parse_arguments(text):
+    """
+    Parses a case input like "nums = [2,7,11,15], target = 9" or "[1, 2], 3"
+    into (args, kwargs). Unparseable input is passed as a single string argument.
+    """
+    if isinstance(text, (list, dict)):
+        return ([text], {}) if isinstance(text, list) else ([], dict(text))
+    try:
+        call = ast.parse(f"__call__({text})", mode="eval").body
+        args = [_literal(a) for a in call.args]
+        kwargs = {k.arg: _literal(k.value) for k in call.keywords}
+        return args, kwargs
+    except (SyntaxError, ValueError):
+        return [text], {}
+
+
+def find_entry(namespace, code):
+    """
+    Picks the function to call: `solution`, else the first public method of a
+    `Solution` class, else the last top-level function in the submission.
+    """
+    if callable(namespace.get("solution")):
+        return namespace["solution"]
+    if inspect.isclass(namespace.get("Solution")):
+        instance = namespace["Solution"]()
+        for name, member in inspect.getmembers(instance, inspect.ismethod):
+            if not name.startswith("_"):
+                return member
+    functions = [n.name for n in ast.parse(code).body if isinstance(n, ast.FunctionDef)]
+    if functions:
+        return namespace[functions[-1]]
+    raise LookupError("No function found. Define `solution(...)` or a `Solution` class.")
+
+
+def call_entry(entry, args, kwargs):
+    # Case inputs name their arguments, but the candidate may have named parameters differently
+    try:
+        inspect.signature(entry).bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        args, kwargs = list(args) + list(kwargs.values()), {}
+    return entry(*args, **kwargs)
+
+
+def normalize(value):
+    if isinstance(value, tuple):
+        return [normalize(v) for v in value]
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    return value
+
+
+def outputs_match(actual, expected) -> bool:
+    actual, expected = normalize(actual), normalize(expected)
+    if actual == expected:
+        return True
+    if isinstance(expected, float) and isinstance(actual, (int, float)):
+        return abs(actual - expected) <= 1e-6 * max(1.0, abs(expected))
+    if isinstance(expected, str):
+        return expected.replace(" ", "") in (str(actual).replace(" ", ""), json.dumps(actual, default=str).replace(" ", ""))
+    return False
+
+
+def serialize_value(actual) -> dict:
+    """
+    The return value as grade() needs it: the repr of its normalized form (read
+    back with ast.literal_eval) and, for values that aren't literals, the two
+    spellings a string expected output is compared with.
+    """
+    normalized = normalize(actual)
+    fields = {"value": None, "text": None}
+    with contextlib.suppress(Exception):
+        value = repr(normalized)
+        fields["value"] = value if len(value) <= MAX_VALUE else None
+    with contextlib.suppress(Exception):
+        fields["text"] = [str(normalized)[:MAX_VALUE], json.dumps(normalized, default=str)[:MAX_VALUE]]
+    return fields
+
+
+def grade(outcome: dict, expected_output) -> bool:
+    """
+    Caller side: whether the value a finished job returned matches the expected
+    output. Only literals are rebuilt, so nothing the submission defined runs here.
+    """
+    expected = parse_value(expected_output)
+    value = outcome.get("value")
+    try:
+        if not isinstance(value, str):
+            raise ValueError("no literal value")
+        actual = ast.literal_eval(value)
+    except Exception: # Not a literal (object, nan, too long): only the string comparison applies
+        text = outcome.get("text")
+        if not isinstance(expected, str) or not isinstance(text, list):
+            return False
+        return expected.replace(" ", "") in [str(t).replace(" ", "") for t in text]
+    return outputs_match(actual, expected)
+
+
+class CappedOutput(io.TextIOBase):
+    """stdout replacement that keeps only the first `limit` characters written."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.truncated = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        room = self.limit - self.size
+        if room > 0:
+            self.parts.append(text[:room])
+            self.size += min(len(text), room)
+        if len(text) > room:
+            self.truncated = True
+        return len(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.parts) + ("\n... (output truncated)" if self.truncated else "")
+
+
+def preload():
+    import importlib
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+def _drop_capabilities():
+    header = (ctypes.c_uint32 * 2)(LINUX_CAPABILITY_VERSION_3, 0)
+    data = (ctypes.c_uint32 * 6)() # effective, permitted, inheritable x 2 words, all empty
+    if _libc.capset(header, data) != 0:
+        raise OSError(ctypes.get_errno(), f"capset: {os.strerror(ctypes.get_errno())}")
+
+
+def confine(workdir: str, limits: dict):
+    """
+    Isolates this process before submitted code runs: no network, `workdir` as
+    the filesystem root, an unprivileged uid with no capabilities and no way to
+    regain privileges. Raises OSError if a step is not possible here.
+    """
+    if _libc is None:
+        raise OSError("process isolation needs Linux namespaces")
+    as_root = os.geteuid() == 0
+    # Unprivileged callers need a user namespace to create the network namespace (and to chroot)
+    flags = CLONE_NEWNET | CLONE_NEWIPC | (0 if as_root else CLONE_NEWUSER)
+    if _libc.unshare(flags) != 0:
+        raise OSError(ctypes.get_errno(), f"unshare: {os.strerror(ctypes.get_errno())}")
+    uid = int(limits.get("uid", 65534))
+    if as_root:
+        os.chown(workdir, uid, uid)
+    os.chroot(workdir)
+    os.chdir("/")
+    if as_root:
+        os.setgroups([])
+        os.setgid(uid)
+        os.setuid(uid)
+    _drop_capabilities() # Also the full set a fresh user namespace grants, which would allow escaping the chroot
+    if _libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), f"prctl: {os.strerror(ctypes.get_errno())}")
+
+
+def apply_limits(limits: dict):
+    """
+    Caps CPU time, address space, file writes and process creation before any submitted code runs.
+    """
+    if resource is None or not limits:
+        return
+    cpu = int(limits["cpu_seconds"])
+    memory = int(limits["memory_mb"]) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0)) # No extra processes (counted per uid, so set after confine)
+
+
+def sandbox(workdir: str, limits: dict):
+    """
+    confine() + apply_limits(). Returns an error result if the sandbox could not
+    be set up and isolation is required, else None.
+    """
+    if limits:
+        try:
+            confine(workdir, limits)
+        except OSError as e:
+            if limits.get("require_isolation", True):
+                return {"status": "error", "actual": None, "stdout": "", "time_ms": 0.0,
+                        "error": f"Sandbox unavailable: {e}"}
+    apply_limits(limits)
+    return None
+
+
+def run_job(job: dict) -> dict:
+    code = job["code"]
+    stdout = CappedOutput(MAX_CAPTURE)
+    result = {"status": "error", "actual": None, "stdout": "", "error": None, "time_ms": 0.0}
+    start = time.perf_counter()
+    try:
+        args, kwargs = parse_arguments(job.get("input", ""))
+        namespace = {"__name__": "__solution__"}
+        with contextlib.redirect_stdout(stdout):
+            exec(compile(code, "<submission>", "exec"), namespace)
+            entry = find_entry(namespace, code)
+            start = time.perf_counter()
+            actual = call_entry(entry, args, kwargs)
+        result["time_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        result["actual"] = repr(actual)[:MAX_CAPTURE]
+        result.update(serialize_value(actual))
+        result["status"] = RETURNED
+    except MemoryError:
+        result["status"] = "memory"
+        result["error"] = "Memory limit exceeded"
+    except RecursionError:
+        result["error"] = "RecursionError: maximum recursion depth exceeded"
+    except BaseException as e:
+        result["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()[:MAX_CAPTURE]
+    result["stdout"] = stdout.getvalue()
+    return result
+
+
+def _read_child(fd: int, timeout: float, marker: bytes):
+    # Until EOF, or the result line: a process the job left behind may still hold the pipe open
+    chunks = []
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            return b"".join(chunks), False
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return b"".join(chunks), True
+        chunks.append(chunk)
+        if chunk.endswith(b"\n") and marker in b"".join(chunks):
+            return b"".join(chunks), True
+
+
+def _child_pids() -> list:
+    # Linux: processes whose parent is this one (as subreaper that includes orphans that left their group)
+    me = os.getpid()
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        if int(stat[stat.rindex(b")") + 2:].split()[1]) == me:
+            pids.append(int(entry))
+    return pids
+
+
+def reap_strays(pgid: int) -> bool:
+    """
+    Kills and reaps whatever a finished job left behind: its process group, and
+    (as child subreaper) orphans that moved to a new session. True if anything was left.
+    """
+    stray = False
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+        stray = True
+    except (ProcessLookupError, PermissionError):
+        pass
+    deadline = time.monotonic() + 1.0
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return stray
+        if pid:
+            stray = True
+            continue
+        # Children still running outside the group
+        stray = True
+        if time.monotonic() > deadline or not os.path.isdir("/proc"):
+            return stray
+        for pid in _child_pids():
+            with contextlib.suppress(ProcessLookupError, PermissionError):
+                os.kill(pid, signal.SIGKILL)
+        time.sleep(0.01)
+
+
+def fork_job(job: dict, timeout: float) -> dict:
+    """
+    Runs one job in a forked child with its own limits, working directory,
+    process group and private result pipe. The child inherits every module the
+    worker imported, and the job itself, which holds no expected output. Anything the job leaves running is killed afterwards and
+    the result is flagged as a violation, so the pool recycles the worker.
+    """
+    nonce = secrets.token_hex(8)
+    marker = (RESULT_MARKER + nonce).encode()
+    limits = job.pop("limits", None)
+    workdir = tempfile.mkdtemp(prefix="judge-")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.setpgid(0, 0)
+            os.close(read_fd)
+            os.chdir(workdir)
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2): # Never let user code touch the worker's job and result streams
+                os.dup2(devnull, fd)
+            result = sandbox(workdir, limits) or run_job(job)
+            os.write(write_fd, marker + json.dumps(result).encode() + b"\n")
+        finally:
+            os._exit(0)
+
+    with contextlib.suppress(OSError):
+        os.setpgid(pid, pid) # Also set here, so the group exists before the child gets to run
+    os.close(write_fd)
+    try:
+        data, finished = _read_child(read_fd, timeout, marker)
+    finally:
+        os.close(read_fd)
+    if not finished:
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    stray = reap_strays(pid)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if not finished:
+        return {"status": "timeout", "error": f"Time limit exceeded ({timeout}s)", "violation": True}
+    for line in reversed(data.splitlines()):
+        if line.startswith(marker):
+            try:
+                result = json.loads(line[len(marker):])
+            except ValueError:
+                break
+            if not isinstance(result, dict):
+                break
+            result["violation"] = result.get("status") == "memory" or stray
+            return result
+    # The child died before reporting (rlimit signal, os._exit, ...)
+    if os.WIFSIGNALED(status) and os.WTERMSIG(status) in (signal.SIGKILL, signal.SIGXCPU):
+        return {"status": "timeout", "error": "CPU time limit exceeded", "violation": True}
+    return {"status": "error", "error": f"Process exited with code {os.waitstatus_to_exitcode(status)}", "violation": True}
+
+
+def serve():
+    """
+    Warm worker loop. Preloads the modules solutions commonly use, then
+    answers one result line per job line until stdin closes.
+    """
+    preload()
+    if _libc is not None:
+        _libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) # Orphans of a job become ours to kill and reap
+    for line in sys.stdin:
+        job = json.loads(line)
+        result = fork_job(job, float(job.pop("timeout")))
+        sys.stdout.write(RESULT_MARKER + json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        serve()
+    else:
+        job = json.loads(sys.stdin.read())
+        nonce = job.pop("nonce", "")
+        preload()
+        result = sandbox(os.getcwd(), job.pop("limits", None)) or run_job(job)
+        sys.stdout.write(RESULT_MARKER + nonce + json.dumps(result) + "\n")
+        sys.stdout.flush()
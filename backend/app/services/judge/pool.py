@@ -0,0 +1,202 @@
+"""
+Warm interpreter pool for the code judge.
+
+Keeps JUDGE_POOL_SIZE long-lived `harness.py --worker` interpreters with the
+harness and common stdlib modules already imported. Each test case is sent to
+an idle worker, which forks a fresh child for it, so a run costs a fork
+instead of an interpreter start. Workers are recycled after
+JUDGE_POOL_MAX_JOBS cases, after any policy violation (timeout, memory,
+abnormal exit, processes left behind by the job) and whenever they are
+killed by fail-fast cancellation.
+
+Needs os.fork, so it is disabled on Windows and engine.py falls back to a cold
+interpreter per case.
+"""
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+from app.services.judge.harness import RESULT_MARKER
+
+HARNESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "harness.py")
+
+
+def kill_group(proc: subprocess.Popen):
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class Worker:
+    def __init__(self):
+        self.jobs = 0
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", HARNESS_PATH, "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env={"PATH": os.environ.get("PATH", ""), "PYTHONHASHSEED": "0"},
+            start_new_session=True, # Own process group, so killing it takes the forked children too
+        )
+
+    def execute(self, job: dict, timeout: float) -> Optional[dict]:
+        """
+        Sends one job and waits for its result line. Returns None if the worker
+        died or stopped answering; it must not be reused after that.
+        """
+        self.jobs += 1
+        try:
+            self.proc.stdin.write(json.dumps(dict(job, timeout=timeout)) + "\n")
+            self.proc.stdin.flush()
+            # The worker enforces `timeout` on its child; this only guards against a stuck worker
+            if not select.select([self.proc.stdout], [], [], timeout + 5)[0]:
+                return None
+            line = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError, ValueError):
+            return None
+        if not line.startswith(RESULT_MARKER):
+            return None
+        return json.loads(line[len(RESULT_MARKER):])
+
+    def close(self):
+        kill_group(self.proc)
+        try:
+            self.proc.communicate(timeout=1)
+        except (subprocess.TimeoutExpired, ValueError, OSError):
+            pass
+
+
+class WorkerPool:
+    def __init__(self, size: int, max_jobs: int, enabled: bool = True):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.enabled = enabled and hasattr(os, "fork")
+        self._idle = []
+        self._live = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.spawned = 0
+        self.executions = 0
+        self.recycled = Counter() # max_jobs, violation, crashed, cancelled
+
+    def _spawn(self) -> Worker:
+        worker = Worker()
+        self.spawned += 1
+        return worker
+
+    def start(self):
+        """
+        Pre-forks every worker so the first runs after startup are already warm.
+        """
+        if not self.enabled:
+            return
+        with self._cond:
+            self._closed = False
+            while self._live < self.size:
+                self._idle.append(self._spawn())
+                self._live += 1
+
+    def acquire(self) -> Worker:
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._live >= self.size:
+                    self._cond.wait()
+                if self._idle:
+                    return self._idle.pop()
+                self._live += 1
+            finally:
+                self._waiting -= 1
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, worker: Worker, recycle: Optional[str] = None):
+        """
+        Returns a worker to the pool, or replaces it with a fresh one if it hit
+        max_jobs or `recycle` names a reason (violation, crashed, cancelled).
+        """
+        if recycle is None and worker.jobs >= self.max_jobs:
+            recycle = "max_jobs"
+        if recycle is not None:
+            self.recycled[recycle] += 1
+            worker.close()
+            worker = None
+            if not self._closed:
+                try:
+                    worker = self._spawn()
+                except Exception as e:
+                    print(f"Judge pool could not spawn a worker: {e}")
+        with self._cond:
+            if worker is None:
+                self._live -= 1
+            elif self._closed:
+                self._live -= 1
+                worker.close()
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def run(self, job: dict, timeout: float, scope=None) -> Optional[dict]:
+        """
+        Executes one job on a warm worker. `scope` (engine.CancelScope) may kill
+        the worker while it runs; the worker is unregistered before it goes back
+        to the pool. Returns None if the worker was killed or crashed mid-job.
+        """
+        worker = self.acquire()
+        if scope is not None and not scope.register(worker.proc):
+            self.release(worker)
+            return None
+        try:
+            result = worker.execute(job, timeout)
+        finally:
+            if scope is not None:
+                scope.unregister(worker.proc)
+        self.executions += 1
+        if result is None:
+            try:
+                returncode = worker.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                returncode = None
+            self.release(worker, "cancelled" if returncode == -signal.SIGKILL else "crashed")
+        else:
+            self.release(worker, "violation" if result.pop("violation", False) else None)
+        return result
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+        for worker in idle:
+            worker.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "busy": self._live - len(self._idle),
+                "waiting_for_worker": self._waiting,
+                "spawned": self.spawned,
+                "executions": self.executions,
+                "recycled": dict(self.recycled),
+            }
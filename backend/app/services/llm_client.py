@@ -0,0 +1,97 @@
+"""
+Process-wide OpenAI clients backed by a persistent HTTP connection pool.
+
+Every LLM call in the app goes through `get_client()` (sync) or
+`get_async_client()` (async), so TLS handshakes and connection setup are paid
+once per pooled connection instead of once per request. Both clients are built
+lazily from `settings`, which means pointing OPENAI_API_BASE at a local fake
+server (see fake_openai_server.py) is enough to exercise them in tests.
+"""
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from app.core.config import settings
+
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # Per-call timeouts in llm.py still override the read timeout
+    return httpx.Timeout(60.0, connect=settings.LLM_CONNECT_TIMEOUT)
+
+
+def get_client() -> OpenAI:
+    """
+    Returns the shared sync client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_API_BASE,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    http_client=DefaultHttpxClient(limits=_limits(), timeout=_timeout()),
+                )
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """
+    Returns the shared async client for the running event loop.
+    An httpx async pool cannot be shared between event loops, so the client is
+    rebuilt if it is requested from a different loop (e.g. separate asyncio.run calls).
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_API_BASE,
+            max_retries=settings.LLM_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout()),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+def close_clients():
+    """
+    Closes the sync pool and forgets both clients. Called on app shutdown and
+    by tests that swap settings between runs.
+    """
+    global _client, _async_client, _async_client_loop
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+    _async_client = None
+    _async_client_loop = None
+
+
+async def aclose_clients():
+    """
+    Async counterpart of close_clients(), which also drains the async pool.
+    """
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.close()
+    _async_client = None
+    _async_client_loop = None
+    close_clients()
@@ -0,0 +1,113 @@
+"""
+Login throttling per (client IP, username) and per client IP.
+
+Counts failed logins over a sliding LOGIN_THROTTLE_WINDOW_SECONDS window under
+two keys. Once an account has LOGIN_THROTTLE_MAX_FAILURES failures from one IP,
+or an IP has LOGIN_THROTTLE_IP_MAX_FAILURES failures across all usernames (a
+looser limit, so users behind one NAT don't lock each other out), further
+attempts are refused (429) before the user lookup or any bcrypt work. A
+successful login clears only its (IP, username) record. Per app process,
+bounded in memory by the TTL/LRU caches.
+
+The client IP is the socket peer unless LOGIN_THROTTLE_FORWARDED_HEADER names
+a header set by a trusted reverse proxy (see client_ip()).
+"""
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from starlette.requests import Request
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+def client_ip(request: Request) -> str:
+    """
+    The client's address. Behind a proxy the peer is the proxy itself, so the
+    configured header is used instead; its last entry is the one the trusted
+    proxy appended (earlier entries are client-supplied).
+    """
+    if settings.LOGIN_THROTTLE_FORWARDED_HEADER:
+        forwarded = request.headers.get(settings.LOGIN_THROTTLE_FORWARDED_HEADER)
+        if forwarded and forwarded.split(",")[-1].strip():
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class LoginThrottle:
+    def __init__(self, max_failures: int, ip_max_failures: int, window_seconds: float, max_clients: int = 100000):
+        self.max_failures = max_failures
+        self.ip_max_failures = ip_max_failures
+        self.window_seconds = window_seconds
+        self._failures = TTLCache(maxsize=max_clients, ttl=window_seconds) # (ip, username) -> deque of failure times
+        self._ip_failures = TTLCache(maxsize=max_clients, ttl=window_seconds) # ip -> deque of failure times
+        self._lock = threading.Lock()
+        self.refused = 0
+        self.refused_ip = 0
+
+    @staticmethod
+    def _account(ip: str, username: str) -> tuple:
+        return ip, username.strip().lower()
+
+    def _retry_after(self, cache: TTLCache, key, limit: int, now: float) -> Optional[float]:
+        failures = cache.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if len(failures) < limit:
+            return None
+        return failures[-limit] + self.window_seconds - now
+
+    def retry_after(self, ip: str, username: str) -> Optional[float]:
+        """Seconds until `username` may be tried from `ip` again, or None if it may be tried now."""
+        now = time.monotonic()
+        with self._lock:
+            wait = self._retry_after(self._failures, self._account(ip, username), self.max_failures, now)
+            if wait is not None:
+                self.refused += 1
+                return wait
+            wait = self._retry_after(self._ip_failures, ip, self.ip_max_failures, now)
+            if wait is not None:
+                self.refused_ip += 1
+            return wait
+
+    @staticmethod
+    def _record(cache: TTLCache, key, limit: int, now: float):
+        failures = cache.get(key)
+        if failures is None:
+            failures = deque(maxlen=limit)
+        failures.append(now)
+        cache.set(key, failures) # Restarts the entry's TTL
+
+    def record_failure(self, ip: str, username: str):
+        now = time.monotonic()
+        with self._lock:
+            self._record(self._failures, self._account(ip, username), self.max_failures, now)
+            self._record(self._ip_failures, ip, self.ip_max_failures, now)
+
+    def reset(self, ip: str, username: str):
+        # The per-IP count is left to expire: one valid login must not re-open guessing at other accounts
+        self._failures.pop(self._account(ip, username))
+
+    def stats(self) -> dict:
+        return {
+            "max_failures": self.max_failures,
+            "ip_max_failures": self.ip_max_failures,
+            "window_seconds": self.window_seconds,
+            "tracked_accounts": len(self._failures),
+            "tracked_clients": len(self._ip_failures),
+            "refused": self.refused,
+            "refused_ip": self.refused_ip,
+        }
+
+
+login_throttle = LoginThrottle(
+    max_failures=settings.LOGIN_THROTTLE_MAX_FAILURES,
+    ip_max_failures=settings.LOGIN_THROTTLE_IP_MAX_FAILURES,
+    window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS
+)
+metrics.register("login_throttle", login_throttle.stats)
@@ -0,0 +1,110 @@
+"""
+bcrypt off the request path.
+
+Hashing and verifying a password is ~250 ms of pure CPU at cost 12. Run in
+the request threadpool, a burst of logins holds the GIL and starves every
+other endpoint. Here they run in a dedicated process pool of
+PASSWORD_HASH_WORKERS processes instead, and requests just await the result.
+The pool is bounded: at most PASSWORD_HASH_MAX_PENDING calls may be queued or
+running per app process; beyond that HasherBusy is raised at once (503), so a
+burst can't build an unbounded backlog of CPU work. If worker processes
+can't be started at all (the pool breaks twice in a row), hashing falls back
+to a thread so logins keep working, and /metrics shows "degraded".
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+import anyio
+
+from app.core import metrics, security
+from app.core.config import settings
+
+
+class HasherBusy(Exception):
+    """Too many hash/verify calls pending; retry shortly."""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        self.degraded = False
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that is running threads and an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.pool_restarts += 1
+        broken.shutdown(wait=False)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy()
+            self.pending += 1
+            self.calls += 1
+        try:
+            for attempt in range(2):
+                if self.degraded:
+                    break
+                pool = self._pool()
+                try:
+                    return await asyncio.wrap_future(pool.submit(fn, *args))
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); start a fresh pool once
+                    self._reset(pool)
+                    if attempt:
+                        print("Password hashing pool keeps breaking; hashing in threads instead")
+                        self.degraded = True
+            return await anyio.to_thread.run_sync(fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(security.verify_and_update_password, password, hashed)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "pool_restarts": self.pool_restarts,
+            "degraded": self.degraded,
+        }
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
+metrics.register("password_hasher", password_hasher.stats)
@@ -0,0 +1,245 @@
+"""
+Host-wide rate governor for LLM calls.
+
+Every completion first takes a permit here. A permit needs:
+- one request from the requests-per-minute bucket,
+- its estimated tokens from the tokens-per-minute bucket,
+- a free in-flight slot (held until the call returns; a lease, so a crashed
+  process cannot leak slots).
+
+State lives in a small SQLite file (LLM_GOVERNOR_PATH), so every worker
+process on the host shares the same budget. A 429 from the provider pauses
+all callers until its Retry-After has passed.
+
+Priority lanes: "interactive" calls (live chat, code review) may use the whole
+budget; "background" calls (pool refills, summaries, rubric notes) must leave
+LLM_BACKGROUND_RESERVE of every budget free and poll less often, so live chat
+wins under contention.
+"""
+import asyncio
+import os
+import random
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import anyio
+
+from app.core import metrics
+from app.core.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+POLL_SECONDS = {INTERACTIVE: 0.02, BACKGROUND: 0.2} # Re-check interval while all in-flight slots are taken
+
+
+class GovernorTimeout(Exception):
+    """No capacity within the lane's queue timeout; callers treat it like a rate limit."""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Exponential backoff with full jitter, never shorter than the provider's Retry-After.
+    """
+    delay = random.uniform(0, min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, settings.LLM_BACKOFF_BASE))
+    return delay
+
+
+class RateGovernor:
+    def __init__(self, path: str, rpm: int, tpm: int, max_in_flight: int, background_reserve: float, lease_seconds: float):
+        self.path = path
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.background_reserve = background_reserve
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.waited_seconds = {INTERACTIVE: 0.0, BACKGROUND: 0.0}
+        self.timeouts = 0
+        self.penalties = 0
+        self.store_errors = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                conn.execute("CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY, requests REAL, tokens REAL, updated REAL, blocked_until REAL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS lease (id TEXT PRIMARY KEY, lane TEXT, expires REAL)")
+                conn.execute("INSERT OR IGNORE INTO bucket VALUES (1, ?, ?, ?, 0)", (self.rpm, self.tpm, time.time()))
+                self._initialized = True
+        return conn
+
+    def try_acquire(self, tokens: int, lane: str):
+        """
+        One atomic check. Returns (lease_id, 0) on success or (None, seconds to wait).
+        """
+        reserve = self.background_reserve if lane == BACKGROUND else 0.0
+        tokens = min(tokens, int(self.tpm * (1 - reserve))) # A huge prompt must still fit eventually
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            requests, bucket_tokens, updated, blocked_until = conn.execute(
+                "SELECT requests, tokens, updated, blocked_until FROM bucket WHERE id = 1"
+            ).fetchone()
+            elapsed = max(now - updated, 0.0)
+            requests = min(self.rpm, requests + elapsed * self.rpm / 60.0)
+            bucket_tokens = min(self.tpm, bucket_tokens + elapsed * self.tpm / 60.0)
+
+            lease_id, wait = None, 0.0
+            if now < blocked_until:
+                wait = blocked_until - now
+            else:
+                conn.execute("DELETE FROM lease WHERE expires < ?", (now,))
+                in_flight = conn.execute("SELECT COUNT(*) FROM lease").fetchone()[0]
+                request_floor = self.rpm * reserve
+                token_floor = self.tpm * reserve
+                if requests - 1 < request_floor:
+                    wait = (request_floor + 1 - requests) * 60.0 / self.rpm
+                elif bucket_tokens - tokens < token_floor:
+                    wait = (token_floor + tokens - bucket_tokens) * 60.0 / self.tpm
+                elif in_flight >= self.max_in_flight * (1 - reserve):
+                    wait = POLL_SECONDS[lane]
+                else:
+                    requests -= 1
+                    bucket_tokens -= tokens
+                    lease_id = secrets.token_hex(8)
+                    conn.execute("INSERT INTO lease VALUES (?, ?, ?)", (lease_id, lane, now + self.lease_seconds))
+
+            conn.execute(
+                "UPDATE bucket SET requests = ?, tokens = ?, updated = ? WHERE id = 1",
+                (requests, bucket_tokens, now)
+            )
+            conn.execute("COMMIT")
+            return lease_id, wait
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _check_timeout(self, lane: str, start: float, wait: float):
+        timeout = settings.LLM_INTERACTIVE_QUEUE_TIMEOUT if lane == INTERACTIVE else settings.LLM_QUEUE_TIMEOUT
+        if time.monotonic() - start + wait > timeout:
+            self.timeouts += 1
+            raise GovernorTimeout(f"No LLM capacity within {timeout}s")
+
+    def _wait_step(self, wait: float) -> float:
+        # Jitter so waiters released by the same refill don't retry in lockstep
+        return wait * random.uniform(1.0, 1.25)
+
+    def acquire(self, tokens: int, lane: str = INTERACTIVE) -> Optional[str]:
+        """
+        Blocks until a permit is granted. Returns a lease id (None if the store is
+        unavailable and the call proceeds ungoverned). Raises GovernorTimeout.
+        """
+        start = time.monotonic()
+        while True:
+            try:
+                lease_id, wait = self.try_acquire(tokens, lane)
+            except sqlite3.Error as e:
+                self.store_errors += 1
+                print(f"LLM rate governor unavailable, proceeding ungoverned: {e}")
+                return None
+            if lease_id is not None:
+                self._granted(lane, start)
+                return lease_id
+            self._check_timeout(lane, start, wait)
+            time.sleep(self._wait_step(wait))
+
+    async def acquire_async(self, tokens: int, lane: str = INTERACTIVE) -> Optional[str]:
+        """
+        Async acquire(). The store transaction runs in a thread: BEGIN IMMEDIATE can
+        wait up to the connection timeout while other processes hold the lock.
+        """
+        start = time.monotonic()
+        while True:
+            try:
+                lease_id, wait = await anyio.to_thread.run_sync(self.try_acquire, tokens, lane)
+            except sqlite3.Error as e:
+                self.store_errors += 1
+                print(f"LLM rate governor unavailable, proceeding ungoverned: {e}")
+                return None
+            if lease_id is not None:
+                self._granted(lane, start)
+                return lease_id
+            self._check_timeout(lane, start, wait)
+            await asyncio.sleep(self._wait_step(wait))
+
+    def _granted(self, lane: str, start: float):
+        self.granted[lane] += 1
+        self.waited_seconds[lane] += time.monotonic() - start
+
+    def release(self, lease_id: Optional[str]):
+        if lease_id is None:
+            return
+        try:
+            self._conn().execute("DELETE FROM lease WHERE id = ?", (lease_id,))
+        except sqlite3.Error as e:
+            self.store_errors += 1
+            print(f"LLM rate governor release failed (lease expires on its own): {e}")
+
+    async def release_async(self, lease_id: Optional[str]):
+        if lease_id is None:
+            return
+        with anyio.CancelScope(shield=True): # Also on cancellation, or the slot stays taken until the lease expires
+            await anyio.to_thread.run_sync(self.release, lease_id)
+
+    def penalize(self, seconds: float):
+        """
+        The provider said 429: hold every caller on the host back for `seconds`.
+        """
+        self.penalties += 1
+        try:
+            self._conn().execute(
+                "UPDATE bucket SET blocked_until = MAX(blocked_until, ?) WHERE id = 1",
+                (time.time() + seconds,)
+            )
+        except sqlite3.Error as e:
+            self.store_errors += 1
+            print(f"LLM rate governor penalty not recorded: {e}")
+
+    def stats(self) -> dict:
+        snapshot = {
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "max_in_flight": self.max_in_flight,
+            "granted": dict(self.granted),
+            "avg_wait_ms": {
+                lane: round(self.waited_seconds[lane] / n * 1000, 3) if n else None
+                for lane, n in self.granted.items()
+            },
+            "timeouts": self.timeouts,
+            "penalties": self.penalties,
+            "store_errors": self.store_errors,
+        }
+        try:
+            conn = self._conn()
+            now = time.time()
+            snapshot["in_flight"] = conn.execute("SELECT COUNT(*) FROM lease WHERE expires >= ?", (now,)).fetchone()[0]
+            snapshot["blocked_for_seconds"] = max(conn.execute("SELECT blocked_until FROM bucket WHERE id = 1").fetchone()[0] - now, 0.0)
+        except sqlite3.Error:
+            pass
+        return snapshot
+
+
+governor = RateGovernor(
+    path=settings.LLM_GOVERNOR_PATH or os.path.join(tempfile.gettempdir(), "interview_agent_llm_governor.sqlite"),
+    rpm=settings.LLM_RPM_LIMIT,
+    tpm=settings.LLM_TPM_LIMIT,
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    background_reserve=settings.LLM_BACKGROUND_RESERVE,
+    lease_seconds=settings.LLM_LEASE_SECONDS
+)
+metrics.register("llm_governor", governor.stats)
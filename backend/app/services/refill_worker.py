@@ -0,0 +1,59 @@
+"""
+Base class for background producers that keep a DB-backed stock topped up.
+
+Subclasses implement `refill()`; the worker runs it on startup, whenever
+`notify()` is called (from any thread) and every `refill_interval` seconds.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class RefillWorker(ABC):
+    name = "refill worker"
+
+    def __init__(self, refill_interval: float):
+        self.refill_interval = refill_interval
+        self.refill_errors = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def refill(self):
+        """Tops the stock up; exceptions are counted and the next round retries."""
+
+    def notify(self):
+        """Wakes the producer; safe to call from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        while True:
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refill_errors += 1
+                print(f"{self.name} refill failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
@@ -0,0 +1,225 @@
+"""
+Refresh tokens: rotation and revocation without password hashing.
+
+A login starts a token family and gets an access token plus a refresh token
+(a JWT with typ="refresh", a jti and the family id). Renewing checks the
+refresh token's HMAC signature and expiry, then marks its jti as used by
+inserting it into the RevokedToken table. The unique key makes every refresh
+token single use, across workers too. Presenting a used one again means it
+leaked, so the whole family is revoked.
+
+Revoked families (logout, reuse) are mirrored into an in-memory bloom filter.
+Access tokens carry their family, so get_current_user can reject a logged-out
+token. Most tokens were never revoked and the filter answers "no" without any
+DB access; only a possible hit is confirmed against the table. Workers pull
+other workers' revocations every TOKEN_REVOCATION_SYNC_SECONDS. Renewal always
+syncs first, so a revoked family can never be renewed.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from math import ceil, log
+from typing import Optional
+
+from jose import jwt, JWTError
+from sqlalchemy.exc import IntegrityError
+
+from app.core import metrics, security
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.token import RevokedToken
+
+REFRESH = "refresh"
+FAMILY = "family"
+PRUNE_EVERY = 500 # Stores between deleting expired rows
+
+
+class InvalidRefreshToken(Exception):
+    """The refresh token is malformed, expired, already used or revoked."""
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives. k bit positions per
+    key come from one blake2b digest (double hashing).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(int(ceil(-capacity * log(error_rate) / log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    def __init__(self, capacity: int, sync_seconds: float):
+        self.capacity = capacity
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity)
+        self._last_id = 0
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stores = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+        self.revoked = 0
+        self.reused = 0
+        self.pruned = 0
+
+    def sync(self, force: bool = False):
+        """
+        Adds revocations stored since the last sync (by any worker) to the
+        filter. Rebuilds it from the live rows once it holds more keys than it
+        was sized for, which also drops pruned families.
+        """
+        if not force and self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        with self._lock:
+            db = SessionLocal()
+            try:
+                rows = db.query(RevokedToken.id, RevokedToken.token_id, RevokedToken.kind).filter(
+                    RevokedToken.id > self._last_id
+                ).order_by(RevokedToken.id).all()
+                families = [row.token_id for row in rows if row.kind == FAMILY]
+                if self._bloom.count + len(families) > self.capacity:
+                    families = [row.token_id for row in db.query(RevokedToken.token_id).filter(
+                        RevokedToken.kind == FAMILY, RevokedToken.expires_at >= datetime.utcnow()
+                    )]
+                    self._bloom = BloomFilter(max(self.capacity, len(families) * 2))
+            finally:
+                db.close()
+            for family in families:
+                self._bloom.add(family)
+            if rows:
+                self._last_id = rows[-1].id
+            self._synced_at = time.monotonic()
+
+    def is_revoked(self, family: str) -> bool:
+        self.sync()
+        if family not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+        db = SessionLocal()
+        try:
+            revoked = db.query(RevokedToken.id).filter(
+                RevokedToken.token_id == family, RevokedToken.kind == FAMILY
+            ).first() is not None
+        finally:
+            db.close()
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def _store(self, token_id: str, kind: str, expires_at: datetime) -> bool:
+        """Inserts the row; False if it already existed."""
+        db = SessionLocal()
+        try:
+            db.add(RevokedToken(token_id=token_id, kind=kind, expires_at=expires_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return False
+            self.stores += 1
+            if self.stores % PRUNE_EVERY == 0:
+                self.pruned += db.query(RevokedToken).filter(
+                    RevokedToken.expires_at < datetime.utcnow()
+                ).delete(synchronize_session=False)
+                db.commit()
+            return True
+        finally:
+            db.close()
+
+    def use(self, token_id: str, expires_at: datetime) -> bool:
+        """Marks a refresh token as used; False if it had been used before."""
+        return self._store(token_id, REFRESH, expires_at)
+
+    def revoke_family(self, family: str):
+        # Outlives every token of the family: refresh tokens issued before now expire within REFRESH_TOKEN_EXPIRE_DAYS
+        expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        if self._store(family, FAMILY, expires_at):
+            self.revoked += 1
+        with self._lock:
+            self._bloom.add(family)
+
+    def stats(self) -> dict:
+        return {
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hashes,
+            "bloom_inserts": self._bloom.count, # Syncs re-add this worker's own revocations
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+            "families_revoked": self.revoked,
+            "reuse_detected": self.reused,
+            "stores": self.stores,
+            "pruned": self.pruned,
+        }
+
+
+revocations = RevocationStore(
+    capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    sync_seconds=settings.TOKEN_REVOCATION_SYNC_SECONDS
+)
+metrics.register("token_revocations", revocations.stats)
+
+
+def issue(user_id: int, family: Optional[str] = None) -> dict:
+    """A new access/refresh pair; without `family` this starts a new login."""
+    family = family or uuid.uuid4().hex
+    return {
+        "access_token": security.create_access_token(
+            user_id, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES), family=family
+        ),
+        "refresh_token": security.create_refresh_token(user_id, uuid.uuid4().hex, family),
+        "token_type": "bearer",
+    }
+
+
+def decode(token: str, verify_exp: bool = True) -> dict:
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM], options={"verify_exp": verify_exp}
+        )
+    except JWTError:
+        raise InvalidRefreshToken("Invalid refresh token")
+    if payload.get("typ") != security.REFRESH_TOKEN_TYPE or not all(payload.get(claim) for claim in ("sub", "jti", "fam", "exp")):
+        raise InvalidRefreshToken("Invalid refresh token")
+    return payload
+
+
+def rotate(token: str) -> dict:
+    """
+    Validates a refresh token and uses it up; returns its claims. The caller
+    issues the replacement pair in the same family.
+    """
+    payload = decode(token)
+    revocations.sync(force=True)
+    if revocations.is_revoked(payload["fam"]):
+        raise InvalidRefreshToken("Refresh token has been revoked")
+    if not revocations.use(payload["jti"], datetime.utcfromtimestamp(payload["exp"])):
+        # Second use of a rotated token: it was copied, so end the whole login
+        revocations.reused += 1
+        revocations.revoke_family(payload["fam"])
+        raise InvalidRefreshToken("Refresh token has been revoked")
+    return payload
+
+
+def revoke(token: str):
+    """Logs the refresh token's login out (expired tokens are accepted)."""
+    revocations.revoke_family(decode(token, verify_exp=False)["fam"])
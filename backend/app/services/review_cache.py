@@ -0,0 +1,134 @@
+"""
+Content-addressed cache of coding evaluations (judge results + LLM review).
+
+Keyed by a hash of (problem_id, language, mode, normalized code), so identical
+or whitespace/comment-only-different resubmissions skip both the sandbox and
+the LLM round trip. Two tiers: an in-process TTL/LRU (sub-millisecond hits)
+in front of the CodeReviewCache table, which survives restarts and is shared
+by workers. Both tiers honour CODE_REVIEW_CACHE_TTL_SECONDS and are size bounded.
+"""
+import ast
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.coding import CodeReviewCache
+
+PRUNE_EVERY = 100 # Stores between pruning passes over the persistent tier
+
+
+def normalize_code(code: str, language: str) -> str:
+    """
+    Canonical form of a submission. Python is compared by AST, so formatting
+    and comments do not matter; anything else (or code that does not parse)
+    by its text with line endings, trailing whitespace and blank lines normalized.
+    """
+    code = (code or "").replace("\r\n", "\n").replace("\r", "\n")
+    if (language or "python").lower() == "python":
+        try:
+            return ast.dump(ast.parse(code))
+        except (SyntaxError, ValueError):
+            pass
+    lines = [line.rstrip() for line in code.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def review_key(problem_id: int, language: str, code: str, mode: str) -> str:
+    language = (language or "python").lower()
+    raw = f"{problem_id}\0{language}\0{mode}\0{normalize_code(code, language)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReviewCache:
+    def __init__(self, ttl: float, memory_entries: int, db_entries: int):
+        self.ttl = ttl
+        self.db_entries = db_entries
+        self.memory = TTLCache(maxsize=memory_entries, ttl=ttl)
+        self.db_hits = 0
+        self.db_misses = 0
+        self.stores = 0
+        self.pruned = 0
+
+    def get(self, db: Session, key: str) -> Optional[dict]:
+        """
+        Returns the cached evaluation (treat as read-only), or None.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        row = db.get(CodeReviewCache, key)
+        now = datetime.utcnow()
+        if row is None or row.created_at < now - timedelta(seconds=self.ttl):
+            self.db_misses += 1
+            return None
+        self.db_hits += 1
+        value = json.loads(row.result)
+        row.last_used_at = now
+        db.commit()
+        remaining = self.ttl - (now - row.created_at).total_seconds()
+        self.memory.set(key, value, ttl=remaining)
+        return value
+
+    def put(self, db: Session, key: str, problem_id: int, language: str, value: dict):
+        self.memory.set(key, value)
+        now = datetime.utcnow()
+        db.merge(CodeReviewCache(
+            key=key,
+            problem_id=problem_id,
+            language=(language or "python").lower(),
+            result=json.dumps(value),
+            created_at=now,
+            last_used_at=now
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request stored the same key first
+            db.rollback()
+            return
+        self.stores += 1
+        if self.stores % PRUNE_EVERY == 0:
+            self.prune(db)
+
+    def prune(self, db: Session):
+        """
+        Drops expired rows, then the least recently used rows beyond db_entries.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        removed = db.query(CodeReviewCache).filter(CodeReviewCache.created_at < cutoff).delete(synchronize_session=False)
+        boundary = db.query(CodeReviewCache.last_used_at).order_by(
+            CodeReviewCache.last_used_at.desc()
+        ).offset(self.db_entries).limit(1).scalar()
+        if boundary is not None:
+            removed += db.query(CodeReviewCache).filter(
+                CodeReviewCache.last_used_at <= boundary
+            ).delete(synchronize_session=False)
+        db.commit()
+        self.pruned += removed
+
+    def stats(self) -> dict:
+        db_lookups = self.db_hits + self.db_misses
+        return {
+            "memory": self.memory.stats(),
+            "db_hits": self.db_hits,
+            "db_misses": self.db_misses,
+            "db_hit_rate": round(self.db_hits / db_lookups, 4) if db_lookups else None,
+            "stores": self.stores,
+            "pruned": self.pruned,
+        }
+
+
+review_cache = ReviewCache(
+    ttl=settings.CODE_REVIEW_CACHE_TTL_SECONDS,
+    memory_entries=settings.CODE_REVIEW_CACHE_MEMORY_ENTRIES,
+    db_entries=settings.CODE_REVIEW_CACHE_DB_ENTRIES
+)
+metrics.register("code_review_cache", review_cache.stats)
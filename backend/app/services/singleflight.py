@@ -0,0 +1,111 @@
+"""
+Single-flight coalescing for expensive "get or create" work.
+
+Concurrent callers asking for the same key share one execution:
+- within a process, followers await the leader's future (SingleFlight.do);
+- across worker processes, the leader also takes db_lock(key), a row in the
+  FlightLock table whose primary key makes the INSERT the lock. Other
+  processes wait for it and then re-check for the result before doing the
+  work themselves. A lock whose holder died expires after its ttl.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict
+
+import anyio
+from sqlalchemy.exc import IntegrityError
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.lock import FlightLock
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        """
+        Awaits fn() once for every concurrent caller of `key` in this process.
+        Errors are shared too.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._run(key, fn))
+            self._flights[key] = flight
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        # Shielded: a caller that disconnects must not cancel the work the others are waiting on
+        return await asyncio.shield(flight)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable]):
+        try:
+            return await fn()
+        finally:
+            self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cross_process_lock_waits": self.lock_waits,
+        }
+
+
+def _try_lock(key: str, owner: str, ttl: float) -> bool:
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        # Take over a lock whose holder died
+        db.query(FlightLock).filter(FlightLock.key == key, FlightLock.expires_at < now).delete(synchronize_session=False)
+        db.add(FlightLock(key=key, owner=owner, expires_at=now + timedelta(seconds=ttl)))
+        try:
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+    finally:
+        db.close()
+
+
+def _unlock(key: str, owner: str):
+    db = SessionLocal()
+    try:
+        db.query(FlightLock).filter(FlightLock.key == key, FlightLock.owner == owner).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def db_lock(key: str, ttl: float = None):
+    """
+    Holds the cross-process lock for `key`, polling until it is free.
+    """
+    ttl = ttl or settings.SINGLE_FLIGHT_LOCK_TTL
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    waited = False
+    while not await anyio.to_thread.run_sync(_try_lock, key, owner, ttl):
+        if not waited:
+            flights.lock_waits += 1
+            waited = True
+        await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        await anyio.to_thread.run_sync(_unlock, key, owner)
+
+
+flights = SingleFlight()
+metrics.register("single_flight", flights.stats)
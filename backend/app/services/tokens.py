@@ -0,0 +1,45 @@
+"""
+Prompt token accounting.
+
+Uses tiktoken when it is installed; otherwise falls back to the usual
+~4 characters per token estimate, which is close enough for budgeting.
+"""
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+MESSAGE_OVERHEAD = 4 # Role and separators per chat message
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+
+
+def prompt_tokens(messages: list) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def trim_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    Cuts text down to roughly max_tokens, keeping the start (or the end with keep="tail").
+    """
+    text = text or ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        ids = _encoding.encode(text)
+        ids = ids[:max_tokens] if keep == "head" else ids[-max_tokens:]
+        trimmed = _encoding.decode(ids)
+    else:
+        trimmed = text[:max_tokens * 4] if keep == "head" else text[-max_tokens * 4:]
+    return trimmed + "... (truncated)" if keep == "head" else "(earlier parts omitted) ..." + trimmed
@@ -0,0 +1,54 @@
+"""
+Interview transcripts: one ordered, column-projected query, plus the snapshot
+written when a session ends.
+
+At /end the whole transcript is stored on the session as zlib-compressed JSON
+(transcript_snapshot, with transcript_upto_id as its last message id). It is
+never rewritten, so replaying a finished interview decodes one column instead
+of re-reading every message row; only messages added after the snapshot (if
+any) are fetched, with one index probe on (session_id, id).
+"""
+import json
+import zlib
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.interview import InterviewSession, InterviewMessage
+
+
+def load(db: Session, session_id: int, after_id: int = 0) -> list:
+    """The session's messages after `after_id`, in order: [(id, role, content), ...]."""
+    return db.query(InterviewMessage.id, InterviewMessage.role, InterviewMessage.content).filter(
+        InterviewMessage.session_id == session_id,
+        InterviewMessage.id > after_id
+    ).order_by(InterviewMessage.id.asc()).all()
+
+
+def encode(messages: list) -> bytes:
+    return zlib.compress(json.dumps(messages, separators=(",", ":")).encode(), 6)
+
+
+def decode(snapshot: bytes) -> list:
+    return json.loads(zlib.decompress(snapshot))
+
+
+def take_snapshot(db: Session, session: InterviewSession) -> bool:
+    """
+    Stores the transcript on an ending session (in the caller's transaction).
+    A session keeps its first snapshot; returns False if it already had one.
+    """
+    if session.transcript_snapshot is not None:
+        return False
+    rows = load(db, session.id)
+    session.transcript_snapshot = encode([{"role": role, "content": content} for _, role, content in rows])
+    session.transcript_upto_id = rows[-1].id if rows else 0
+    return True
+
+
+def get(db: Session, session_id: int, snapshot: Optional[bytes], upto_id: Optional[int]) -> list:
+    """[{"role", "content"}, ...] for the session, from its snapshot when it has one."""
+    if snapshot is None:
+        return [{"role": role, "content": content} for _, role, content in load(db, session_id)]
+    # Messages sent after /end (normally none) are appended to the snapshot
+    return decode(snapshot) + [{"role": role, "content": content} for _, role, content in load(db, session_id, upto_id or 0)]
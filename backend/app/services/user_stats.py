@@ -0,0 +1,120 @@
+"""
+Incrementally maintained per-user stats behind GET /profile/stats.
+
+Every write that changes a user's numbers (assessment submit, coding submit,
+interview start, interview feedback) bumps the user's UserStats row in the
+same transaction as the write itself, so the row never drifts from the
+activity tables and the endpoint is a single-row read. A user without a row
+(an install from before this table) gets one computed from the activity
+tables on first touch; rebuild_user_stats.py recomputes all of them.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.assessment import UserAssessmentAttempt
+from app.models.coding import CodingSubmission
+from app.models.interview import InterviewSession
+from app.models.stats import UserStats
+
+
+def compute(db: Session, user_id: int) -> UserStats:
+    """The user's stats aggregated from the activity tables (rebuild / first-touch path)."""
+    assessment_count, score_sum = db.query(
+        func.count(UserAssessmentAttempt.id), func.coalesce(func.sum(UserAssessmentAttempt.score), 0)
+    ).filter(UserAssessmentAttempt.user_id == user_id).one()
+    coding_submissions, coding_passed = db.query(
+        func.count(CodingSubmission.id), func.coalesce(func.sum(case((CodingSubmission.status == "Passed", 1), else_=0)), 0)
+    ).filter(CodingSubmission.user_id == user_id).one()
+    interview_count = db.query(func.count(InterviewSession.id)).filter(InterviewSession.user_id == user_id).scalar()
+    last_interview = db.query(InterviewSession.id, InterviewSession.score).filter(
+        InterviewSession.user_id == user_id
+    ).order_by(InterviewSession.created_at.desc(), InterviewSession.id.desc()).first()
+    return UserStats(
+        user_id=user_id,
+        assessment_count=assessment_count,
+        assessment_score_sum=score_sum,
+        coding_submissions=coding_submissions,
+        coding_passed=coding_passed,
+        interview_count=interview_count,
+        last_interview_id=last_interview.id if last_interview else None,
+        last_interview_score=last_interview.score if last_interview else None,
+        updated_at=datetime.utcnow()
+    )
+
+
+def _ensure_row(db: Session, user_id: int) -> bool:
+    """
+    Creates the user's row from the activity tables if it is missing. Returns True
+    if it did (the new row already counts whatever the caller has flushed).
+    """
+    if db.query(UserStats.user_id).filter(UserStats.user_id == user_id).first() is not None:
+        return False
+    db.flush() # The caller's new activity rows must be visible to compute()
+    try:
+        with db.begin_nested():
+            db.add(compute(db, user_id))
+        return True
+    except IntegrityError:
+        return False # A concurrent request created it first; fall back to bumping
+
+
+def _bump(db: Session, user_id: int, values: dict):
+    # Column arithmetic in the UPDATE, so concurrent bumps can't lose increments
+    values["updated_at"] = datetime.utcnow()
+    if db.query(UserStats).filter(UserStats.user_id == user_id).update(values, synchronize_session=False):
+        return
+    if not _ensure_row(db, user_id):
+        db.query(UserStats).filter(UserStats.user_id == user_id).update(values, synchronize_session=False)
+
+
+def record_assessment_attempts(db: Session, user_id: int, scores: list):
+    """Call after adding the attempts and before committing them."""
+    _bump(db, user_id, {
+        UserStats.assessment_count: UserStats.assessment_count + len(scores),
+        UserStats.assessment_score_sum: UserStats.assessment_score_sum + sum(score or 0 for score in scores),
+    })
+
+
+def record_coding_submission(db: Session, user_id: int, passed: bool):
+    """Call after adding the submission and before committing it."""
+    _bump(db, user_id, {
+        UserStats.coding_submissions: UserStats.coding_submissions + 1,
+        UserStats.coding_passed: UserStats.coding_passed + (1 if passed else 0),
+    })
+
+
+def record_interview_started(db: Session, user_id: int, session_id: int):
+    """Call after the new session has been flushed (it needs its id) and before committing."""
+    _bump(db, user_id, {
+        UserStats.interview_count: UserStats.interview_count + 1,
+        UserStats.last_interview_id: session_id, # Sessions only ever get newer ids
+        UserStats.last_interview_score: None,
+    })
+
+
+def record_interview_score(db: Session, user_id: int, session_id: int, score: Optional[int]):
+    """Call with the feedback write; only the newest session's score is kept."""
+    if _ensure_row(db, user_id):
+        return
+    db.query(UserStats).filter(UserStats.user_id == user_id, UserStats.last_interview_id == session_id).update(
+        {UserStats.last_interview_score: score, UserStats.updated_at: datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def get(db: Session, user_id: int) -> UserStats:
+    """The user's row, created (and committed) on first read."""
+    stats = db.get(UserStats, user_id)
+    if stats is None:
+        _ensure_row(db, user_id)
+        db.commit()
+        stats = db.get(UserStats, user_id)
+    return stats
+
+
+def rebuild(db: Session, user_id: int) -> UserStats:
+    """Recomputes the user's row from the activity tables."""
+    return db.merge(compute(db, user_id))
@@ -0,0 +1,102 @@
+"""
+Throughput benchmark for bearer-token authentication (deps.get_current_user).
+
+Runs against a throwaway SQLite database and compares:
+  - before: decode the JWT, then open a session and query the user on every request
+  - after:  decode the JWT, then the in-process principal cache (no DB session on a hit)
+both as the bare dependency (calls per second) and end to end through the ASGI
+app on GET /users/me (requests per second, CONCURRENCY in flight).
+
+Usage:
+    python bench_auth.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["CODING_BANK_ENABLED"] = "false"
+sys.path.append(os.getcwd())
+
+import httpx
+from fastapi import Depends, HTTPException
+from jose import jwt
+
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.schemas import token as token_schemas
+
+
+def before_get_current_user(token: str = Depends(deps.reusable_oauth2)) -> User:
+    # What deps.get_current_user used to do (with its own session, as get_db gave it one)
+    db = SessionLocal()
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        token_data = token_schemas.TokenPayload(**payload)
+        user = db.query(User).filter(User.id == token_data.sub).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+    finally:
+        db.close()
+
+
+def seed() -> str:
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench", is_active=True)
+    db.add(user)
+    db.commit()
+    token = security.create_access_token(user.id)
+    db.close()
+    return token
+
+
+def direct(name: str, fn, token: str):
+    fn(token) # Warm up (fills the cache for "after")
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        fn(token)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34} {REQUESTS / elapsed:10,.0f} calls/s   {elapsed / REQUESTS * 1e6:7.1f} us/call")
+
+
+async def end_to_end(name: str, token: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+        remaining = iter(range(REQUESTS))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/api/v1/users/me", headers=headers)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(CONCURRENCY)])
+        rps = REQUESTS / (time.perf_counter() - start)
+    print(f"{name:<34} {rps:10,.0f} req/s")
+    return rps
+
+
+if __name__ == "__main__":
+    token = seed()
+    direct("dependency before (DB per call)", before_get_current_user, token)
+    direct("dependency after (cached)", deps.get_current_user, token)
+
+    app.dependency_overrides[deps.get_current_user] = before_get_current_user
+    slow = asyncio.run(end_to_end("GET /users/me before", token))
+    app.dependency_overrides.clear()
+    fast = asyncio.run(end_to_end("GET /users/me after", token))
+    print(f"throughput gain: {fast / slow:.2f}x   (principal cache: {deps._principals.stats()['hit_rate']} hit rate)")
@@ -0,0 +1,96 @@
+"""
+Benchmark for the local code judge: cold interpreter per case vs the warm
+pre-forked pool, sequential vs parallel test-case fan-out, and fail-fast vs
+full mode on a wrong submission.
+
+Every problem gets 100+ generated test cases. The "slow" solution sleeps a
+little per case so the benchmark shows wall-clock overlap even on small
+machines; the "cpu" solution is pure computation and only speeds up with
+more cores.
+
+Usage:
+    JUDGE_WORKERS=8 python bench_code_judge.py [cases_per_problem]
+"""
+import os
+import sys
+import time
+
+CASES = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+sys.path.append(os.getcwd())
+
+from app.services.judge import engine
+
+TWO_SUM_CASES = [
+    {"input": f"nums = {list(range(i + 2))}, target = {2 * i + 1}", "output": f"[{i}, {i + 1}]"}
+    for i in range(CASES)
+]
+FIB = [0, 1]
+while len(FIB) < 25:
+    FIB.append(FIB[-1] + FIB[-2])
+FIB_CASES = [{"input": f"n = {i % 25}", "output": str(FIB[i % 25])} for i in range(CASES)]
+
+SOLUTIONS = {
+    "slow (sleep 50ms)": ("""
+import time
+def solution(nums, target):
+    time.sleep(0.05)
+    seen = {}
+    for i, n in enumerate(nums):
+        if target - n in seen:
+            return [seen[target - n], i]
+        seen[n] = i
+""", TWO_SUM_CASES),
+    "cpu (naive fib)": ("""
+def solution(n):
+    return n if n < 2 else solution(n - 1) + solution(n - 2)
+""", FIB_CASES),
+}
+
+WRONG = """
+def solution(nums, target):
+    import time
+    time.sleep(0.05)
+    return [0, 0]
+"""
+
+
+def run(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    slowest = max((c["time_ms"] for c in result["cases"]), default=0.0)
+    skipped = sum(1 for c in result["cases"] if c["status"] == "skipped")
+    print(f"  {label:<12} {elapsed:7.2f}s  passed {result['passed']}/{result['total']}"
+          f"  skipped {skipped:<4} slowest case {slowest:.0f} ms")
+    return elapsed
+
+
+def per_case(label, fn, code, cases):
+    start = time.perf_counter()
+    for i, case in enumerate(cases):
+        assert fn(code, case, i)["passed"]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<12} {elapsed * 1000 / len(cases):7.1f} ms per case")
+    return elapsed
+
+
+if __name__ == "__main__":
+    print(f"{CASES} cases per problem, {engine.JUDGE_WORKERS} judge workers, {os.cpu_count()} CPUs")
+    engine.warm_pool.start()
+
+    print("\nstartup cost (one case at a time)")
+    code, cases = SOLUTIONS["cpu (naive fib)"]
+    cold = per_case("cold spawn", engine.run_case_cold, code, cases)
+    warm = per_case("warm pool", engine.run_case_warm, code, cases)
+    print(f"  speedup      {cold / warm:.1f}x")
+    for name, (code, cases) in SOLUTIONS.items():
+        print(f"\n{name}")
+        sequential = run("sequential", engine.judge_sequential, code, "python", cases)
+        parallel = run("parallel", engine.judge, code, "python", cases)
+        print(f"  speedup      {sequential / parallel:.1f}x")
+
+    print("\nwrong answer")
+    run("full", engine.judge, WRONG, "python", TWO_SUM_CASES)
+    run("fail-fast", engine.judge, WRONG, "python", TWO_SUM_CASES, fail_fast=True)
+    print(f"\npool: {engine.stats()}")
+    engine.warm_pool.close()
@@ -0,0 +1,70 @@
+"""
+Latency benchmark for GET /coding/daily served from the problem bank.
+
+Seeds a throwaway SQLite database with a bank of problems, then measures
+p50/p99 for the cached "today's problem" read and for refresh=true
+("Load Next Question", which selects an unseen problem and records the view).
+
+Usage:
+    python bench_coding_daily.py [bank_size] [requests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+BANK_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ["CODING_BANK_ENABLED"] = "false"
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["OPENAI_API_KEY"] = ""
+sys.path.append(os.getcwd())
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db.session import SessionLocal
+from app.services.coding_bank import add_problem, DIFFICULTIES
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timed(client, url, headers, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    for i in range(BANK_SIZE):
+        add_problem(db, {
+            "title": f"Benchmark Problem {i}",
+            "description": f"Synthetic problem number {i}.",
+            "difficulty": DIFFICULTIES[i % 3],
+            "test_cases": [{"input": "x = 1", "output": "1"}]
+        })
+    db.close()
+
+    with TestClient(app) as client:
+        client.post("/api/v1/users/", json={"email": "bench@example.com", "password": "password123"})
+        token = client.post("/api/v1/login/access-token", data={"username": "bench@example.com", "password": "password123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"Bank size: {BANK_SIZE} problems, {REQUESTS} requests per scenario")
+        for name, url in [
+            ("today's problem", "/api/v1/coding/daily"),
+            ("refresh=true", "/api/v1/coding/daily?refresh=true"),
+            ("refresh=true&difficulty", "/api/v1/coding/daily?refresh=true&difficulty=Medium"),
+        ]:
+            samples = timed(client, url, headers, REQUESTS)
+            print(f"{name:<26} p50 {percentile(samples, 50):6.2f} ms   p99 {percentile(samples, 99):6.2f} ms")
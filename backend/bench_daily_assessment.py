@@ -0,0 +1,144 @@
+"""
+Latency benchmark for finding "today's assessment" among many historical ones.
+
+Seeds a throwaway SQLite database with N past assessments (6 questions each)
+and compares:
+  - before: range filter on Assessment.date (no index) + lazy question load + serialize
+  - after:  uncached load (assessment_day index + question.assessment_id index),
+            and the single index probe grading uses to re-validate its cache entry
+  - cached: the in-process cache hit GET /assessment/daily now serves from
+It also reports the per-request encoding cost the pre-encoded body avoids,
+grading by question text (re-validating the set) vs by id from the cached
+answer key, and the SQL statements needed to store a generated set.
+
+Usage:
+    python bench_daily_assessment.py [assessments] [lookups]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ASSESSMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+LOOKUPS = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["CODING_BANK_ENABLED"] = "false"
+sys.path.append(os.getcwd())
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.models import user # noqa: F401 (referenced by assessment attempts)
+from app.models.assessment import Assessment
+from app.services import daily_assessment
+from app.services.assessment_pool import ACTIVE, store_question_set
+
+Base.metadata.create_all(bind=engine)
+
+
+def seed():
+    today = datetime.utcnow().replace(hour=9, minute=0, second=0, microsecond=0)
+    with engine.begin() as conn:
+        # Several sets per past day (refreshes), like a long-running install; the newest is the day's current one
+        rows = []
+        days = (ASSESSMENTS + 2) // 3
+        for i in range(ASSESSMENTS):
+            d, n = divmod(i, 3)
+            when = today.replace(hour=1) - timedelta(days=days - d) + timedelta(hours=8 * n)
+            current = n == 2 or i == ASSESSMENTS - 1
+            rows.append({"id": i + 1, "title": f"Daily Assessment {when.date()}", "date": when, "status": "active", "day": when.date() if current else None})
+        rows.append({"id": ASSESSMENTS + 1, "title": "Daily Assessment today", "date": today, "status": "active", "day": today.date()})
+        conn.execute(text(
+            "INSERT INTO assessment (id, title, date, status, assessment_day) VALUES (:id, :title, :date, :status, :day)"
+        ), rows)
+        conn.execute(text(
+            "INSERT INTO question (assessment_id, text, type, category, options, correct_answer) "
+            "VALUES (:a, :t, 'mcq', 'Java', '[\"A\", \"B\", \"C\", \"D\"]', 'A')"
+        ), [{"a": a["id"], "t": f"Question {n} of set {a['id']}"} for a in rows for n in range(6)])
+    return today.date()
+
+
+def before(db, today):
+    # The query /daily and /submit used to run
+    assessment = db.query(Assessment).filter(
+        Assessment.status != "pooled",
+        Assessment.date >= datetime.combine(today, datetime.min.time()),
+        Assessment.date < datetime.combine(today, datetime.max.time())
+    ).first()
+    return {"questions": [
+        {"id": q.id, "text": q.text, "type": q.type, "options": q.options,
+         "correct_answer": q.correct_answer or "", "category": q.category or "General"}
+        for q in assessment.questions
+    ]}
+
+
+def timed(name, fn, db, today):
+    samples = []
+    for _ in range(LOOKUPS):
+        db.expire_all()
+        start = time.perf_counter()
+        fn(db, today)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{name:<36} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+    return p50
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    today = seed()
+    print(f"Seeded {ASSESSMENTS + 1} assessments / {(ASSESSMENTS + 1) * 6} questions in {time.perf_counter() - start:.1f}s")
+    db = SessionLocal()
+    with engine.connect() as conn:
+        for label, sql in [
+            ("before", "SELECT id FROM assessment WHERE status != 'pooled' AND date >= :lo AND date < :hi LIMIT 1"),
+            ("after", "SELECT id FROM assessment WHERE assessment_day = :day"),
+        ]:
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), {
+                "lo": datetime.combine(today, datetime.min.time()), "hi": datetime.combine(today, datetime.max.time()), "day": today
+            }).fetchall()
+            print(f"plan {label:<7} {' / '.join(row[-1] for row in plan)}")
+
+    assert before(db, today)["questions"] == daily_assessment.get_today(db, today).response["questions"]
+    slow = timed("before: date range scan", before, db, today)
+    def cold(db, day):
+        daily_assessment.invalidate(day)
+        return daily_assessment.get_today(db, day).response
+    timed("after: uncached (index + questions)", cold, db, today)
+    timed("after: assessment_day index probe", lambda db, day: daily_assessment.get_today(db, day, validate=True), db, today)
+    fast = timed("after: cached (GET /daily)", lambda db, day: daily_assessment.get_today(db, day).response, db, today)
+    print(f"speedup (cached vs before): {slow / fast:,.0f}x")
+
+    # Per-request encoding of the cached dict (what a plain `return dict` costs) vs the pre-encoded body
+    daily_set = daily_assessment.get_today(db, today)
+    timed("encode: jsonable_encoder + dumps", lambda db, day: json.dumps(jsonable_encoder(daily_set.response)).encode(), db, today)
+    timed("encode: pre-encoded body", lambda db, day: daily_set.body, db, today)
+
+    # Grading: keyed by question text, explanations rebuilt per submit (before) vs the cached answer key
+    by_text = {q["text"]: "B" for q in daily_set.questions}
+    def grade_by_text(db, day):
+        results = []
+        for q in daily_assessment.get_today(db, day, validate=True).questions:
+            answer = by_text.get(q["text"])
+            results.append({"question": q["text"], "user_answer": answer, "is_correct": answer == q["correct_answer"],
+                            "explanation": f"You selected: '{answer}'. The correct answer is: '{q['correct_answer']}'"})
+        return results
+    by_id = {str(q["id"]): "B" for q in daily_set.questions}
+    timed("grade: by text, re-validated", grade_by_text, db, today)
+    timed("grade: by id, cached answer key", lambda db, day: daily_assessment.answer_key(db, daily_set.id).grade(by_id), db, today)
+
+    # Round trips to store one generated set
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    store_question_set(db, [dict(q, category="Java", correct_answer="A") for q in daily_set.questions], status=ACTIVE)
+    print(f"store_question_set: {len(statements)} statements for {len(daily_set.questions)} questions")
+    db.close()
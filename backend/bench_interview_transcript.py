@@ -0,0 +1,108 @@
+"""
+Latency benchmark for replaying a finished interview (GET /profile/history/interview/{id}).
+
+Seeds a throwaway SQLite database with SESSIONS completed interviews of
+MESSAGES messages each (interleaved, as concurrent interviews write them)
+and compares:
+  - before:   session.messages through the lazy relationship (unordered, full rows)
+  - ordered:  one ordered, column-projected query on (session_id, id)
+  - snapshot: decoding the compressed transcript stored at /end (+ the empty tail probe)
+It also reports the snapshot size against the raw transcript.
+
+Usage:
+    python bench_interview_transcript.py [sessions] [messages] [lookups]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+MESSAGES = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+LOOKUPS = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.models import user # noqa: F401
+from app.models.interview import InterviewSession
+from app.services import transcript
+
+Base.metadata.create_all(bind=engine)
+
+WORDS = ("I would start by clarifying the requirements then sketch the data model and talk through trade-offs "
+         "of caching indexes queues latency consistency retries sharding replicas tests deploy rollback monitor").split()
+
+
+def answer(n: int) -> str:
+    rng = random.Random(n)
+    return " ".join(rng.choice(WORDS) for _ in range(60))
+
+
+def seed():
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO interviewsession (id, user_id, status) VALUES (:id, 1, 'completed')"),
+                     [{"id": s} for s in range(1, SESSIONS + 1)])
+        conn.execute(text("INSERT INTO interviewmessage (session_id, role, content) VALUES (:s, :r, :c)"), [
+            {"s": s, "r": "user" if n % 2 else "assistant", "c": answer(s * MESSAGES + n)}
+            for n in range(MESSAGES) for s in range(1, SESSIONS + 1)
+        ])
+    db = SessionLocal()
+    for session in db.query(InterviewSession):
+        transcript.take_snapshot(db, session)
+    db.commit()
+    db.close()
+
+
+def before(db, session_id):
+    session = db.get(InterviewSession, session_id)
+    return [{"role": m.role, "content": m.content} for m in session.messages]
+
+
+def ordered(db, session_id):
+    return [{"role": role, "content": content} for _, role, content in transcript.load(db, session_id)]
+
+
+def snapshot(db, session_id):
+    session = db.get(InterviewSession, session_id)
+    return transcript.get(db, session_id, session.transcript_snapshot, session.transcript_upto_id)
+
+
+def timed(name, fn):
+    samples = []
+    db = SessionLocal()
+    for i in range(LOOKUPS):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db, i % SESSIONS + 1)
+        samples.append(time.perf_counter() - start)
+    db.close()
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{name:<32} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+    return p50
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    seed()
+    print(f"Seeded {SESSIONS} sessions x {MESSAGES} messages in {time.perf_counter() - start:.1f}s")
+    db = SessionLocal()
+    assert ordered(db, 1) == snapshot(db, 1)
+    session = db.get(InterviewSession, 1)
+    raw = len(json.dumps(ordered(db, 1)).encode())
+    print(f"snapshot: {len(session.transcript_snapshot):,} bytes for a {raw:,} byte transcript ({raw / len(session.transcript_snapshot):.1f}x smaller)")
+    db.close()
+
+    slow = timed("before: lazy session.messages", before)
+    timed("ordered: projected query", ordered)
+    fast = timed("snapshot: decode at /end copy", snapshot)
+    print(f"speedup (snapshot vs before): {slow / fast:,.1f}x")
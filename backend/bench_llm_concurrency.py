@@ -0,0 +1,69 @@
+"""
+Load benchmark: concurrent interview sessions per worker, sync vs async LLM path.
+
+Starts fake_openai_server.py with a fixed completion latency and fires N
+simultaneous interview turns:
+  - before: sync llm.generate_interview_followup() dispatched to the AnyIO
+    threadpool, which is what a sync `def` FastAPI handler does (40 threads)
+  - after:  await async_llm.generate_interview_followup() on the event loop
+
+Usage:
+    python bench_llm_concurrency.py [sessions] [latency_seconds]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+LATENCY = sys.argv[2] if len(sys.argv) > 2 else "1.0"
+PORT = "9100"
+
+os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{PORT}/v1"
+os.environ["OPENAI_API_KEY"] = "sk-local-fake"
+os.environ["FAKE_LLM_LATENCY"] = LATENCY
+sys.path.append(os.getcwd())
+
+import anyio
+from app.services import llm, async_llm
+
+HISTORY = [{"role": "user", "content": "I have built REST APIs with FastAPI and Postgres."}]
+JD = "Backend developer, Python APIs"
+
+
+async def run_before():
+    # Same limiter FastAPI/Starlette uses for sync endpoints
+    return await asyncio.gather(*[
+        anyio.to_thread.run_sync(llm.generate_interview_followup, HISTORY, JD)
+        for _ in range(SESSIONS)
+    ])
+
+
+async def run_after():
+    return await asyncio.gather(*[
+        async_llm.generate_interview_followup(HISTORY, JD)
+        for _ in range(SESSIONS)
+    ])
+
+
+def measure(name, runner):
+    start = time.perf_counter()
+    results = asyncio.run(runner())
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r)
+    print(f"{name:<28} {SESSIONS} turns in {elapsed:6.2f}s -> {ok / elapsed:7.1f} turns/s, "
+          f"~{ok / elapsed * float(LATENCY):6.0f} sessions in flight per worker")
+
+
+if __name__ == "__main__":
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fake_openai_server:app", "--port", PORT, "--log-level", "warning"]
+    )
+    try:
+        time.sleep(3)
+        print(f"Fake provider latency: {LATENCY}s, concurrent sessions: {SESSIONS}")
+        measure("before (sync + threadpool)", run_before)
+        measure("after (async client)", run_after)
+    finally:
+        server.terminate()
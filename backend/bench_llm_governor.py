@@ -0,0 +1,103 @@
+"""
+Load benchmark: LLM rate governor across worker processes.
+
+Starts fake_openai_server.py with a provider-side limit (FAKE_LLM_RPM, answers
+429 + Retry-After above it) and runs PROCESSES app processes at once. Each one
+fires a burst of background calls (rolling summaries) together with a few live
+interview turns:
+  - ungoverned: governor limits far above the provider's, so every process
+    sends whatever it has and learns about the limit from 429s
+  - governed:   LLM_RPM_LIMIT equal to the provider's limit, shared by all
+    processes through the governor's SQLite file
+
+Reported: 429s the provider had to send, calls answered with mock fallback
+data, and live-turn latency while the background burst is queued.
+
+Usage:
+    python bench_llm_governor.py [processes] [provider_rpm]
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+PROCESSES = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+PROVIDER_RPM = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+BACKGROUND_CALLS = 20 # per process
+INTERACTIVE_CALLS = 5 # per process
+PORT = "9101"
+
+HISTORY = [{"role": "user", "content": "I have built REST APIs with FastAPI and Postgres."}]
+JD = "Backend developer, Python APIs"
+
+
+def worker(results):
+    sys.path.append(os.getcwd())
+    from app.services import async_llm
+    from app.services.rate_governor import governor
+
+    async def timed(coro):
+        start = time.perf_counter()
+        await coro
+        return time.perf_counter() - start
+
+    async def main():
+        background = [timed(async_llm.summarize_turns("", HISTORY, JD)) for _ in range(BACKGROUND_CALLS)]
+        interactive = [timed(async_llm.generate_interview_followup(HISTORY, JD)) for _ in range(INTERACTIVE_CALLS)]
+        done = await asyncio.gather(*background, *interactive)
+        return done[:BACKGROUND_CALLS], done[BACKGROUND_CALLS:]
+
+    background, interactive = asyncio.run(main())
+    results.put({"background": background, "interactive": interactive, "timeouts": governor.timeouts})
+
+
+def provider_stats() -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/stats") as response:
+        return json.loads(response.read())
+
+
+def run(name: str, governor_rpm: int):
+    os.environ["LLM_RPM_LIMIT"] = str(governor_rpm)
+    os.environ["LLM_GOVERNOR_PATH"] = os.path.join(tempfile.mkdtemp(), "governor.sqlite")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fake_openai_server:app", "--port", PORT, "--log-level", "warning"],
+        env=dict(os.environ, FAKE_LLM_RPM=str(PROVIDER_RPM), FAKE_LLM_LATENCY="0.2")
+    )
+    try:
+        time.sleep(3)
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        start = time.perf_counter()
+        procs = [ctx.Process(target=worker, args=(results,)) for _ in range(PROCESSES)]
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+        stats = provider_stats()
+    finally:
+        server.terminate()
+        server.wait()
+
+    calls = PROCESSES * (BACKGROUND_CALLS + INTERACTIVE_CALLS)
+    answered = stats["requests"] - stats["rate_limited"]
+    interactive = sorted(t for r in collected for t in r["interactive"])
+    background = sorted(t for r in collected for t in r["background"])
+    print(f"{name:<11} {calls} calls in {elapsed:5.1f}s | provider 429s: {stats['rate_limited']:3d} | "
+          f"mock fallbacks: {calls - answered:3d} | live turn p50/max: "
+          f"{statistics.median(interactive):5.2f}s/{interactive[-1]:5.2f}s | background max: {background[-1]:5.2f}s")
+
+
+if __name__ == "__main__":
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{PORT}/v1"
+    os.environ["OPENAI_API_KEY"] = "sk-local-fake"
+    print(f"{PROCESSES} processes x ({BACKGROUND_CALLS} background + {INTERACTIVE_CALLS} live) calls, provider limit {PROVIDER_RPM} RPM")
+    run("ungoverned", 10 ** 6)
+    run("governed", PROVIDER_RPM)
@@ -0,0 +1,92 @@
+"""
+Login-burst benchmark: how much a burst of logins slows everything else.
+
+Fires BURST concurrent logins at the ASGI app while timing a cheap sync
+endpoint (GET /health, served from the same request threadpool) and
+compares:
+  - before: bcrypt verify run on the request threadpool (the old synchronous login)
+  - after:  bcrypt verify in the bounded hashing process pool
+It reports login throughput and the probe's latency during the burst.
+
+Usage:
+    python bench_password_hashing.py [burst] [rounds]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BURST = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+ROUNDS = sys.argv[2] if len(sys.argv) > 2 else "12"
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ["PASSWORD_BCRYPT_ROUNDS"] = ROUNDS
+os.environ["PASSWORD_HASH_MAX_PENDING"] = str(BURST)
+os.environ["LOGIN_THROTTLE_MAX_FAILURES"] = str(BURST * 10)
+os.environ["LOGIN_THROTTLE_IP_MAX_FAILURES"] = str(BURST * 10)
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["CODING_BANK_ENABLED"] = "false"
+sys.path.append(os.getcwd())
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+async def burst(label: str):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        form = {"username": "bench@example.com", "password": "password123"}
+        assert (await client.post("/api/v1/login/access-token", data=form)).status_code == 200 # Warm up
+        probes = []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        async def login():
+            response = await client.post("/api/v1/login/access-token", data=form)
+            assert response.status_code == 200, response.text
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(BURST)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    print(f"{label:<34} {BURST / elapsed:6.1f} logins/s   /health p50 {percentile(probes, 0.5):8.1f} ms   "
+          f"p99 {percentile(probes, 0.99):8.1f} ms   ({len(probes)} probes)")
+
+
+if __name__ == "__main__":
+    import anyio
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.core import security
+    from app.models.user import User
+    from app.services.password_hasher import password_hasher
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", hashed_password=security.get_password_hash("password123"), is_active=True))
+    db.commit()
+    db.close()
+    print(f"bcrypt rounds {ROUNDS}, {BURST} concurrent logins, {password_hasher.workers} hashing processes, {os.cpu_count()} CPUs")
+
+    # Before: the same verify, on the request threadpool
+    pooled_run = password_hasher._run
+    password_hasher._run = lambda fn, *args: anyio.to_thread.run_sync(fn, *args)
+    asyncio.run(burst("before: threadpool bcrypt"))
+    password_hasher._run = pooled_run
+    asyncio.run(burst("after: hashing process pool"))
+    password_hasher.close()
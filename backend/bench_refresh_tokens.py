@@ -0,0 +1,75 @@
+"""
+Latency benchmark for renewing a session: password login vs refresh token.
+
+Runs against a throwaway SQLite database and compares, end to end through the
+app (TestClient, sequential requests):
+  - before: POST /login/access-token again once the access token expires (bcrypt verify)
+  - after:  POST /login/refresh-token (HMAC check + one insert marking the old token used)
+and the bearer-token check on GET /users/me with and without the revocation
+lookup (bloom filter miss, no DB access).
+
+Usage:
+    python bench_refresh_tokens.py [renewals]
+"""
+import os
+import sys
+import tempfile
+import time
+
+RENEWALS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["CODING_BANK_ENABLED"] = "false"
+sys.path.append(os.getcwd())
+
+
+def report(name: str, samples: list) -> float:
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{name:<40} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+    return p50
+
+
+def timed(fn, n: int) -> list:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+if __name__ == "__main__": # The password hasher's spawned workers re-import this module
+    from fastapi.testclient import TestClient
+    from app.core import security
+    from app.main import app
+    from app.services.refresh_tokens import revocations
+
+    with TestClient(app) as client:
+        A = "/api/v1"
+        client.post(f"{A}/users/", json={"email": "bench@example.com", "password": "pw12345", "full_name": "Bench"})
+        form = {"username": "bench@example.com", "password": "pw12345"}
+
+        def login():
+            response = client.post(f"{A}/login/access-token", data=form)
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        tokens = login()
+        def refresh():
+            response = client.post(f"{A}/login/refresh-token", json={"refresh_token": tokens["refresh_token"]})
+            assert response.status_code == 200, response.text
+            tokens.update(response.json())
+
+        slow = report("before: re-login (bcrypt verify)", timed(login, RENEWALS))
+        fast = report("after: refresh token rotation", timed(refresh, RENEWALS * 10))
+        print(f"speedup: {slow / fast:,.0f}x")
+
+        def me(token):
+            return lambda: client.get(f"{A}/users/me", headers={"Authorization": f"Bearer {token}"})
+        report("GET /users/me, token without family", timed(me(security.create_access_token(1)), RENEWALS * 10))
+        report("GET /users/me, revocation check", timed(me(tokens["access_token"]), RENEWALS * 10))
+        print(revocations.stats())
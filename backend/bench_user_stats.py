@@ -0,0 +1,128 @@
+"""
+Latency benchmark for GET /profile/stats on users with a long history.
+
+Seeds a throwaway SQLite database with USERS users holding RECORDS activity
+rows each (split across assessment attempts, coding submissions and interview
+sessions) and compares:
+  - before:  loading every row of the user into Python to count and average
+  - after:   the single UserStats row read
+  - rebuild: recomputing one user's row with SQL aggregates (rebuild_user_stats.py)
+It also times the incremental bump a submit now adds to its transaction, and
+checks the maintained row matches a fresh rebuild.
+
+Usage:
+    python bench_user_stats.py [users] [records_per_user] [lookups]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+RECORDS = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+LOOKUPS = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text
+
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.models import user # noqa: F401
+from app.models.assessment import UserAssessmentAttempt
+from app.models.coding import CodingSubmission
+from app.models.interview import InterviewSession
+from app.models.stats import UserStats
+from app.services import user_stats
+
+Base.metadata.create_all(bind=engine)
+
+
+def seed():
+    now = datetime.utcnow()
+    per_kind = RECORDS // 3
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO user (id, email, hashed_password, is_active) VALUES (:id, :email, 'x', 1)"),
+                     [{"id": u, "email": f"u{u}@example.com"} for u in range(1, USERS + 1)])
+        conn.execute(text("INSERT INTO userassessmentattempt (user_id, score, timestamp) VALUES (:u, :s, :t)"),
+                     [{"u": u, "s": (n * 7) % 101, "t": now} for u in range(1, USERS + 1) for n in range(per_kind)])
+        conn.execute(text("INSERT INTO codingsubmission (user_id, problem_id, code, status, timestamp) VALUES (:u, 1, 'pass', :s, :t)"),
+                     [{"u": u, "s": "Passed" if n % 3 else "Failed", "t": now} for u in range(1, USERS + 1) for n in range(per_kind)])
+        conn.execute(text("INSERT INTO interviewsession (user_id, status, score, created_at) VALUES (:u, 'completed', :s, :t)"),
+                     [{"u": u, "s": 50 + n % 50, "t": now} for u in range(1, USERS + 1) for n in range(RECORDS - 2 * per_kind)])
+
+
+def before(db, user_id):
+    # What get_user_stats used to run
+    assessments = db.query(UserAssessmentAttempt).filter(UserAssessmentAttempt.user_id == user_id).all()
+    total = len(assessments)
+    avg_score = sum([a.score for a in assessments if a.score]) / total if total > 0 else 0
+    coding_subs = db.query(CodingSubmission).filter(CodingSubmission.user_id == user_id).all()
+    passed = len([c for c in coding_subs if c.status == "Passed"])
+    interviews = db.query(InterviewSession).filter(InterviewSession.user_id == user_id).all()
+    return (total, avg_score, len(coding_subs), passed, len(interviews), interviews[-1].score if interviews else None)
+
+
+def after(db, user_id):
+    stats = user_stats.get(db, user_id)
+    avg_score = stats.assessment_score_sum / stats.assessment_count if stats.assessment_count > 0 else 0
+    return (stats.assessment_count, avg_score, stats.coding_submissions, stats.coding_passed,
+            stats.interview_count, stats.last_interview_score)
+
+
+def timed(name, fn):
+    samples = []
+    db = SessionLocal()
+    for i in range(LOOKUPS):
+        db.expire_all()
+        start = time.perf_counter()
+        fn(db, i % USERS + 1)
+        samples.append(time.perf_counter() - start)
+    db.close()
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{name:<34} p50 {p50:9.3f} ms   p99 {p99:9.3f} ms")
+    return p50
+
+
+def bump(db, user_id):
+    db.add(CodingSubmission(user_id=user_id, problem_id=1, code="pass", status="Passed"))
+    user_stats.record_coding_submission(db, user_id, True)
+    db.commit()
+
+
+def rebuild(db, user_id):
+    user_stats.rebuild(db, user_id)
+    db.commit()
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    seed()
+    print(f"Seeded {USERS} users x {RECORDS} records in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    for user_id in range(1, USERS + 1):
+        assert before(db, user_id) == after(db, user_id), user_id # First read backfills the row
+    db.close()
+
+    slow = timed("before: load every row", before)
+    fast = timed("after: single-row read", after)
+    timed("rebuild: SQL aggregates (1 user)", rebuild)
+    timed("submit: insert + stats bump + commit", bump)
+    print(f"speedup (after vs before): {slow / fast:,.0f}x")
+
+    db = SessionLocal()
+    for user_id in range(1, USERS + 1):
+        maintained = after(db, user_id)
+        assert maintained == before(db, user_id), user_id
+        user_stats.rebuild(db, user_id)
+        db.commit()
+        db.expire_all()
+        assert after(db, user_id) == maintained, user_id
+    print(f"Maintained rows match the activity tables and a fresh rebuild ({db.query(UserStats).count()} rows)")
+    db.close()
@@ -0,0 +1,135 @@
+"""
+Minimal OpenAI-compatible server for local testing and benchmarks.
+
+Serves POST /v1/chat/completions (plain and stream=True) with canned payloads
+taken from the mock data in app/services/llm.py, after an artificial delay.
+
+Usage:
+    FAKE_LLM_LATENCY=1.0 uvicorn fake_openai_server:app --port 9000
+    # FAKE_LLM_RPM=60 additionally answers 429 + Retry-After above 60 requests/minute
+    # then in .env
+    OPENAI_API_BASE=http://127.0.0.1:9000/v1
+    OPENAI_API_KEY=sk-local-fake
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from fastapi import FastAPI, Body
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services import llm
+
+app = FastAPI(title="Fake OpenAI")
+
+LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+RPM = int(os.getenv("FAKE_LLM_RPM", "0"))
+STATS = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "rate_limited": 0}
+_bucket = {"requests": float(RPM), "updated": time.monotonic()}
+
+
+def _over_rpm() -> float:
+    """Token bucket like the provider's: seconds until a request is allowed (0 = allowed now)."""
+    now = time.monotonic()
+    _bucket["requests"] = min(RPM, _bucket["requests"] + (now - _bucket["updated"]) * RPM / 60)
+    _bucket["updated"] = now
+    if _bucket["requests"] < 1:
+        return (1 - _bucket["requests"]) * 60 / RPM
+    _bucket["requests"] -= 1
+    return 0.0
+
+def _reply_for(messages: list) -> str:
+    system = messages[0]["content"] if messages else ""
+    if "JSON array" in system:
+        return json.dumps(random.choice(llm.MOCK_ASSESSMENT_SETS))
+    if "JSON generator" in system:
+        problem = dict(random.choice(llm.MOCK_CODING_PROBLEMS))
+        problem["title"] = f"{problem['title']} #{random.randint(1, 10**6)}"
+        return json.dumps(problem)
+    if "code judge" in system:
+        return json.dumps({
+            "status": "success",
+            "output": "All test cases passed.",
+            "analysis": {"correctness": "Passed", "time_complexity": "O(n)", "space_complexity": "O(n)", "feedback": "Looks good."}
+        })
+    if "code reviewer" in system:
+        return json.dumps({"time_complexity": "O(n)", "space_complexity": "O(n)", "feedback": "Clean and readable."})
+    if "rubric notes" in system:
+        return json.dumps({"score": random.randint(60, 90), "strengths": ["Clear communication"], "weaknesses": ["Limited depth on scaling"], "notes": "Solid answers in this segment."})
+    if "running summary" in system:
+        return "The candidate introduced themselves and discussed backend experience with Python and PostgreSQL."
+    if "hiring manager" in system:
+        return json.dumps(llm.MOCK_INTERVIEW_FEEDBACK["backend"]["good"])
+    return random.choice(llm.MOCK_INTERVIEW_QUESTIONS["backend"]["Technical & Problem Solving"])
+
+
+@app.get("/stats")
+def stats():
+    return STATS
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict = Body(...)):
+    STATS["requests"] += 1
+    if RPM:
+        retry_after = _over_rpm()
+        if retry_after:
+            STATS["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after-ms": str(int(retry_after * 1000)), "retry-after": str(max(round(retry_after), 1))},
+                content={"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}}
+            )
+    STATS["in_flight"] += 1
+    STATS["max_in_flight"] = max(STATS["max_in_flight"], STATS["in_flight"])
+    try:
+        content = _reply_for(body.get("messages", []))
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        completion_id = f"chatcmpl-{random.randint(0, 10**9)}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+
+        if body.get("stream"):
+            async def events():
+                try:
+                    await asyncio.sleep(LATENCY / 4)
+                    for word in content.split(" "):
+                        chunk = {
+                            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                            "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+                        }
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                        await asyncio.sleep(LATENCY / 40)
+                    done = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                    }
+                    yield f"data: {json.dumps(done)}\n\n"
+                    yield "data: [DONE]\n\n"
+                finally:
+                    STATS["in_flight"] -= 1
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(LATENCY)
+        STATS["in_flight"] -= 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4}
+        }
+    except Exception:
+        STATS["in_flight"] -= 1
+        raise
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("FAKE_LLM_PORT", "9000")))
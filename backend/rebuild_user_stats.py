@@ -0,0 +1,42 @@
+"""
+Backfills / rebuilds the per-user stats table (UserStats) from the activity tables.
+
+The rows are maintained incrementally by the writes themselves; run this once
+after upgrading (rows are otherwise created lazily on first use), or whenever
+the activity tables were edited by hand.
+
+Usage:
+    python rebuild_user_stats.py [user_id ...]
+"""
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.services import user_stats
+
+BATCH = 500 # Users per commit
+
+
+def rebuild(user_ids=None):
+    Base.metadata.create_all(bind=engine) # Creates the userstats table on an existing database
+    db = SessionLocal()
+    try:
+        if not user_ids:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        for count, user_id in enumerate(user_ids, start=1):
+            user_stats.rebuild(db, user_id)
+            if count % BATCH == 0:
+                db.commit()
+                print(f"Rebuilt stats for {count}/{len(user_ids)} users")
+        db.commit()
+        print(f"Rebuilt stats for {len(user_ids)} users.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild([int(arg) for arg in sys.argv[1:]])
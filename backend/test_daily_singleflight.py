@@ -0,0 +1,114 @@
+"""
+Concurrency test: N simultaneous GET /assessment/daily misses make one LLM call.
+
+Runs against a throwaway SQLite database and fake_openai_server.py (with a
+slow completion, so every request arrives while generation is in flight):
+  1. N concurrent requests in one process (coalesced by the in-process future)
+  2. N concurrent refresh=true requests in each of PROCESSES worker processes
+     (coalesced across processes by the FlightLock row)
+Each phase must reach the provider exactly once and leave one new assessment.
+
+Usage:
+    python test_daily_singleflight.py [requests] [processes]
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+PROCESSES = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+PORT = "9103"
+
+tmp_dir = os.environ.setdefault("SINGLEFLIGHT_TEST_DIR", tempfile.mkdtemp()) # Shared with the spawned workers
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/singleflight.db"
+os.environ["LLM_GOVERNOR_PATH"] = os.path.join(tmp_dir, "governor.sqlite")
+os.environ["ASSESSMENT_POOL_ENABLED"] = "false"
+os.environ["CODING_BANK_ENABLED"] = "false"
+os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{PORT}/v1"
+os.environ["OPENAI_API_KEY"] = "sk-local-fake"
+sys.path.append(os.getcwd())
+
+
+def fire(token: str, refresh: bool) -> list:
+    import httpx
+    from app.main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            responses = await asyncio.gather(*[
+                client.get("/api/v1/assessment/daily", params={"refresh": refresh}, headers=headers)
+                for _ in range(REQUESTS)
+            ])
+        return [r.json()["questions"][0]["id"] for r in responses if r.status_code == 200]
+
+    return asyncio.run(main())
+
+
+def worker(token: str, results):
+    results.put(fire(token, refresh=True))
+
+
+def provider_requests() -> int:
+    with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/stats") as response:
+        return json.loads(response.read())["requests"]
+
+
+def assessment_count() -> int:
+    from app.db.session import SessionLocal
+    from app.models.assessment import Assessment
+    db = SessionLocal()
+    try:
+        return db.query(Assessment).count()
+    finally:
+        db.close()
+
+
+def check(name: str, first_ids: list, calls: int, assessments: int, expected: int):
+    ok = calls == 1 and assessments == 1 and len(first_ids) == expected and len(set(first_ids)) == 1
+    print(f"{'PASS' if ok else 'FAIL'}: {name}: {len(first_ids)}/{expected} responses, "
+          f"{calls} LLM call(s), {assessments} new assessment(s), {len(set(first_ids))} distinct set(s)")
+    return ok
+
+
+if __name__ == "__main__":
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fake_openai_server:app", "--port", PORT, "--log-level", "warning"],
+        env=dict(os.environ, FAKE_LLM_LATENCY="1.0")
+    )
+    try:
+        time.sleep(3)
+        from fastapi.testclient import TestClient
+        from app.main import app
+        client = TestClient(app)
+        client.post("/api/v1/users/", json={"email": "sf@example.com", "password": "pw12345", "full_name": "SF"})
+        token = client.post("/api/v1/login/access-token", data={"username": "sf@example.com", "password": "pw12345"}).json()["access_token"]
+
+        passed = True
+        before = provider_requests()
+        ids = fire(token, refresh=False)
+        passed &= check(f"{REQUESTS} concurrent requests, 1 process", ids, provider_requests() - before, assessment_count(), REQUESTS)
+
+        before, count_before = provider_requests(), assessment_count()
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(token, results)) for _ in range(PROCESSES)]
+        for proc in procs:
+            proc.start()
+        ids = [i for _ in procs for i in results.get()]
+        for proc in procs:
+            proc.join()
+        passed &= check(
+            f"{REQUESTS} concurrent refreshes x {PROCESSES} processes", ids,
+            provider_requests() - before, assessment_count() - count_before, REQUESTS * PROCESSES
+        )
+    finally:
+        server.terminate()
+    sys.exit(0 if passed else 1)
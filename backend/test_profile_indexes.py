@@ -0,0 +1,76 @@
+"""
+EXPLAIN QUERY PLAN check for the per-user profile queries.
+
+Runs GET /profile/history (first pages and a keyset page after a cursor)
+and the stats rebuild aggregates against a throwaway SQLite database, captures the SQL they issue on the activity
+tables, and asserts every statement searches the user's composite
+(user_id, timestamp / created_at) index: no full table scan and no temp
+B-tree for the newest-first ordering.
+
+Usage:
+    python test_profile_indexes.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/explain.db"
+sys.path.append(os.getcwd())
+
+from sqlalchemy import event, text
+
+from app.api.profile import get_user_history
+from app.db.base_class import Base
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.services import history, user_stats
+
+Base.metadata.create_all(bind=engine)
+
+EXPECTED_INDEX = {
+    "userassessmentattempt": "ix_userassessmentattempt_user_id_timestamp",
+    "codingsubmission": "ix_codingsubmission_user_id_timestamp",
+    "interviewsession": "ix_interviewsession_user_id_created_at",
+}
+
+
+def captured_statements() -> list:
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO user (id, email, hashed_password, is_active) VALUES (1, 'e@example.com', 'x', 1)"))
+    statements = []
+    listener = lambda conn, cursor, statement, params, context, executemany: statements.append((statement, params))
+    event.listen(engine, "before_cursor_execute", listener)
+    db = SessionLocal()
+    try:
+        user = db.get(User, 1)
+        get_user_history(limit=50, db=db, current_user=user)
+        for kind in history.KINDS:
+            history.page(db, kind, user.id, 50, history.encode_cursor(datetime.utcnow(), 10))
+        user_stats.compute(db, user.id)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", listener)
+    return [(s, p) for s, p in statements if any(table in s for table in EXPECTED_INDEX)]
+
+
+def check(statement: str, params) -> bool:
+    table = next(table for table in EXPECTED_INDEX if f"FROM {table}" in statement)
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()]
+    ok = (
+        any(f"SEARCH {table} USING" in step and EXPECTED_INDEX[table] in step for step in plan)
+        and not any(step.startswith(f"SCAN {table}") for step in plan)
+        and not any("TEMP B-TREE" in step for step in plan)
+    )
+    print(f"{'PASS' if ok else 'FAIL'}: {' '.join(statement.split())[:90]}...")
+    print(f"      {' / '.join(plan)}")
+    return ok
+
+
+if __name__ == "__main__":
+    statements = captured_statements()
+    assert len(statements) >= 9, statements # 3 first pages + 3 keyset pages + the stats aggregates
+    passed = all([check(statement, params) for statement, params in statements])
+    sys.exit(0 if passed else 1)
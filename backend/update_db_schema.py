@@ -1,4 +1,8 @@
 import sqlite3
+import os
+import sys
+
+sys.path.append(os.getcwd())
 
 def update_schema():
     conn = sqlite3.connect('interview_agent.db')
@@ -18,7 +22,76 @@ def update_schema():
             print("Added 'score' column.")
         except sqlite3.OperationalError as e:
             print(f"Skipping 'score': {e}")
+
+        # Add assessment pool status column
+        try:
+            cursor.execute("ALTER TABLE assessment ADD COLUMN status VARCHAR DEFAULT 'active'")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_assessment_status ON assessment (status)")
+            print("Added 'status' column.")
+        except sqlite3.OperationalError as e:
+            print(f"Skipping 'status': {e}")
+
+        # Add coding problem bank columns and fingerprint existing problems
+        for column, ddl in [("title_key", "VARCHAR"), ("fingerprint", "VARCHAR(64)"), ("created_at", "DATETIME")]:
+            try:
+                cursor.execute(f"ALTER TABLE codingproblem ADD COLUMN {column} {ddl}")
+                print(f"Added '{column}' column.")
+            except sqlite3.OperationalError as e:
+                print(f"Skipping '{column}': {e}")
+
+        from app.services.coding_bank import normalize_text, problem_fingerprint
+        seen = set()
+        cursor.execute("SELECT id, title, description, fingerprint FROM codingproblem ORDER BY id")
+        for problem_id, title, description, fingerprint in cursor.fetchall():
+            key = problem_fingerprint(title, description)
+            if fingerprint or key in seen or normalize_text(title) in seen:
+                seen.update([key, normalize_text(title)])
+                continue # Duplicates stay out of the bank (they are still referenced by submissions)
+            seen.update([key, normalize_text(title)])
+            cursor.execute(
+                "UPDATE codingproblem SET fingerprint = ?, title_key = ? WHERE id = ?",
+                (key, normalize_text(title), problem_id)
+            )
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_codingproblem_fingerprint ON codingproblem (fingerprint)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_codingproblem_title_key ON codingproblem (title_key)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_codingproblem_difficulty ON codingproblem (difficulty)")
+        print("Fingerprinted existing coding problems.")
             
+        # Add interview context columns
+        for table, column, ddl in [
+            ("interviewsession", "context_summary", "TEXT"),
+            ("interviewsession", "summary_upto_id", "INTEGER"),
+            ("interviewmessage", "prompt_tokens", "INTEGER"),
+            ("interviewsession", "rubric_notes", "JSON"),
+            ("interviewsession", "rubric_upto_id", "INTEGER"),
+            ("interviewsession", "transcript_snapshot", "BLOB"),
+            ("interviewsession", "transcript_upto_id", "INTEGER"),
+        ]:
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+                print(f"Added '{column}' column.")
+            except sqlite3.OperationalError as e:
+                print(f"Skipping '{column}': {e}")
+
+        # Add the indexed "current set of the day" key and backfill it with the newest served set per day
+        try:
+            cursor.execute("ALTER TABLE assessment ADD COLUMN assessment_day DATE")
+            cursor.execute("""
+                UPDATE assessment SET assessment_day = date(date)
+                WHERE id IN (SELECT MAX(id) FROM assessment WHERE status != 'pooled' AND date IS NOT NULL GROUP BY date(date))
+            """)
+            print("Added 'assessment_day' column.")
+        except sqlite3.OperationalError as e:
+            print(f"Skipping 'assessment_day': {e}")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_assessment_assessment_day ON assessment (assessment_day)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_question_assessment_id ON question (assessment_id)")
+
+        # Per-user activity indexes (profile history ordering and stats aggregates)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_userassessmentattempt_user_id_timestamp ON userassessmentattempt (user_id, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_codingsubmission_user_id_timestamp ON codingsubmission (user_id, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_interviewsession_user_id_created_at ON interviewsession (user_id, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_interviewmessage_session_id_id ON interviewmessage (session_id, id)")
+
         conn.commit()
         print("Schema update completed.")
     except Exception as e:
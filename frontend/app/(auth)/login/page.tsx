@@ -30,6 +30,7 @@ export default function LoginPage() {
             })
 
             localStorage.setItem("token", response.data.access_token)
+            localStorage.setItem("refresh_token", response.data.refresh_token)
             router.push("/dashboard")
         } catch (err: any) {
             setError(err.response?.data?.detail || "Login failed")
@@ -12,6 +12,7 @@ import { motion, AnimatePresence } from "framer-motion"
 import { cn } from "@/lib/utils"
 
 interface Question {
+    id: number
     text: string
     type: "mcq" | "subjective"
     options: string[]
@@ -30,6 +31,7 @@ interface SubmissionResult {
 
 export default function AssessmentPage() {
     const [questions, setQuestions] = useState<Question[]>([])
+    const [assessmentId, setAssessmentId] = useState<number | null>(null)
     const [loading, setLoading] = useState(true)
     const [responses, setResponses] = useState<Record<number, string>>({})
     const [submitted, setSubmitted] = useState(false)
@@ -49,6 +51,7 @@ export default function AssessmentPage() {
         try {
             const res = await api.get(`/assessment/daily${refresh ? '?refresh=true' : ''}`)
             setQuestions(res.data.questions)
+            setAssessmentId(res.data.assessment_id)
         } catch (error: any) {
             console.error("Failed to fetch assessment", error)
             const msg = error.response?.data?.detail || "Failed to load assessment. Please try again."
@@ -69,7 +72,12 @@ export default function AssessmentPage() {
     const handleSubmit = async () => {
         setSubmitting(true)
         try {
-            const res = await api.post("/assessment/submit", { responses })
+            // Answers are graded by question id against the set that was served
+            const answers: Record<number, string> = {}
+            Object.entries(responses).forEach(([index, answer]) => {
+                answers[questions[Number(index)].id] = answer
+            })
+            const res = await api.post("/assessment/submit", { assessment_id: assessmentId, responses: answers })
             setScore(res.data.score)
             setResults(res.data.results || [])
             setSubmitted(true)
@@ -5,6 +5,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
 import api from "@/lib/api"
+import { authFetch } from "@/lib/auth"
 import { VideoOff, Send, Upload, Mic, MicOff, Camera, CameraOff, X } from "lucide-react"
 import { cn } from "@/lib/utils"
 import { useRouter } from "next/navigation"
@@ -226,10 +227,33 @@ export default function InterviewPage() {
         setInput("")
 
         try {
-            const res = await api.post(`/interview/${sessionId}/chat`, { message: userMsg.content })
-            const aiResponse = res.data.response
-
-            setMessages(prev => [...prev, { role: "assistant", content: aiResponse }])
+            // Stream the interviewer's reply token by token (SSE)
+            const res = await authFetch(`${api.defaults.baseURL}/interview/${sessionId}/chat/stream`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ message: userMsg.content })
+            })
+            if (!res.ok || !res.body) throw new Error(`Chat stream failed with status ${res.status}`)
+
+            setMessages(prev => [...prev, { role: "assistant", content: "" }])
+            const reader = res.body.getReader()
+            const decoder = new TextDecoder()
+            let buffer = ""
+            let aiResponse = ""
+            while (true) {
+                const { done, value } = await reader.read()
+                if (done) break
+                buffer += decoder.decode(value, { stream: true })
+                const events = buffer.split("\n\n")
+                buffer = events.pop() || ""
+                for (const event of events) {
+                    const dataLine = event.split("\n").find(line => line.startsWith("data: "))
+                    if (!dataLine) continue
+                    const data = JSON.parse(dataLine.slice(6))
+                    aiResponse = event.startsWith("event: done") ? data.response : aiResponse + data.token
+                    setMessages(prev => [...prev.slice(0, -1), { role: "assistant", content: aiResponse }])
+                }
+            }
             speak(aiResponse)
         } catch (error) {
             console.error("Failed to send message", error)
@@ -242,9 +266,20 @@ export default function InterviewPage() {
             const res = await api.post(`/interview/${sessionId}/end`)
             stopCamera()
             window.speechSynthesis.cancel()
-            setFeedback(res.data.feedback)
+            setLoading(true)
+
+            // Feedback is generated by a background job; poll until it finishes
+            let job = res.data
+            while (job.status === "queued" || job.status === "running") {
+                await new Promise(resolve => setTimeout(resolve, 1500))
+                job = (await api.get(`/jobs/${res.data.job_id}`)).data
+            }
+            setLoading(false)
+            if (job.status !== "succeeded") throw new Error(job.error || "Feedback generation failed")
+            setFeedback(job.result.feedback)
         } catch (error) {
             console.error("Failed to end interview", error)
+            setLoading(false)
             router.push("/dashboard")
         }
     }
@@ -421,8 +456,8 @@ export default function InterviewPage() {
                                 <div className={`h-2 w-2 rounded-full ${isListening ? 'bg-red-500 animate-pulse' : 'bg-gray-300'}`} />
                                 Live Transcript
                             </span>
-                            <Button size="sm" variant="destructive" onClick={handleEndTest} className="h-8 rounded-full px-4">
-                                End Interview
+                            <Button size="sm" variant="destructive" onClick={handleEndTest} disabled={loading} className="h-8 rounded-full px-4">
+                                {loading ? "Generating Feedback..." : "End Interview"}
                             </Button>
                         </CardTitle>
                     </CardHeader>
@@ -17,6 +17,7 @@ import {
 } from "@/components/ui/dropdown-menu"
 import { useState, useEffect } from "react"
 import api from "@/lib/api"
+import "@/lib/auth" // Renews expired access tokens for every api call
 
 const sidebarItems = [
     { icon: LayoutDashboard, label: "Dashboard", href: "/dashboard" },
@@ -47,7 +48,13 @@ export default function DashboardLayout({
     }, [])
 
     const handleLogout = () => {
+        const refreshToken = localStorage.getItem("refresh_token")
+        if (refreshToken) {
+            // Revoke the session server-side too; logging out locally must not wait for it
+            api.post("/logout", { refresh_token: refreshToken }).catch(() => {})
+        }
         localStorage.removeItem("token")
+        localStorage.removeItem("refresh_token")
         router.push("/login")
     }
 
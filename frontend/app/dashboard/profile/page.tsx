@@ -35,6 +35,7 @@ export default function ProfilePage() {
     const [history, setHistory] = useState<any>(null)
     const [loading, setLoading] = useState(true)
     const [historyLoading, setHistoryLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [saving, setSaving] = useState(false)
     const [activeTab, setActiveTab] = useState('assessments')
     const [message, setMessage] = useState<{ type: 'success' | 'error', text: string } | null>(null)
@@ -69,6 +70,25 @@ export default function ProfilePage() {
         fetchData()
     }, [])
 
+    // History comes a page per list; fetch the next page of the open tab on demand
+    const handleLoadMore = async () => {
+        const cursor = history?.next_cursors?.[activeTab]
+        if (!cursor) return
+        setLoadingMore(true)
+        try {
+            const res = await api.get(`/profile/history/${activeTab}`, { params: { cursor } })
+            setHistory((prev: any) => ({
+                ...prev,
+                [activeTab]: [...prev[activeTab], ...res.data.items],
+                next_cursors: { ...prev.next_cursors, [activeTab]: res.data.next_cursor }
+            }))
+        } catch (error) {
+            console.error("Failed to load more history", error)
+        } finally {
+            setLoadingMore(false)
+        }
+    }
+
     const handleViewReport = (type: string, id: number) => {
         let reportType = type;
         if (type === 'assessments') reportType = 'assessment';
@@ -332,6 +352,13 @@ export default function ProfilePage() {
                                         )}
                                     </tbody>
                                 </table>
+                                {history?.next_cursors?.[activeTab] && (
+                                    <div className="p-4 text-center border-t dark:border-gray-700">
+                                        <Button variant="outline" size="sm" onClick={handleLoadMore} disabled={loadingMore}>
+                                            {loadingMore ? "Loading..." : "Load more"}
+                                        </Button>
+                                    </div>
+                                )}
                             </div>
                         )}
                     </CardContent>
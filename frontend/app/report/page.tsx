@@ -3,6 +3,7 @@
 import { useEffect, useState, Suspense } from "react"
 import { useSearchParams } from "next/navigation"
 import api from "@/lib/api"
+import "@/lib/auth" // Renews expired access tokens for every api call
 import { Loader2 } from "lucide-react"
 
 function ReportContent() {
@@ -0,0 +1,89 @@
+import type { AxiosError, InternalAxiosRequestConfig } from "axios"
+import api from "@/lib/api"
+
+// Access tokens are short-lived; a 401/403 from the API means "renew and retry once".
+// Every refresh token works only once and reusing one logs the whole session out
+// (backend/app/services/refresh_tokens.py), so a renewal must never run twice for
+// the same token: requests in this tab share one in-flight refresh, and tabs take
+// turns through a Web Lock and pick up each other's result from localStorage.
+
+const REFRESH_LOCK = "interview-agent-token-refresh"
+const AUTH_FAILED = [401, 403]
+
+let inflight: Promise<string | null> | null = null
+
+function bearer(token: string | null) {
+    return `Bearer ${token}`
+}
+
+function clearSession() {
+    localStorage.removeItem("token")
+    localStorage.removeItem("refresh_token")
+    if (window.location.pathname !== "/login") window.location.href = "/login"
+}
+
+async function renew(staleToken: string | null): Promise<string | null> {
+    const current = localStorage.getItem("token")
+    if (current && current !== staleToken) return current // Another request or tab already renewed it
+
+    const refreshToken = localStorage.getItem("refresh_token")
+    if (!refreshToken) {
+        clearSession()
+        return null
+    }
+    // Plain fetch: a failing refresh must not go through the retry interceptor
+    const res = await fetch(`${api.defaults.baseURL}/login/refresh-token`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ refresh_token: refreshToken })
+    })
+    if (!res.ok) {
+        clearSession()
+        return null
+    }
+    const data = await res.json()
+    localStorage.setItem("token", data.access_token)
+    localStorage.setItem("refresh_token", data.refresh_token)
+    return data.access_token
+}
+
+// The new access token, or null when the session is over. `staleToken` is the one the failed request carried.
+export function refreshAccessToken(staleToken: string | null): Promise<string | null> {
+    if (!inflight) {
+        const run = () => renew(staleToken)
+        const locks = typeof navigator !== "undefined" ? navigator.locks : undefined
+        inflight = (locks ? locks.request(REFRESH_LOCK, run) : run()).finally(() => {
+            inflight = null
+        })
+    }
+    return inflight
+}
+
+// fetch() with the stored access token, renewed and retried once on 401/403 (for streams axios can't read)
+export async function authFetch(url: string, init: RequestInit = {}): Promise<Response> {
+    const send = (token: string | null) => fetch(url, {
+        ...init,
+        headers: { ...init.headers, Authorization: bearer(token) }
+    })
+    const token = localStorage.getItem("token")
+    const res = await send(token)
+    if (!AUTH_FAILED.includes(res.status)) return res
+    const renewed = await refreshAccessToken(token)
+    return renewed ? send(renewed) : res
+}
+
+type RetriableConfig = InternalAxiosRequestConfig & { _authRetried?: boolean }
+
+api.interceptors.response.use(undefined, async (error: AxiosError) => {
+    const config = error.config as RetriableConfig | undefined
+    const isLogin = config?.url?.startsWith("/login")
+    if (!config || config._authRetried || isLogin || !AUTH_FAILED.includes(error.response?.status ?? 0)) {
+        throw error
+    }
+    const sent = String(config.headers?.Authorization ?? "").replace(/^Bearer /, "") || null
+    const renewed = await refreshAccessToken(sent)
+    if (!renewed) throw error
+    config._authRetried = true
+    config.headers.Authorization = bearer(renewed)
+    return api(config)
+})